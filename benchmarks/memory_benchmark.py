@@ -0,0 +1,116 @@
+# Copyright 2022, 2023 Andrea Cucchietti
+# This file is part of flashcards-from-pdf.
+
+# flashcards-from-pdf is free software: you can redistribute it and/or modify it under the terms of the GNU General Public License as published by the Free Software Foundation, either version 3 of the License, or (at your option) any later version.
+
+# flashcards-from-pdf is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License along with flashcards-from-pdf. If not, see <https://www.gnu.org/licenses/>.
+import argparse
+import gc
+import os
+import sys
+import time
+import tracemalloc
+from typing import Callable
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../src")))
+
+from flashcard.flashcard import Flashcard
+from flashcard.pdf_page import PdfPage
+
+
+class LegacyFlashcard:
+    """Layout of Flashcard before __slots__: an instance dict and a list with the past results"""
+
+    def __init__(
+        self,
+        question: str,
+        answer: str,
+        question_type: Flashcard.QuestionType,
+        past_results: list[Flashcard.Result],
+        reference_page: int,
+        current_result: Flashcard.Result,
+    ) -> None:
+        self.pdf_page_index_before: int = -1
+        self.flashcard_index_before: int = -1
+        self.question: str = question
+        self.answer: str = answer
+        self.question_type: Flashcard.QuestionType = question_type
+        self.past_results: list[Flashcard.Result] = past_results
+        self.reference_page: int = reference_page
+        self.current_result: Flashcard.Result = current_result
+
+
+class LegacyPdfPage:
+    """Layout of PdfPage before __slots__"""
+
+    def __init__(self, num_page: int) -> None:
+        self.pdf_page_index_before: int = -1
+        self.flashcard_index_before: int = -1
+        self.num_page: int = num_page
+        self.card_index: int = PdfPage.GENERIC_CARD_INDEX
+
+
+def create_cards(
+    flashcard_class: type, pdf_page_class: type, num_flashcards: int, num_pages: int
+) -> list:
+    # the strings are shared, so only the layout of the objects is measured
+    past_results: list[Flashcard.Result] = [
+        Flashcard.Result.KNOW,
+        Flashcard.Result.STILL_LEARNING,
+        Flashcard.Result.NOT_DONE,
+    ] * 4
+    cards: list = []
+    for i in range(num_flashcards):
+        cards.append(
+            flashcard_class(
+                "question",
+                "answer",
+                Flashcard.QuestionType.PAGE_SPECIFIC,
+                list(past_results),
+                i % num_pages,
+                Flashcard.Result.NOT_DONE,
+            )
+        )
+    for i in range(num_pages):
+        cards.append(pdf_page_class(i))
+    return cards
+
+
+def measure(create: Callable[[], list]) -> tuple[float, float]:
+    """Returns the memory taken by the cards, in MB, and the time of a full garbage collection while they are alive, in milliseconds"""
+    gc.collect()
+    tracemalloc.start()
+    cards: list = create()
+    size_mb: float = tracemalloc.get_traced_memory()[0] / 1e6
+    tracemalloc.stop()
+
+    start: float = time.perf_counter()
+    gc.collect()
+    gc_time_ms: float = (time.perf_counter() - start) * 1000
+    del cards
+    return (size_mb, gc_time_ms)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Memory of the flashcards with the old and the new layout"
+    )
+    parser.add_argument("--flashcards", type=int, default=50000)
+    parser.add_argument("--pages", type=int, default=1000)
+    args = parser.parse_args()
+
+    layouts: dict[str, tuple[type, type]] = {
+        "instance dict": (LegacyFlashcard, LegacyPdfPage),
+        "__slots__": (Flashcard, PdfPage),
+    }
+    for name, (flashcard_class, pdf_page_class) in layouts.items():
+        size_mb, gc_time_ms = measure(
+            lambda: create_cards(
+                flashcard_class, pdf_page_class, args.flashcards, args.pages
+            )
+        )
+        print(
+            "{:<14} {:7.1f} MB, full gc {:6.1f} ms".format(name, size_mb, gc_time_ms)
+        )
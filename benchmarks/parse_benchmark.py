@@ -0,0 +1,84 @@
+# Copyright 2022, 2023 Andrea Cucchietti
+# This file is part of flashcards-from-pdf.
+
+# flashcards-from-pdf is free software: you can redistribute it and/or modify it under the terms of the GNU General Public License as published by the Free Software Foundation, either version 3 of the License, or (at your option) any later version.
+
+# flashcards-from-pdf is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License along with flashcards-from-pdf. If not, see <https://www.gnu.org/licenses/>.
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../src")))
+
+from IO_flashcards_management import IOFlashcards
+from flashcard.flashcard import Flashcard
+from test_management.pdf_test_info import PDFTestsInfo
+
+
+def create_synthetic_deck(
+    path_of_file: str, num_flashcards: int, num_answer_lines: int
+) -> None:
+    """Write a deck with num_flashcards flashcards, each one with an answer of num_answer_lines lines"""
+    pdf_test_info: PDFTestsInfo = PDFTestsInfo()
+    pdf_test_info.set_first_pass_flag(PDFTestsInfo.FirstPass.TRUE)
+    flashcards: dict[int, list[Flashcard]] = dict()
+    answer: str = "\n".join(
+        ["line " + str(i) + " of a long answer" for i in range(num_answer_lines)]
+    )
+    for i in range(num_flashcards):
+        flashcard: Flashcard = Flashcard(
+            question="question " + str(i),
+            answer=answer,
+            question_type=Flashcard.QuestionType.PAGE_SPECIFIC,
+            past_results=[Flashcard.Result.KNOW, Flashcard.Result.STILL_LEARNING],
+            reference_page=i // 10,
+        )
+        flashcards.setdefault(flashcard.get_reference_page(), []).append(flashcard)
+
+    IOFlashcards.save_flashcards_file(
+        path_of_file, pdf_test_info, num_flashcards, flashcards
+    )
+
+
+def benchmark_parse(
+    num_flashcards: int = 20000, num_answer_lines: int = 20, repetitions: int = 3
+) -> tuple[float, float]:
+    """Measure how fast a synthetic deck is parsed.
+
+    Returns
+    -------
+    tuple[float, float]
+    The best parse rate of the repetitions, in flashcards per second and in MB per second.
+
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        path_of_file: str = os.path.join(directory, "synthetic_deck.txt")
+        create_synthetic_deck(path_of_file, num_flashcards, num_answer_lines)
+        size_mb: float = os.path.getsize(path_of_file) / 1e6
+
+        best_time: float = float("inf")
+        for _ in range(repetitions):
+            start: float = time.perf_counter()
+            IOFlashcards.get_flashcards_from_txt(path_of_file)
+            best_time = min(best_time, time.perf_counter() - start)
+
+    return (num_flashcards / best_time, size_mb / best_time)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Parse rate of the deck .txt files")
+    parser.add_argument("--flashcards", type=int, default=20000)
+    parser.add_argument("--answer-lines", type=int, default=20)
+    parser.add_argument("--repetitions", type=int, default=3)
+    args = parser.parse_args()
+
+    flashcards_per_second, mb_per_second = benchmark_parse(
+        args.flashcards, args.answer_lines, args.repetitions
+    )
+    print(
+        "{:.0f} flashcards/s, {:.1f} MB/s".format(flashcards_per_second, mb_per_second)
+    )
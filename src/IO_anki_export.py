@@ -0,0 +1,739 @@
+# Copyright 2022, 2023 Andrea Cucchietti
+# This file is part of flashcards-from-pdf.
+
+# flashcards-from-pdf is free software: you can redistribute it and/or modify it under the terms of the GNU General Public License as published by the Free Software Foundation, either version 3 of the License, or (at your option) any later version.
+
+# flashcards-from-pdf is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License along with flashcards-from-pdf. If not, see <https://www.gnu.org/licenses/>.
+from pdf2image import convert_from_path
+from PIL import Image as PILImage
+
+from io import TextIOWrapper, BytesIO
+from collections.abc import Mapping
+from concurrent.futures import Future, Executor, ProcessPoolExecutor
+from typing import Optional, cast
+import os
+import time
+import hashlib
+import sqlite3
+import tempfile
+import logging
+
+from flashcard.flashcard import Flashcard
+from IO_flashcards_management import IOFlashcards
+from IO_pdf_registry import PdfDocumentRegistry
+from IO_deck_database import DeckDatabase
+from IO_anki_package import AnkiPackageWriter
+from test_management.pdf_test_info import PDFTestsInfo
+from application_constants import ANKI_FLASHCARDS_SEPARATOR
+from application_constants import DECK_FORMAT_VERSION
+from application_constants import ANKI_CONTENT_DIRECTORY
+from application_constants import ANKI_EXPORT_DPI
+from application_constants import ANKI_EXPORT_IMAGE_FORMAT
+from application_constants import ANKI_EXPORT_MAX_WORKERS
+from application_constants import ANKI_EXPORT_MAX_PAGES_BETWEEN_RUN_PAGES
+from application_constants import ANKI_EXPORT_PACKAGE_MAX_PAGES_PER_RUN
+from application_constants import ANKI_EXPORT_PENDING_RUNS_PER_WORKER
+
+
+class AnkiExportManifest:
+    """What was exported to Anki for every deck, stored in the anki_export_manifest table of the private database.
+
+    For every flashcard there are the hash of its question and answer and the filename of the image of its page, named after the hash of the page. A flashcard is exported again only when one of them changes.
+    """
+
+    @staticmethod
+    def create_table(con: sqlite3.Connection) -> None:
+        con.execute(
+            """CREATE TABLE IF NOT EXISTS anki_export_manifest (deck text NOT NULL,
+                                                                flashcard_id integer NOT NULL,
+                                                                card_hash text NOT NULL,
+                                                                image text,
+                                                                PRIMARY KEY (deck, flashcard_id))"""
+        )
+
+    @staticmethod
+    def get_card_hash(flashcard: Flashcard) -> str:
+        return hashlib.sha256(
+            (flashcard.get_question() + "\0" + flashcard.get_answer()).encode("utf-8")
+        ).hexdigest()
+
+    @staticmethod
+    def load(
+        path_of_txt: str, path_of_db: Optional[str] = None
+    ) -> dict[int, tuple[str, Optional[str]]]:
+        """Card hash and image of every exported flashcard of the deck, by id"""
+        if path_of_db is None:
+            path_of_db = DeckDatabase.get_db_path()
+        con: sqlite3.Connection = sqlite3.connect(path_of_db)
+        try:
+            AnkiExportManifest.create_table(con)
+            return {
+                row[0]: (row[1], row[2])
+                for row in con.execute(
+                    "SELECT flashcard_id, card_hash, image FROM anki_export_manifest WHERE deck = ?",
+                    (DeckDatabase.get_deck_key(path_of_txt),),
+                )
+            }
+        finally:
+            con.close()
+
+    @staticmethod
+    def save(
+        path_of_txt: str,
+        entries: dict[int, tuple[str, Optional[str]]],
+        path_of_db: Optional[str] = None,
+    ) -> None:
+        """Replace the manifest of the deck with entries"""
+        if path_of_db is None:
+            path_of_db = DeckDatabase.get_db_path()
+        deck_key: str = DeckDatabase.get_deck_key(path_of_txt)
+        con: sqlite3.Connection = sqlite3.connect(path_of_db)
+        try:
+            with con:
+                AnkiExportManifest.create_table(con)
+                con.execute(
+                    "DELETE FROM anki_export_manifest WHERE deck = ?", (deck_key,)
+                )
+                # the tables of the first exports have also the hash of the page, now left empty
+                con.executemany(
+                    "INSERT INTO anki_export_manifest (deck, flashcard_id, card_hash, image) VALUES (?, ?, ?, ?)",
+                    (
+                        (deck_key, flashcard_id, *entry)
+                        for flashcard_id, entry in entries.items()
+                    ),
+                )
+        finally:
+            con.close()
+
+    @staticmethod
+    def remove(path_of_txt: str, path_of_db: Optional[str] = None) -> None:
+        """The next export of the deck exports all its flashcards"""
+        AnkiExportManifest.save(path_of_txt, dict(), path_of_db)
+
+
+class AnkiExport:
+    """Export of decks to the text files imported by Anki, with the images of the pdf pages in the media folder of Anki.
+
+    The pages of the page specific flashcards of a deck are collected first, then rendered in runs of near pages on a pool of processes, shared by all the decks exported with the same AnkiExport. The rows of the .txt file are written in the order of the deck as the runs of their pages are ready, and only ANKI_EXPORT_PENDING_RUNS_PER_WORKER runs for every process are started ahead of the one of the row written.
+    The pool is started at the first page to render, close has to be called at the end of the export.
+    The images are named after the hash of the page and the resolution, so the media folder of Anki is the cache of the rendered pages: a page is rendered once for all its flashcards, and not again by the next exports while the page does not change. The hash of a page is computed by the PdfDocumentRegistry from a rendering of the page, so an update of the pdf renders and exports again only the pages it changed.
+    The flashcards are read from the database if the deck is stored there, otherwise from its .txt file.
+    Every export of a deck writes a new .txt file, named after the time of the export, with only the flashcards that are new or changed since the last export, as recorded by the AnkiExportManifest, unless is_full_export. The files of the previous exports are kept, as they could be not imported yet. No image is removed from the media folder, as the notes already in Anki could still show it: the unused images are found by the "Check Media" of Anki.
+    With a path_of_package, all the flashcards of all the decks are written in an .apkg package instead, with their images, and the manifests are not used.
+    The pages are rendered by pool, if it is given, which is shut down by close. The decks are in path_of_decks, data in the working directory if None, and the images in media_folder_anki, the one in private_folder_anki.txt if None.
+    """
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = ANKI_EXPORT_MAX_WORKERS,
+        is_full_export: bool = False,
+        path_of_package: Optional[str] = None,
+        pool: Optional[Executor] = None,
+        path_of_db: Optional[str] = None,
+        path_of_decks: Optional[str] = None,
+        media_folder_anki: Optional[str] = None,
+    ) -> None:
+        self.__max_workers: int = (
+            max_workers if max_workers is not None else (os.cpu_count() or 1)
+        )
+        self.__pool: Optional[Executor] = pool
+        self.__path_of_db: Optional[str] = path_of_db
+        # the .txt files are written in its Anki folder, with the same relative path of their deck
+        self.__path_of_decks: str = (
+            path_of_decks
+            if path_of_decks is not None
+            else os.path.join(os.getcwd(), "data")
+        )
+        self.__media_folder_anki: str = (
+            media_folder_anki
+            if media_folder_anki is not None
+            else os.path.expandvars(ANKI_CONTENT_DIRECTORY)
+        )
+        self.__is_full_export: bool = is_full_export
+        # all the decks are written in the package, if there is one, instead of the .txt files and the media folder
+        self.__package: Optional[AnkiPackageWriter] = (
+            AnkiPackageWriter(path_of_package) if path_of_package is not None else None
+        )
+        # filename of the images rendered by this export, with the rendering of their run and the position in it
+        self.__renderings: dict[str, tuple[Future[list[bool]], int]] = dict()
+        self.__num_render_calls: int = 0
+        self.__num_rendered_pages: int = 0
+        self.__num_cached_pages: int = 0
+        self.__num_flashcards: int = 0
+        self.__num_exported_flashcards: int = 0
+        self.__export_time: float = 0
+
+    def close(self, is_completed: bool = True) -> None:
+        """The package is written only if is_completed"""
+        if self.__pool is not None:
+            self.__pool.shutdown(cancel_futures=not is_completed)
+            self.__pool = None
+        self.__renderings.clear()
+        if self.__package is not None:
+            if is_completed:
+                self.__package.close()
+            else:
+                self.__package.discard()
+            self.__package = None
+        logging.info(
+            "Anki export: %d flashcards, %d new or changed, in %.1f s, %.1f flashcards/s, %d pages rendered in %d runs, %d pages already in the media folder",
+            self.__num_flashcards,
+            self.__num_exported_flashcards,
+            self.__export_time,
+            self.get_flashcards_per_second(),
+            self.__num_rendered_pages,
+            self.__num_render_calls,
+            self.__num_cached_pages,
+        )
+
+    def __get_pool(self) -> Executor:
+        if self.__pool is None:
+            self.__pool = ProcessPoolExecutor(self.__max_workers)
+        return self.__pool
+
+    def get_num_rendered_pages(self) -> int:
+        return self.__num_rendered_pages
+
+    def get_num_render_calls(self) -> int:
+        """Calls of pdftoppm, one for every run of pages"""
+        return self.__num_render_calls
+
+    def get_num_cached_pages(self) -> int:
+        """Pages whose image was already in the media folder"""
+        return self.__num_cached_pages
+
+    def get_num_flashcards(self) -> int:
+        return self.__num_flashcards
+
+    def get_num_exported_flashcards(self) -> int:
+        """The flashcards written to the .txt files, as they are new or changed, or to the package"""
+        return self.__num_exported_flashcards
+
+    def get_export_time(self) -> float:
+        """In seconds"""
+        return self.__export_time
+
+    def get_flashcards_per_second(self) -> float:
+        if self.__export_time == 0:
+            return 0.0
+        return self.__num_flashcards / self.__export_time
+
+    def save_deck(self, path_of_pdf: str) -> None:
+        start: float = time.perf_counter()
+        path_without_ext: str
+        path_without_ext, _ = os.path.splitext(path_of_pdf)
+        flashcards_from_pdf_page: Mapping[
+            int, list[Flashcard]
+        ] = self.__load_flashcards(path_without_ext + ".txt")
+
+        if self.__package is not None:
+            self.__save_flashcards_to_anki_package(
+                path_of_pdf, flashcards_from_pdf_page
+            )
+        else:
+            if self.__is_full_export:
+                AnkiExportManifest.remove(path_without_ext + ".txt", self.__path_of_db)
+            self.__save_flashcards_to_anki_txt(path_of_pdf, flashcards_from_pdf_page)
+        self.__export_time += time.perf_counter() - start
+
+    def __load_flashcards(self, path_of_txt: str) -> Mapping[int, list[Flashcard]]:
+        # after it is stored in the database, the .txt file of a deck is not updated
+        flashcards: Mapping[int, list[Flashcard]]
+        deck_database: DeckDatabase = DeckDatabase(path_of_txt, self.__path_of_db)
+        try:
+            if deck_database.is_deck_stored():
+                _, flashcards = deck_database.load_deck()
+                return flashcards
+        finally:
+            deck_database.close()
+        pdf_test_info: PDFTestsInfo
+        pdf_test_info, flashcards = IOFlashcards.load_deck(path_of_txt)
+        if IOFlashcards.get_deck_version(path_of_txt) < DECK_FORMAT_VERSION:
+            # the flashcards of the older formats get new ids every time they are read, they are saved so the next exports update the same notes in Anki. The windows and the cache of the decks find the .txt file changed
+            flashcards = dict(flashcards)
+            IOFlashcards.save_flashcards_file(
+                path_of_txt,
+                pdf_test_info,
+                sum(len(x) for x in flashcards.values()),
+                flashcards,
+            )
+        return flashcards
+
+    def __save_flashcards_to_anki_txt(
+        self,
+        path_of_file: str,  # could be the pathname of the pdf or the txt
+        flashcards_from_pdf_page: Mapping[int, list[Flashcard]],
+    ) -> None:
+        path_without_ext: str
+        relative_directory_position_anki: str
+        path_of_pdf: str
+        basename_pdf_without_ext: str
+        media_folder_anki: str
+        (
+            path_without_ext,
+            relative_directory_position_anki,
+            path_of_pdf,
+            basename_pdf_without_ext,
+            media_folder_anki,
+        ) = self.__get_path_information_to_anki(path_of_file)
+
+        path_of_deck: str = os.path.splitext(path_of_pdf)[0] + ".txt"
+        manifest: dict[int, tuple[str, Optional[str]]] = AnkiExportManifest.load(
+            path_of_deck, self.__path_of_db
+        )
+
+        # the new or changed flashcards in the order of the deck, with the filename of the image of their page
+        rows: list[tuple[Flashcard, Optional[str]]] = []
+        pages_of_images: dict[str, int] = dict()
+        # card hash and image of every flashcard
+        entries: dict[int, tuple[str, Optional[str]]] = dict()
+        flashcard: Flashcard
+        filename: Optional[str]
+        page: int
+        for flashcard, filename, page in self.__get_flashcards_to_export(
+            path_of_pdf, flashcards_from_pdf_page
+        ):
+            if filename is not None:
+                # the image is rendered again if it was removed from the media folder
+                pages_of_images[filename] = page
+            entries[flashcard.get_id()] = (
+                AnkiExportManifest.get_card_hash(flashcard),
+                filename,
+            )
+            if manifest.get(flashcard.get_id()) != entries[flashcard.get_id()]:
+                rows.append((flashcard, filename))
+        filenames_of_pages: dict[int, str] = self.__get_pages_to_render(
+            pages_of_images, media_folder_anki
+        )
+        runs: list[list[int]] = []
+        if len(filenames_of_pages) > 0:
+            runs = AnkiExport.get_runs(
+                list(filenames_of_pages.keys()), self.__max_workers
+            )
+        positions_of_images: dict[
+            str, tuple[int, int]
+        ] = AnkiExport.__get_positions_of_images(runs, filenames_of_pages)
+        renderings: list[Future[list[bool]]] = []
+
+        if len(rows) > 0:
+            path_of_export: str = (
+                AnkiExport.__get_export_path_without_ext(path_without_ext) + ".txt"
+            )
+            os.makedirs(os.path.dirname(path_of_export), exist_ok=True)
+            with open(path_of_export + ".tmp", "w", encoding="utf-8") as file:
+                file.write("#separator:tab\n#html:true\n#notetype:basic\n")
+                # the rows are written in the order of the deck, as the runs of their pages are rendered
+                row: tuple[Flashcard, Optional[str]]
+                for row in rows:
+                    if row[1] in positions_of_images:
+                        self.__render_runs_to_images(
+                            path_of_pdf,
+                            runs,
+                            filenames_of_pages,
+                            media_folder_anki,
+                            renderings,
+                            positions_of_images[row[1]][0],
+                        )
+                    if not self.__write_row(file, *row):
+                        # exported again the next time
+                        entries[row[0].get_id()] = (entries[row[0].get_id()][0], None)
+            # an interrupted export leaves no file to import
+            os.replace(path_of_export + ".tmp", path_of_export)
+        # the images of the flashcards not exported again that are missing from the media folder
+        run_index: int
+        for run_index in range(len(runs)):
+            self.__render_runs_to_images(
+                path_of_pdf,
+                runs,
+                filenames_of_pages,
+                media_folder_anki,
+                renderings,
+                run_index,
+            )
+            renderings[run_index].result()
+        self.__num_flashcards += len(entries)
+        self.__num_exported_flashcards += len(rows)
+
+        AnkiExportManifest.save(path_of_deck, entries, self.__path_of_db)
+
+    def __get_path_information_to_anki(
+        self,
+        path_of_file: str,
+    ) -> tuple[str, str, str, str, str]:
+        path_without_ext: str
+        basename_pdf: str = os.path.basename(path_of_file)
+        basename_pdf_without_ext, _ = os.path.splitext(basename_pdf)
+        path_without_ext, _ = os.path.splitext(path_of_file)
+
+        path_of_pdf: str = path_without_ext + ".pdf"
+        if os.path.exists(path_of_pdf) == False:
+            raise IOError("Not existing path: " + path_of_pdf)
+
+        relative_file_position: str = path_without_ext.removeprefix(
+            self.__path_of_decks
+        )
+        relative_directory_position_anki: str
+        relative_directory_position_anki, _ = os.path.splitext(relative_file_position)
+        relative_directory_position_anki = "\\data" + relative_directory_position_anki
+        path_without_ext = (
+            os.path.join(self.__path_of_decks, "Anki") + relative_file_position
+        )
+
+        media_folder_anki: str = self.__media_folder_anki
+
+        return (
+            path_without_ext,
+            relative_directory_position_anki,
+            path_of_pdf,
+            basename_pdf_without_ext,
+            media_folder_anki,
+        )
+
+    @staticmethod
+    def get_package_path(path: str) -> str:
+        """The path of the .apkg package of a pdf or of a directory, in data\\Anki"""
+        path_without_ext: str
+        path_without_ext, _ = os.path.splitext(path)
+        return (
+            os.getcwd()
+            + "\\data\\Anki"
+            + path_without_ext.removeprefix(os.getcwd() + "\\data")
+            + ".apkg"
+        )
+
+    @staticmethod
+    def __get_export_path_without_ext(path_without_ext: str) -> str:
+        export_path_without_ext: str = path_without_ext + time.strftime(
+            "_%Y%m%d_%H%M%S"
+        )
+        while os.path.exists(export_path_without_ext + ".txt"):
+            export_path_without_ext = "".join([export_path_without_ext, "_app"])
+        return export_path_without_ext
+
+    def __get_pages_to_render(
+        self, pages_of_images: dict[str, int], media_folder_anki: str
+    ) -> dict[int, str]:
+        """The pages whose image is not in the media folder or rendered by this export, with the filename of their image"""
+        filenames_of_pages: dict[int, str] = dict()
+        filename: str
+        page: int
+        for filename, page in pages_of_images.items():
+            if filename in self.__renderings:
+                continue
+            if os.path.exists(os.path.join(media_folder_anki, filename)):
+                self.__num_cached_pages += 1
+                continue
+            filenames_of_pages[page] = filename
+        return filenames_of_pages
+
+    @staticmethod
+    def __get_positions_of_images(
+        runs: list[list[int]], filenames_of_pages: dict[int, str]
+    ) -> dict[str, tuple[int, int]]:
+        """The run and the position in it of every image to render"""
+        positions_of_images: dict[str, tuple[int, int]] = dict()
+        run_index: int
+        run: list[int]
+        for run_index, run in enumerate(runs):
+            page: int
+            for page in run:
+                positions_of_images[filenames_of_pages[page]] = (
+                    run_index,
+                    page - run[0],
+                )
+        return positions_of_images
+
+    def __get_max_started_runs(self, num_runs: int, run_index: int) -> int:
+        """The runs are rendered in order, at most ANKI_EXPORT_PENDING_RUNS_PER_WORKER for every process ahead of run_index, the one of the image written, so the rendered pages waiting to be written stay few"""
+        return min(
+            num_runs,
+            run_index + self.__max_workers * ANKI_EXPORT_PENDING_RUNS_PER_WORKER,
+        )
+
+    def __render_runs_to_images(
+        self,
+        path_of_pdf: str,
+        runs: list[list[int]],
+        filenames_of_pages: dict[int, str],
+        media_folder_anki: str,
+        renderings: list[Future[list[bool]]],
+        run_index: int,
+    ) -> None:
+        """Start rendering the runs not in renderings up to the ones that can be ahead of run_index"""
+        while len(renderings) < self.__get_max_started_runs(len(runs), run_index):
+            run: list[int] = runs[len(renderings)]
+            paths_of_images: list[Optional[str]] = [
+                os.path.join(media_folder_anki, filenames_of_pages[page])
+                if page in filenames_of_pages
+                else None
+                for page in range(run[0], run[-1] + 1)
+            ]
+            rendering: Future[list[bool]] = self.__get_pool().submit(
+                AnkiExport.render_pages_to_images,
+                path_of_pdf,
+                run[0],
+                paths_of_images,
+            )
+            self.__num_render_calls += 1
+            page: int
+            for page in run:
+                self.__renderings[filenames_of_pages[page]] = (rendering, page - run[0])
+                self.__num_rendered_pages += 1
+            renderings.append(rendering)
+
+    @staticmethod
+    def get_runs(
+        pages: list[int], max_workers: int, max_pages_per_run: Optional[int] = None
+    ) -> list[list[int]]:
+        """The pages split in runs of near pages, each rendered by one call of pdftoppm.
+
+        The pages between the ones of a run are rendered and discarded, and the runs are split so all the max_workers processes of the pool are used.
+        """
+        pages = sorted(pages)
+        max_run_length: int = -(-(pages[-1] - pages[0] + 1) // max_workers)
+        if max_pages_per_run is not None:
+            max_run_length = min(max_run_length, max_pages_per_run)
+        runs: list[list[int]] = [[pages[0]]]
+        page: int
+        for page in pages[1:]:
+            run: list[int] = runs[-1]
+            if (
+                page - run[-1] <= ANKI_EXPORT_MAX_PAGES_BETWEEN_RUN_PAGES + 1
+                and page - run[0] < max_run_length
+            ):
+                run.append(page)
+            else:
+                runs.append([page])
+        return runs
+
+    def __get_flashcards_to_export(
+        self, path_of_pdf: str, flashcards_from_pdf_page: Mapping[int, list[Flashcard]]
+    ) -> list[tuple[Flashcard, Optional[str], int]]:
+        """The flashcards in the order of the deck, with the filename of the image of their page and the page"""
+        page_hashes: list[str] = PdfDocumentRegistry.get_page_hashes(
+            path_of_pdf, self.__path_of_db
+        )
+        num_pdf_pages: int = len(page_hashes)
+        flashcards: list[tuple[Flashcard, Optional[str], int]] = []
+        list_flashcards: list[Flashcard]
+        for _, list_flashcards in sorted(
+            flashcards_from_pdf_page.items(), key=lambda x: x[0]
+        ):
+            flashcard: Flashcard
+            for flashcard in list_flashcards:
+                if (
+                    flashcard.get_question_type()
+                    != Flashcard.QuestionType.PAGE_SPECIFIC
+                ):
+                    flashcards.append((flashcard, None, flashcard.get_pdf_page()))
+                    continue
+                # if the reference_page exeeds the boundaries, then it is set to the last pdf page. This can happen when there are old flashcards and a pdf is updated to a pdf with fewer pages
+                page: int = (
+                    flashcard.get_pdf_page()
+                    if flashcard.get_pdf_page() < num_pdf_pages
+                    else num_pdf_pages - 1
+                )
+                flashcards.append(
+                    (
+                        flashcard,
+                        AnkiExport.get_image_filename(page_hashes[page]),
+                        page,
+                    )
+                )
+        return flashcards
+
+    def __save_flashcards_to_anki_package(
+        self,
+        path_of_pdf: str,
+        flashcards_from_pdf_page: Mapping[int, list[Flashcard]],
+    ) -> None:
+        """Add the deck to the package, with the images of its pages not already there"""
+        package: AnkiPackageWriter = cast(AnkiPackageWriter, self.__package)
+        path_of_deck: str = os.path.splitext(path_of_pdf)[0] + ".txt"
+        deck_id: int = package.add_deck(
+            DeckDatabase.get_deck_key(path_of_deck).replace(os.sep, "::")
+        )
+        flashcards: list[
+            tuple[Flashcard, Optional[str], int]
+        ] = self.__get_flashcards_to_export(path_of_pdf, flashcards_from_pdf_page)
+
+        filenames_of_pages: dict[int, str] = dict()
+        # the identical pages have the same image, rendered once
+        filenames_to_render: set[str] = set()
+        flashcard: Flashcard
+        filename: Optional[str]
+        page: int
+        for flashcard, filename, page in flashcards:
+            if filename is None:
+                continue
+            if package.has_media(filename):
+                self.__num_cached_pages += 1
+            elif filename not in filenames_to_render:
+                filenames_to_render.add(filename)
+                filenames_of_pages[page] = filename
+
+        runs: list[list[int]] = []
+        if len(filenames_of_pages) > 0:
+            runs = AnkiExport.get_runs(
+                list(filenames_of_pages.keys()),
+                self.__max_workers,
+                ANKI_EXPORT_PACKAGE_MAX_PAGES_PER_RUN,
+            )
+        positions_of_images: dict[
+            str, tuple[int, int]
+        ] = AnkiExport.__get_positions_of_images(runs, filenames_of_pages)
+        renderings: list[Optional[Future[list[Optional[bytes]]]]] = []
+        num_images_left: list[int] = [len(run) for run in runs]
+
+        for flashcard, filename, page in flashcards:
+            if filename is not None and filename in positions_of_images:
+                run_index: int
+                position: int
+                run_index, position = positions_of_images.pop(filename)
+                while len(renderings) < self.__get_max_started_runs(
+                    len(runs), run_index
+                ):
+                    renderings.append(
+                        self.__render_run_to_bytes(
+                            path_of_pdf, runs[len(renderings)], filenames_of_pages
+                        )
+                    )
+                data: Optional[bytes] = cast(
+                    Future[list[Optional[bytes]]], renderings[run_index]
+                ).result()[position]
+                if data is not None:
+                    package.add_media(filename, data)
+                num_images_left[run_index] -= 1
+                if num_images_left[run_index] == 0:
+                    # the images of the run are in the package
+                    renderings[run_index] = None
+
+            answer: str = flashcard.get_answer()
+            if filename is not None and package.has_media(filename):
+                answer += '<br><img src="' + filename + '">'
+            if package.add_note(
+                deck_id, str(flashcard.get_id()), flashcard.get_question(), answer
+            ):
+                self.__num_exported_flashcards += 1
+        self.__num_flashcards += len(flashcards)
+
+    def __render_run_to_bytes(
+        self, path_of_pdf: str, run: list[int], filenames_of_pages: dict[int, str]
+    ) -> Future[list[Optional[bytes]]]:
+        self.__num_render_calls += 1
+        self.__num_rendered_pages += len(run)
+        return self.__get_pool().submit(
+            AnkiExport.render_pages_to_bytes,
+            path_of_pdf,
+            run[0],
+            [page in filenames_of_pages for page in range(run[0], run[-1] + 1)],
+        )
+
+    @staticmethod
+    def get_image_filename(page_hash: str) -> str:
+        return (
+            page_hash
+            + "_"
+            + str(ANKI_EXPORT_DPI)
+            + "."
+            + ANKI_EXPORT_IMAGE_FORMAT.lower()
+        )
+
+    @staticmethod
+    def render_pages_to_images(
+        path_of_pdf: str, first_page: int, paths_of_images: list[Optional[str]]
+    ) -> list[bool]:
+        """Run by the processes of the pool. Renders the pages from first_page, and moves the image of every page to its path, if it has one.
+
+        The images are written by pdftoppm in the media folder, so they are moved without being decoded. Returns for every page if its image was saved.
+        """
+        directory: str = os.path.dirname(
+            next(path for path in paths_of_images if path is not None)
+        )
+        # an image interrupted while saved is not found by the next exports
+        with tempfile.TemporaryDirectory(dir=directory) as tmp_directory:
+            paths_of_rendered_pages: list[str] = convert_from_path(
+                path_of_pdf,
+                dpi=ANKI_EXPORT_DPI,
+                first_page=first_page + 1,  # base-1
+                last_page=first_page + len(paths_of_images),  # base-1
+                fmt=ANKI_EXPORT_IMAGE_FORMAT.lower(),
+                output_folder=tmp_directory,
+                paths_only=True,
+            )
+            is_saved: list[bool] = [False] * len(paths_of_images)
+            i: int
+            path_of_rendered_page: str
+            # in page order, fewer if the pdf has fewer pages
+            for i, path_of_rendered_page in enumerate(paths_of_rendered_pages):
+                path_of_image: Optional[str] = paths_of_images[i]
+                if path_of_image is not None:
+                    os.replace(path_of_rendered_page, path_of_image)
+                    is_saved[i] = True
+            return is_saved
+
+    @staticmethod
+    def render_pages_to_bytes(
+        path_of_pdf: str, first_page: int, is_page_exported: list[bool]
+    ) -> list[Optional[bytes]]:
+        """Run by the processes of the pool. Renders the pages from first_page, and returns the encoded image of every page that is exported.
+
+        pdftoppm streams the pages to the process, so no file is written.
+        """
+        images: list[PILImage.Image] = convert_from_path(
+            path_of_pdf,
+            dpi=ANKI_EXPORT_DPI,
+            first_page=first_page + 1,  # base-1
+            last_page=first_page + len(is_page_exported),  # base-1
+        )
+        encoded_images: list[Optional[bytes]] = [None] * len(is_page_exported)
+        i: int
+        image: PILImage.Image
+        # in page order, fewer if the pdf has fewer pages
+        for i, image in enumerate(images):
+            if is_page_exported[i]:
+                buffer: BytesIO = BytesIO()
+                image.save(buffer, ANKI_EXPORT_IMAGE_FORMAT)
+                encoded_images[i] = buffer.getvalue()
+        return encoded_images
+
+    def __write_row(
+        self, file: TextIOWrapper, flashcard: Flashcard, filename: Optional[str]
+    ) -> bool:
+        """The image of filename is in the media folder if no rendering of this export has it. Returns False if the image could not be saved"""
+        is_image_saved: bool = False
+        if filename is not None:
+            if filename in self.__renderings:
+                rendering: Future[list[bool]]
+                index: int
+                rendering, index = self.__renderings[filename]
+                is_image_saved = rendering.result()[index]
+            else:
+                is_image_saved = True
+
+        if is_image_saved:
+            file.write(
+                ANKI_FLASHCARDS_SEPARATOR.join(
+                    [
+                        flashcard.get_question(),
+                        '"'
+                        + flashcard.get_answer()
+                        + '<br><img src=""'
+                        + str(filename)
+                        + '"">"\n',
+                    ]
+                )
+            )
+        else:
+            # a generic flashcard, or the reference page do not exists or there are problems with the saving of the image
+            file.write(
+                ANKI_FLASHCARDS_SEPARATOR.join(
+                    [
+                        flashcard.get_question(),
+                        '"' + flashcard.get_answer() + '"\n',
+                    ]
+                )
+            )
+        return filename is None or is_image_saved
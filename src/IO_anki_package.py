@@ -0,0 +1,313 @@
+# Copyright 2022, 2023 Andrea Cucchietti
+# This file is part of flashcards-from-pdf.
+
+# flashcards-from-pdf is free software: you can redistribute it and/or modify it under the terms of the GNU General Public License as published by the Free Software Foundation, either version 3 of the License, or (at your option) any later version.
+
+# flashcards-from-pdf is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License along with flashcards-from-pdf. If not, see <https://www.gnu.org/licenses/>.
+from typing import Any
+import os
+import re
+import json
+import time
+import sqlite3
+import hashlib
+import zipfile
+import tempfile
+
+from application_constants import APPLICATION_NAME
+
+# fields of the notes of the collection
+ANKI_FIELDS_SEPARATOR: str = "\x1f"
+# Anki identifies the note types by their id, so it is the same in all the packages
+ANKI_MODEL_ID: int = 1607392319457
+
+
+class AnkiPackageWriter:
+    """Writes an .apkg file that is imported in Anki with all its decks, flashcards and images.
+
+    The package is a zip archive with the collection, an Anki database of version 11, the media, each stored in an entry named after its number, and the media file, mapping the numbers to the filenames. The media are written in the archive when they are added, so they are never saved on disk. The collection is written in the archive by close.
+    Every flashcard is a note of the basic type, whose guid is the id of the flashcard, so a package imported again updates the notes imported before. A note with the guid of one already in the package is skipped. The note type has always the id ANKI_MODEL_ID and the id of a deck is derived from its name, so the same note type and decks are used by all the imports.
+    """
+
+    def __init__(self, path_of_package: str) -> None:
+        self.__path_of_package: str = path_of_package
+        os.makedirs(os.path.dirname(path_of_package), exist_ok=True)
+        # written with another name until it is complete
+        self.__zip_file: zipfile.ZipFile = zipfile.ZipFile(
+            path_of_package + ".tmp", "w"
+        )
+        self.__tmp_directory: tempfile.TemporaryDirectory = (
+            tempfile.TemporaryDirectory()
+        )
+        self.__con: sqlite3.Connection = sqlite3.connect(
+            os.path.join(self.__tmp_directory.name, "collection.anki2")
+        )
+        AnkiPackageWriter.__create_tables(self.__con)
+
+        self.__creation_time: int = int(time.time())
+        # the ids of the notes and of the cards are creation times in milliseconds, so they are unique
+        self.__next_id: int = int(time.time() * 1000)
+        self.__decks: dict[str, dict[str, Any]] = {
+            "1": AnkiPackageWriter.__get_deck(1, "Default", self.__creation_time)
+        }
+        # number of the media in the archive
+        self.__media: dict[str, str] = dict()
+        self.__media_filenames: set[str] = set()
+        self.__guids: set[str] = set()
+        self.__num_notes: int = 0
+
+    def __get_new_id(self) -> int:
+        self.__next_id += 1
+        return self.__next_id
+
+    @staticmethod
+    def __create_tables(con: sqlite3.Connection) -> None:
+        con.executescript(
+            """CREATE TABLE col (id integer primary key, crt integer not null, mod integer not null, scm integer not null,
+                                 ver integer not null, dty integer not null, usn integer not null, ls integer not null,
+                                 conf text not null, models text not null, decks text not null, dconf text not null, tags text not null);
+            CREATE TABLE notes (id integer primary key, guid text not null, mid integer not null, mod integer not null,
+                                usn integer not null, tags text not null, flds text not null, sfld integer not null,
+                                csum integer not null, flags integer not null, data text not null);
+            CREATE TABLE cards (id integer primary key, nid integer not null, did integer not null, ord integer not null,
+                                mod integer not null, usn integer not null, type integer not null, queue integer not null,
+                                due integer not null, ivl integer not null, factor integer not null, reps integer not null,
+                                lapses integer not null, left integer not null, odue integer not null, odid integer not null,
+                                flags integer not null, data text not null);
+            CREATE TABLE revlog (id integer primary key, cid integer not null, usn integer not null, ease integer not null,
+                                 ivl integer not null, lastIvl integer not null, factor integer not null, time integer not null,
+                                 type integer not null);
+            CREATE TABLE graves (usn integer not null, oid integer not null, type integer not null);
+            CREATE INDEX ix_notes_usn ON notes (usn);
+            CREATE INDEX ix_cards_usn ON cards (usn);
+            CREATE INDEX ix_revlog_usn ON revlog (usn);
+            CREATE INDEX ix_cards_nid ON cards (nid);
+            CREATE INDEX ix_cards_sched ON cards (did, queue, due);
+            CREATE INDEX ix_revlog_cid ON revlog (cid);
+            CREATE INDEX ix_notes_csum ON notes (csum);"""
+        )
+
+    @staticmethod
+    def __get_deck(deck_id: int, name: str, mod: int) -> dict[str, Any]:
+        return {
+            "id": deck_id,
+            "name": name,
+            "desc": "",
+            "mod": mod,
+            "usn": -1,
+            "collapsed": False,
+            "browserCollapsed": False,
+            "newToday": [0, 0],
+            "revToday": [0, 0],
+            "lrnToday": [0, 0],
+            "timeToday": [0, 0],
+            "dyn": 0,
+            "extendNew": 10,
+            "extendRev": 50,
+            "conf": 1,
+        }
+
+    def __get_model(self) -> dict[str, Any]:
+        return {
+            "id": ANKI_MODEL_ID,
+            "name": APPLICATION_NAME,
+            "type": 0,
+            "mod": self.__creation_time,
+            "usn": -1,
+            "sortf": 0,
+            "did": 1,
+            "tmpls": [
+                {
+                    "name": "Card 1",
+                    "ord": 0,
+                    "qfmt": "{{Front}}",
+                    "afmt": "{{FrontSide}}<hr id=answer>{{Back}}",
+                    "did": None,
+                    "bqfmt": "",
+                    "bafmt": "",
+                }
+            ],
+            "flds": [
+                {
+                    "name": name,
+                    "ord": position,
+                    "sticky": False,
+                    "rtl": False,
+                    "font": "Arial",
+                    "size": 20,
+                    "media": [],
+                }
+                for position, name in enumerate(["Front", "Back"])
+            ],
+            "css": ".card { font-family: arial; font-size: 20px; text-align: center; color: black; background-color: white; }",
+            "latexPre": "\\documentclass[12pt]{article}\n\\special{papersize=3in,5in}\n\\usepackage[utf8]{inputenc}\n\\usepackage{amssymb,amsmath}\n\\pagestyle{empty}\n\\setlength{\\parindent}{0in}\n\\begin{document}\n",
+            "latexPost": "\\end{document}",
+            "tags": [],
+            "vers": [],
+            "req": [[0, "all", [0]]],
+        }
+
+    @staticmethod
+    def __get_deck_options() -> dict[str, Any]:
+        return {
+            "1": {
+                "id": 1,
+                "name": "Default",
+                "mod": 0,
+                "usn": 0,
+                "maxTaken": 60,
+                "autoplay": True,
+                "timer": 0,
+                "replayq": True,
+                "dyn": False,
+                "new": {
+                    "delays": [1, 10],
+                    "ints": [1, 4, 7],
+                    "initialFactor": 2500,
+                    "separate": True,
+                    "order": 1,
+                    "perDay": 20,
+                    "bury": False,
+                },
+                "rev": {
+                    "perDay": 200,
+                    "ease4": 1.3,
+                    "fuzz": 0.05,
+                    "minSpace": 1,
+                    "ivlFct": 1,
+                    "maxIvl": 36500,
+                    "bury": False,
+                    "hardFactor": 1.2,
+                },
+                "lapse": {
+                    "delays": [10],
+                    "mult": 0,
+                    "minInt": 1,
+                    "leechFails": 8,
+                    "leechAction": 0,
+                },
+            }
+        }
+
+    def add_deck(self, name: str) -> int:
+        """Returns the id of the deck with name, the subdecks are separated by ::"""
+        deck: dict[str, Any]
+        for deck in self.__decks.values():
+            if deck["name"] == name:
+                return deck["id"]
+        deck_id: int = AnkiPackageWriter.get_deck_id(name)
+        self.__decks[str(deck_id)] = AnkiPackageWriter.__get_deck(
+            deck_id, name, self.__creation_time
+        )
+        return deck_id
+
+    @staticmethod
+    def get_deck_id(name: str) -> int:
+        """The same for every package, positive and different from the id of the default deck"""
+        return (
+            int.from_bytes(hashlib.sha256(name.encode("utf-8")).digest()[:6], "big")
+            + 2
+        )
+
+    def has_media(self, filename: str) -> bool:
+        return filename in self.__media_filenames
+
+    def add_media(self, filename: str, data: bytes) -> None:
+        if self.has_media(filename):
+            return
+        number: str = str(len(self.__media))
+        # the images are already compressed
+        self.__zip_file.writestr(number, data, zipfile.ZIP_STORED)
+        self.__media[number] = filename
+        self.__media_filenames.add(filename)
+
+    def add_note(self, deck_id: int, guid: str, question: str, answer: str) -> bool:
+        """Returns False if the package has already a note with guid, that is kept"""
+        if guid in self.__guids:
+            return False
+        self.__guids.add(guid)
+        note_id: int = self.__get_new_id()
+        # the sort field and its checksum are computed on the text without html
+        sort_field: str = re.sub(r"<[^>]*>", "", question)
+        self.__con.execute(
+            "INSERT INTO notes VALUES (?, ?, ?, ?, -1, '', ?, ?, ?, 0, '')",
+            (
+                note_id,
+                guid,
+                ANKI_MODEL_ID,
+                self.__creation_time,
+                question + ANKI_FIELDS_SEPARATOR + answer,
+                sort_field,
+                int(hashlib.sha1(sort_field.encode("utf-8")).hexdigest()[:8], 16),
+            ),
+        )
+        self.__con.execute(
+            "INSERT INTO cards VALUES (?, ?, ?, 0, ?, -1, 0, 0, ?, 0, 0, 0, 0, 0, 0, 0, 0, '')",
+            (
+                self.__get_new_id(),
+                note_id,
+                deck_id,
+                self.__creation_time,
+                # new cards are shown in the order they were added
+                self.__num_notes,
+            ),
+        )
+        self.__num_notes += 1
+        return True
+
+    def get_num_notes(self) -> int:
+        return self.__num_notes
+
+    def close(self) -> None:
+        """Write the collection and the media file, and move the package to its path"""
+        try:
+            with self.__con:
+                self.__con.execute(
+                    "INSERT INTO col VALUES (1, ?, ?, ?, 11, 0, 0, 0, ?, ?, ?, ?, '{}')",
+                    (
+                        self.__creation_time,
+                        self.__creation_time * 1000,
+                        self.__creation_time * 1000,
+                        json.dumps(
+                            {
+                                "activeDecks": [1],
+                                "curDeck": 1,
+                                "newSpread": 0,
+                                "collapseTime": 1200,
+                                "timeLim": 0,
+                                "estTimes": True,
+                                "dueCounts": True,
+                                "curModel": str(ANKI_MODEL_ID),
+                                "nextPos": self.__num_notes + 1,
+                                "sortType": "noteFld",
+                                "sortBackwards": False,
+                                "addToCur": True,
+                            }
+                        ),
+                        json.dumps({str(ANKI_MODEL_ID): self.__get_model()}),
+                        json.dumps(self.__decks),
+                        json.dumps(AnkiPackageWriter.__get_deck_options()),
+                    ),
+                )
+            self.__con.close()
+            self.__zip_file.write(
+                os.path.join(self.__tmp_directory.name, "collection.anki2"),
+                "collection.anki2",
+                zipfile.ZIP_DEFLATED,
+            )
+            self.__zip_file.writestr(
+                "media", json.dumps(self.__media), zipfile.ZIP_DEFLATED
+            )
+            self.__zip_file.close()
+            os.replace(self.__path_of_package + ".tmp", self.__path_of_package)
+        finally:
+            self.__tmp_directory.cleanup()
+
+    def discard(self) -> None:
+        """Close the package without writing it, after an error"""
+        self.__con.close()
+        self.__zip_file.close()
+        os.remove(self.__path_of_package + ".tmp")
+        self.__tmp_directory.cleanup()
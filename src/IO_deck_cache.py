@@ -0,0 +1,233 @@
+# Copyright 2022, 2023 Andrea Cucchietti
+# This file is part of flashcards-from-pdf.
+
+# flashcards-from-pdf is free software: you can redistribute it and/or modify it under the terms of the GNU General Public License as published by the Free Software Foundation, either version 3 of the License, or (at your option) any later version.
+
+# flashcards-from-pdf is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License along with flashcards-from-pdf. If not, see <https://www.gnu.org/licenses/>.
+import os
+import struct
+import hashlib
+from collections.abc import Mapping
+from typing import Optional
+
+from flashcard.flashcard import Flashcard
+from test_management.pdf_test_info import PDFTestsInfo
+from application_constants import DECK_CACHE_EXTENSION
+
+
+class DeckCache:
+    """Binary copy of a parsed deck, stored next to its .txt file.
+
+    The cache is valid only while the .txt file has the same size and either the same modification time or the same content hash. In any other case, or if the cache cannot be decoded, load returns None and the .txt file has to be parsed.
+    """
+
+    MAGIC: bytes = b"FFPD"
+    VERSION: int = 2
+    # magic, version, mtime_ns, size, hash of the .txt file
+    HEADER: struct.Struct = struct.Struct("<4sHqq16s")
+    # first pass flag, number of completed tests
+    TESTS_INFO: struct.Struct = struct.Struct("<BI")
+    PERCENTAGE: struct.Struct = struct.Struct("<d")
+    # id, reference page, question type, current result
+    FLASHCARD: struct.Struct = struct.Struct("<qiBB")
+    LENGTH: struct.Struct = struct.Struct("<I")
+
+    @staticmethod
+    def get_cache_path(path_of_txt: str) -> str:
+        # the leading dot hides the file from the decks tree
+        directory, basename = os.path.split(path_of_txt)
+        basename_without_ext, _ = os.path.splitext(basename)
+        return os.path.join(directory, "." + basename_without_ext + DECK_CACHE_EXTENSION)
+
+    @staticmethod
+    def get_file_hash(path_of_file: str) -> bytes:
+        file_hash = hashlib.blake2b(digest_size=16)
+        with open(path_of_file, "rb") as file:
+            for chunk in iter(lambda: file.read(1 << 20), b""):
+                file_hash.update(chunk)
+        return file_hash.digest()
+
+    @staticmethod
+    def load(
+        path_of_txt: str,
+    ) -> Optional[tuple[PDFTestsInfo, dict[int, list[Flashcard]]]]:
+        try:
+            with open(DeckCache.get_cache_path(path_of_txt), "rb") as file:
+                data: bytes = file.read()
+            if not DeckCache.__is_valid(data, path_of_txt):
+                return None
+            return DeckCache.__decode(memoryview(data), DeckCache.HEADER.size)
+        except (OSError, struct.error, ValueError, UnicodeDecodeError):
+            return None
+
+    @staticmethod
+    def save(
+        path_of_txt: str,
+        pdf_test_info: PDFTestsInfo,
+        flashcards: Mapping[int, list[Flashcard]],
+    ) -> None:
+        DeckCache.write(path_of_txt, DeckCache.encode(pdf_test_info, flashcards))
+
+    @staticmethod
+    def encode(
+        pdf_test_info: PDFTestsInfo, flashcards: Mapping[int, list[Flashcard]]
+    ) -> bytes:
+        """Returns the content of the cache without the header, that depends on the .txt file and it is added by write"""
+        parts: list[bytes] = []
+        DeckCache.__encode(parts, pdf_test_info, flashcards)
+        return b"".join(parts)
+
+    @staticmethod
+    def write(path_of_txt: str, content: bytes) -> None:
+        cache_path: str = DeckCache.get_cache_path(path_of_txt)
+        try:
+            stat_result: os.stat_result = os.stat(path_of_txt)
+            header: bytes = DeckCache.HEADER.pack(
+                DeckCache.MAGIC,
+                DeckCache.VERSION,
+                stat_result.st_mtime_ns,
+                stat_result.st_size,
+                DeckCache.get_file_hash(path_of_txt),
+            )
+
+            with open(cache_path + ".tmp", "wb") as file:
+                file.write(header)
+                file.write(content)
+            os.replace(cache_path + ".tmp", cache_path)
+        except OSError:
+            # the cache is only an optimization, the .txt file is always the reference
+            pass
+
+    @staticmethod
+    def __is_valid(data: bytes, path_of_txt: str) -> bool:
+        magic: bytes
+        version: int
+        mtime_ns: int
+        size: int
+        file_hash: bytes
+        magic, version, mtime_ns, size, file_hash = DeckCache.HEADER.unpack_from(data)
+        if magic != DeckCache.MAGIC or version != DeckCache.VERSION:
+            return False
+
+        stat_result: os.stat_result = os.stat(path_of_txt)
+        if stat_result.st_size != size:
+            return False
+        if stat_result.st_mtime_ns == mtime_ns:
+            return True
+        # the file was touched, it is still valid if the content did not change
+        return DeckCache.get_file_hash(path_of_txt) == file_hash
+
+    @staticmethod
+    def __encode(
+        parts: list[bytes],
+        pdf_test_info: PDFTestsInfo,
+        flashcards: Mapping[int, list[Flashcard]],
+    ) -> None:
+        completed_tests: dict[str, float] = pdf_test_info.get_completed_tests()
+        parts.append(
+            DeckCache.TESTS_INFO.pack(
+                pdf_test_info.get_first_pass_flag().value, len(completed_tests)
+            )
+        )
+        date: str
+        percentage: float
+        for date, percentage in completed_tests.items():
+            DeckCache.__encode_string(parts, date)
+            parts.append(DeckCache.PERCENTAGE.pack(percentage))
+
+        num_flashcards: int = sum(len(x) for x in flashcards.values())
+        parts.append(DeckCache.LENGTH.pack(num_flashcards))
+        list_flashcards: list[Flashcard]
+        for _, list_flashcards in sorted(flashcards.items(), key=lambda x: x[0]):
+            for flashcard in list_flashcards:
+                parts.append(
+                    DeckCache.FLASHCARD.pack(
+                        flashcard.get_id(),
+                        flashcard.get_reference_page(),
+                        flashcard.get_question_type().value,
+                        flashcard.get_current_result().value,
+                    )
+                )
+                past_results: bytes = flashcard.get_packed_past_results()
+                parts.append(DeckCache.LENGTH.pack(len(past_results)))
+                parts.append(past_results)
+                DeckCache.__encode_string(parts, flashcard.get_question())
+                DeckCache.__encode_string(parts, flashcard.get_answer())
+
+    @staticmethod
+    def __encode_string(parts: list[bytes], string: str) -> None:
+        encoded: bytes = string.encode("utf-8")
+        parts.append(DeckCache.LENGTH.pack(len(encoded)))
+        parts.append(encoded)
+
+    @staticmethod
+    def __decode(
+        data: memoryview, offset: int
+    ) -> tuple[PDFTestsInfo, dict[int, list[Flashcard]]]:
+        pdf_test_info: PDFTestsInfo = PDFTestsInfo()
+        first_pass_flag: int
+        num_tests: int
+        first_pass_flag, num_tests = DeckCache.TESTS_INFO.unpack_from(data, offset)
+        offset += DeckCache.TESTS_INFO.size
+        pdf_test_info.set_first_pass_flag(PDFTestsInfo.FirstPass(first_pass_flag))
+        completed_tests: dict[str, float] = pdf_test_info.get_completed_tests()
+        for _ in range(num_tests):
+            date: str
+            date, offset = DeckCache.__decode_string(data, offset)
+            completed_tests[date] = DeckCache.PERCENTAGE.unpack_from(data, offset)[0]
+            offset += DeckCache.PERCENTAGE.size
+
+        flashcards: dict[int, list[Flashcard]] = dict()
+        num_flashcards: int = DeckCache.LENGTH.unpack_from(data, offset)[0]
+        offset += DeckCache.LENGTH.size
+        for _ in range(num_flashcards):
+            flashcard_id: int
+            reference_page: int
+            question_type: int
+            current_result: int
+            (
+                flashcard_id,
+                reference_page,
+                question_type,
+                current_result,
+            ) = DeckCache.FLASHCARD.unpack_from(data, offset)
+            offset += DeckCache.FLASHCARD.size
+
+            num_past_results: int = DeckCache.LENGTH.unpack_from(data, offset)[0]
+            offset += DeckCache.LENGTH.size
+            past_results: bytes = bytes(data[offset : offset + num_past_results])
+            offset += num_past_results
+
+            question: str
+            answer: str
+            question, offset = DeckCache.__decode_string(data, offset)
+            answer, offset = DeckCache.__decode_string(data, offset)
+
+            flashcard: Flashcard = Flashcard(
+                question,
+                answer,
+                Flashcard.QuestionType(question_type),
+                reference_page=reference_page,
+                current_result=Flashcard.Result(current_result),
+                flashcard_id=flashcard_id,
+            )
+            flashcard.set_packed_past_results(past_results)
+            if reference_page in flashcards:
+                flashcards[reference_page].append(flashcard)
+            else:
+                flashcards[reference_page] = [flashcard]
+
+        if offset != len(data):
+            raise ValueError("Unexpected data at the end of the deck cache")
+
+        return (pdf_test_info, flashcards)
+
+    @staticmethod
+    def __decode_string(data: memoryview, offset: int) -> tuple[str, int]:
+        length: int = DeckCache.LENGTH.unpack_from(data, offset)[0]
+        offset += DeckCache.LENGTH.size
+        if offset + length > len(data):
+            raise ValueError("Truncated deck cache")
+        return (str(data[offset : offset + length], "utf-8"), offset + length)
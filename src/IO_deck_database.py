@@ -0,0 +1,269 @@
+# Copyright 2022, 2023 Andrea Cucchietti
+# This file is part of flashcards-from-pdf.
+
+# flashcards-from-pdf is free software: you can redistribute it and/or modify it under the terms of the GNU General Public License as published by the Free Software Foundation, either version 3 of the License, or (at your option) any later version.
+
+# flashcards-from-pdf is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License along with flashcards-from-pdf. If not, see <https://www.gnu.org/licenses/>.
+from collections.abc import Mapping, MutableMapping
+from typing import Optional, Iterable
+from datetime import datetime
+import sqlite3
+import os
+import weakref
+
+from flashcard.flashcard import Flashcard
+from IO_flashcards_management import IOFlashcards
+from test_management.pdf_test_info import PDFTestsInfo
+from application_constants import PRIVATE_DB_FILENAME, PATH_TO_DECKS_ABS
+
+
+class DeckDatabase:
+    """Storage of a deck in the private SQLite database, as an alternative to the .txt file.
+
+    A deck is stored in the database only after import_deck, from then on it is loaded from the database and every change updates only its rows. export_deck writes the .txt file back.
+    The save methods are the same of DeckWriter, so the two can be used interchangeably by the deck window.
+    """
+
+    DATE_FORMAT: str = "%Y/%m/%d_%H:%M:%S"
+
+    def __init__(self, path_of_txt: str, path_of_db: Optional[str] = None) -> None:
+        if path_of_db is None:
+            path_of_db = DeckDatabase.get_db_path()
+        # the deck window loads the deck on a worker thread and then uses it only on the GUI thread
+        self.__con: sqlite3.Connection = sqlite3.connect(
+            path_of_db, check_same_thread=False
+        )
+        self.__con.execute("PRAGMA foreign_keys = ON")
+        DeckDatabase.create_tables(self.__con)
+        self.__deck_key: str = DeckDatabase.get_deck_key(path_of_txt)
+        self.__deck_id: Optional[int] = self.__get_deck_id()
+        # row id of every flashcard loaded or saved
+        self.__row_ids: weakref.WeakKeyDictionary[
+            Flashcard, int
+        ] = weakref.WeakKeyDictionary()
+
+    @staticmethod
+    def get_db_path() -> str:
+        return os.path.join(PATH_TO_DECKS_ABS, PRIVATE_DB_FILENAME)
+
+    @staticmethod
+    def get_deck_key(path_of_txt: str) -> str:
+        # the decks are identified by their position in the data folder, so the folder can be moved
+        path_without_ext: str
+        path_without_ext, _ = os.path.splitext(os.path.abspath(path_of_txt))
+        return os.path.relpath(path_without_ext, PATH_TO_DECKS_ABS)
+
+    @staticmethod
+    def create_tables(con: sqlite3.Connection) -> None:
+        con.executescript(
+            """CREATE TABLE IF NOT EXISTS deck (id integer primary key autoincrement,
+                                                path text NOT NULL UNIQUE,
+                                                first_pass integer NOT NULL);
+            CREATE TABLE IF NOT EXISTS completed_test (deck_id integer NOT NULL REFERENCES deck(id) ON DELETE CASCADE,
+                                                       date text NOT NULL,
+                                                       percentage real NOT NULL);
+            CREATE INDEX IF NOT EXISTS completed_test_deck ON completed_test(deck_id);
+            CREATE TABLE IF NOT EXISTS flashcard (id integer primary key autoincrement,
+                                                  deck_id integer NOT NULL REFERENCES deck(id) ON DELETE CASCADE,
+                                                  reference_page integer NOT NULL,
+                                                  position integer NOT NULL,
+                                                  question text NOT NULL,
+                                                  answer text NOT NULL,
+                                                  question_type integer NOT NULL,
+                                                  past_results text NOT NULL,
+                                                  current_result integer NOT NULL,
+                                                  card_id integer);
+            CREATE INDEX IF NOT EXISTS flashcard_deck_page ON flashcard(deck_id, reference_page, position);"""
+        )
+        # the databases created before the flashcards had an id
+        columns: list[str] = [
+            row[1] for row in con.execute("PRAGMA table_info(flashcard)")
+        ]
+        if "card_id" not in columns:
+            con.execute("ALTER TABLE flashcard ADD COLUMN card_id integer")
+
+    def is_deck_stored(self) -> bool:
+        return self.__deck_id is not None
+
+    def close(self) -> None:
+        self.__con.close()
+
+    def needs_compaction(self) -> bool:
+        return False
+
+    def get_num_pending_writes(self) -> int:
+        # the rows are written synchronously
+        return 0
+
+    def import_deck(self, path_of_txt: str) -> None:
+        """Copy the deck from its .txt file. The .txt file is left as it is"""
+        pdf_test_info: PDFTestsInfo
+        flashcards: MutableMapping[int, list[Flashcard]]
+        pdf_test_info, flashcards = IOFlashcards.load_deck(path_of_txt)
+        with self.__con:
+            if self.__deck_id is None:
+                cur: sqlite3.Cursor = self.__con.execute(
+                    "INSERT INTO deck (path, first_pass) VALUES (?, ?)",
+                    (self.__deck_key, pdf_test_info.get_first_pass_flag().value),
+                )
+                self.__deck_id = cur.lastrowid
+            self.__save_deck(pdf_test_info, flashcards)
+
+    def export_deck(self, path_of_txt: str) -> None:
+        pdf_test_info: PDFTestsInfo
+        flashcards: dict[int, list[Flashcard]]
+        pdf_test_info, flashcards = self.load_deck()
+        IOFlashcards.save_flashcards_file(
+            path_of_txt,
+            pdf_test_info,
+            sum(len(x) for x in flashcards.values()),
+            flashcards,
+        )
+
+    def remove_deck(self) -> None:
+        with self.__con:
+            self.__con.execute("DELETE FROM deck WHERE id = ?", (self.__deck_id,))
+        self.__deck_id = None
+
+    def load_deck(self) -> tuple[PDFTestsInfo, dict[int, list[Flashcard]]]:
+        pdf_test_info: PDFTestsInfo = PDFTestsInfo()
+        first_pass: int = self.__con.execute(
+            "SELECT first_pass FROM deck WHERE id = ?", (self.__deck_id,)
+        ).fetchone()[0]
+        pdf_test_info.set_first_pass_flag(PDFTestsInfo.FirstPass(first_pass))
+        date: str
+        percentage: float
+        for date, percentage in self.__con.execute(
+            "SELECT date, percentage FROM completed_test WHERE deck_id = ? ORDER BY rowid",
+            (self.__deck_id,),
+        ):
+            pdf_test_info.add_completed_test(
+                datetime.strptime(date, DeckDatabase.DATE_FORMAT), percentage
+            )
+
+        flashcards: dict[int, list[Flashcard]] = dict()
+        for row in self.__con.execute(
+            """SELECT id, reference_page, question, answer, question_type, past_results, current_result, card_id
+            FROM flashcard WHERE deck_id = ? ORDER BY reference_page, position""",
+            (self.__deck_id,),
+        ):
+            flashcard: Flashcard = Flashcard(
+                question=row[2],
+                answer=row[3],
+                question_type=Flashcard.QuestionType(row[4]),
+                past_results=[Flashcard.Result(int(x)) for x in row[5]],
+                reference_page=row[1],
+                current_result=Flashcard.Result(row[6]),
+                # a new id is given to the flashcards saved before the ids were introduced
+                flashcard_id=row[7],
+            )
+            self.__row_ids[flashcard] = row[0]
+            flashcards.setdefault(flashcard.get_reference_page(), []).append(flashcard)
+
+        return (pdf_test_info, flashcards)
+
+    def save_deck(
+        self,
+        pdf_test_info: PDFTestsInfo,
+        num_flashcards: int,
+        flashcards: Mapping[int, list[Flashcard]],
+    ) -> None:
+        with self.__con:
+            self.__save_deck(pdf_test_info, flashcards)
+
+    def save_pages(
+        self,
+        pdf_test_info: PDFTestsInfo,
+        flashcards_of_pages: dict[int, list[Flashcard]],
+    ) -> None:
+        with self.__con:
+            self.__save_tests_info(pdf_test_info)
+            page: int
+            list_flashcards: list[Flashcard]
+            for page, list_flashcards in flashcards_of_pages.items():
+                self.__con.execute(
+                    "DELETE FROM flashcard WHERE deck_id = ? AND reference_page = ?",
+                    (self.__deck_id, page),
+                )
+                self.__insert_flashcards(list_flashcards)
+
+    def save_flashcard_result(
+        self, pdf_test_info: PDFTestsInfo, flashcard: Flashcard
+    ) -> None:
+        row_id: Optional[int] = self.__row_ids.get(flashcard)
+        if row_id is None:
+            self.save_pages(
+                pdf_test_info, {flashcard.get_reference_page(): [flashcard]}
+            )
+            return
+
+        with self.__con:
+            self.__save_tests_info(pdf_test_info)
+            self.__con.execute(
+                "UPDATE flashcard SET current_result = ? WHERE id = ?",
+                (flashcard.get_current_result().value, row_id),
+            )
+
+    def __get_deck_id(self) -> Optional[int]:
+        row: Optional[tuple] = self.__con.execute(
+            "SELECT id FROM deck WHERE path = ?", (self.__deck_key,)
+        ).fetchone()
+        if row is None:
+            return None
+        return row[0]
+
+    def __save_deck(
+        self, pdf_test_info: PDFTestsInfo, flashcards: Mapping[int, list[Flashcard]]
+    ) -> None:
+        self.__save_tests_info(pdf_test_info)
+        self.__con.execute("DELETE FROM flashcard WHERE deck_id = ?", (self.__deck_id,))
+        list_flashcards: list[Flashcard]
+        for _, list_flashcards in sorted(flashcards.items(), key=lambda x: x[0]):
+            self.__insert_flashcards(list_flashcards)
+
+    def __save_tests_info(self, pdf_test_info: PDFTestsInfo) -> None:
+        self.__con.execute(
+            "UPDATE deck SET first_pass = ? WHERE id = ?",
+            (pdf_test_info.get_first_pass_flag().value, self.__deck_id),
+        )
+        completed_tests: dict[str, float] = pdf_test_info.get_completed_tests()
+        num_saved_tests: int = self.__con.execute(
+            "SELECT COUNT(*) FROM completed_test WHERE deck_id = ?", (self.__deck_id,)
+        ).fetchone()[0]
+        if num_saved_tests == len(completed_tests):
+            return
+
+        # the completed tests are only added, but they are few so they are rewritten
+        self.__con.execute(
+            "DELETE FROM completed_test WHERE deck_id = ?", (self.__deck_id,)
+        )
+        self.__con.executemany(
+            "INSERT INTO completed_test (deck_id, date, percentage) VALUES (?, ?, ?)",
+            [
+                (self.__deck_id, date, percentage)
+                for date, percentage in completed_tests.items()
+            ],
+        )
+
+    def __insert_flashcards(self, list_flashcards: Iterable[Flashcard]) -> None:
+        position: int
+        flashcard: Flashcard
+        for position, flashcard in enumerate(list_flashcards):
+            cur: sqlite3.Cursor = self.__con.execute(
+                """INSERT INTO flashcard (deck_id, reference_page, position, question, answer, question_type, past_results, current_result, card_id)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                (
+                    self.__deck_id,
+                    flashcard.get_reference_page(),
+                    position,
+                    flashcard.get_question(),
+                    flashcard.get_answer(),
+                    flashcard.get_question_type().value,
+                    "".join(str(x) for x in flashcard.get_packed_past_results()),
+                    flashcard.get_current_result().value,
+                    flashcard.get_id(),
+                ),
+            )
+            self.__row_ids[flashcard] = cur.lastrowid
@@ -0,0 +1,199 @@
+# Copyright 2022, 2023 Andrea Cucchietti
+# This file is part of flashcards-from-pdf.
+
+# flashcards-from-pdf is free software: you can redistribute it and/or modify it under the terms of the GNU General Public License as published by the Free Software Foundation, either version 3 of the License, or (at your option) any later version.
+
+# flashcards-from-pdf is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License along with flashcards-from-pdf. If not, see <https://www.gnu.org/licenses/>.
+from io import TextIOWrapper
+from collections.abc import Mapping
+from typing import Iterable, Iterator
+from datetime import datetime
+import os
+
+from flashcard.flashcard import Flashcard
+from test_management.pdf_test_info import PDFTestsInfo
+from application_constants import TYPE_QUEST_PAGE_SPECIFIC_CONSTANT
+from application_constants import NO_ANSWER_FLAG
+from application_constants import FILE_FLASHCARDS_SEPARATOR
+from application_constants import NUM_SEPARATORS_PER_RECORD
+from application_constants import NUM_SEPARATORS_PER_RECORD_V1
+from application_constants import DECK_FORMAT_VERSION
+
+
+class DeckFormat:
+    """Text format of the decks. It is described in the "Technical details" section of the README"""
+
+    VERSION_PREFIX: str = "v"
+
+    @staticmethod
+    def read_version(file: TextIOWrapper) -> int:
+        """Read the version line at the beginning of a deck. The files of version 1 do not have it, in that case nothing is read"""
+        position: int = file.tell()
+        line: str = file.readline()
+        if line.startswith(DeckFormat.VERSION_PREFIX):
+            return int(line[len(DeckFormat.VERSION_PREFIX) :])
+        file.seek(position)
+        return 1
+
+    @staticmethod
+    def get_num_separators_per_record(version: int) -> int:
+        if version == 1:
+            return NUM_SEPARATORS_PER_RECORD_V1
+        return NUM_SEPARATORS_PER_RECORD
+
+    @staticmethod
+    def read_tests_info(file: TextIOWrapper) -> PDFTestsInfo:
+        """The version line of a deck has to be already read"""
+        pdf_test_info: PDFTestsInfo = PDFTestsInfo()
+        num_test: int = int(file.readline())
+        for i in range(0, num_test):
+            fields: list[str] = file.readline().split(FILE_FLASHCARDS_SEPARATOR)
+            pdf_test_info.add_completed_test(
+                datetime.strptime(fields[0].strip(), "%Y/%m/%d_%H:%M:%S"),
+                float(fields[1]),
+            )
+
+        if int(file.readline()) == PDFTestsInfo.FirstPass.TRUE.value:
+            pdf_test_info.set_first_pass_flag(PDFTestsInfo.FirstPass.TRUE)
+        else:
+            pdf_test_info.set_first_pass_flag(PDFTestsInfo.FirstPass.FALSE)
+
+        return pdf_test_info
+
+    @staticmethod
+    def iter_flashcards_from_lines(
+        lines: Iterable[str], version: int = DECK_FORMAT_VERSION
+    ) -> Iterator[Flashcard]:
+        """The flashcards of version 1 get a new id"""
+        # a field can have a \n, so a record can span multiple lines. The separators are counted only on the line just read and the record is split once it is complete, so every character is scanned a constant number of times
+        num_separators_per_record: int = DeckFormat.get_num_separators_per_record(
+            version
+        )
+        record_lines: list[str] = []
+        num_separators: int = 0
+        line: str
+        for line in lines:
+            record_lines.append(line)
+            num_separators += line.count(FILE_FLASHCARDS_SEPARATOR)
+            if num_separators < num_separators_per_record:
+                continue
+
+            flashcard: Flashcard = Flashcard()
+            num_col: int
+            word: str
+            for num_col, word in enumerate(
+                "".join(record_lines).split(FILE_FLASHCARDS_SEPARATOR)
+            ):
+                DeckFormat.__manage_flashcard_field(num_col, word, flashcard)
+
+            record_lines = []
+            num_separators = 0
+            yield flashcard
+
+    @staticmethod
+    def skip_tests_info(file: TextIOWrapper) -> int:
+        """Returns the version of the deck"""
+        version: int = DeckFormat.read_version(file)
+        num_completed_tests: int = int(file.readline())
+        for i in range(0, num_completed_tests):
+            file.readline()
+        # ongoing test flag
+        file.readline()
+        return version
+
+    @staticmethod
+    def __manage_flashcard_field(
+        num_col: int, string: str, flashcard: Flashcard
+    ) -> None:
+        string = string.strip()
+        match num_col:
+            case 0:
+                # Page number
+                flashcard.set_reference_page_from_visualization(int(string))
+
+            case 1:
+                # flashcard
+                flashcard.set_question(string)
+
+            case 2:
+                # Answer
+                if string == NO_ANSWER_FLAG:
+                    flashcard.set_answer("")
+                else:
+                    flashcard.set_answer(string)
+
+            case 3:
+                # Type
+                type_quest_str: str = string
+                if type_quest_str == TYPE_QUEST_PAGE_SPECIFIC_CONSTANT:
+                    flashcard.set_question_type(Flashcard.QuestionType.PAGE_SPECIFIC)
+                else:
+                    flashcard.set_question_type(Flashcard.QuestionType.GENERIC)
+
+            case 4:
+                # Past results
+                char: str
+                flashcard.set_packed_past_results(
+                    bytes(
+                        Flashcard.Result.NOT_DONE.value
+                        if char == "1"
+                        else Flashcard.Result.STILL_LEARNING.value
+                        if char == "0"
+                        else Flashcard.Result.KNOW.value
+                        for char in string
+                    )
+                )
+
+            case 5:
+                # current result
+                current_result: Flashcard.Result = Flashcard.Result.NOT_DONE
+                if string != "":
+                    match int(string):
+                        case Flashcard.Result.STILL_LEARNING.value:
+                            current_result = Flashcard.Result.STILL_LEARNING
+                        case Flashcard.Result.NOT_DONE.value:
+                            current_result = Flashcard.Result.NOT_DONE
+                        case Flashcard.Result.KNOW.value:
+                            current_result = Flashcard.Result.KNOW
+
+                flashcard.set_current_result(current_result)
+
+            case 6:
+                # id, in version 1 this is the empty field after the last separator
+                if string != "":
+                    flashcard.set_id(int(string))
+
+    @staticmethod
+    def get_flashcard_record(flashcard: Flashcard) -> str:
+        return FILE_FLASHCARDS_SEPARATOR.join([flashcard.to_string(), "\n"])
+
+    @staticmethod
+    def get_deck_content(
+        pdf_test_info: PDFTestsInfo,
+        num_flashcards: int,
+        flashcards: Mapping[int, list[Flashcard]],
+    ) -> str:
+        content: list[str] = [
+            DeckFormat.VERSION_PREFIX + str(DECK_FORMAT_VERSION) + "\n",
+            pdf_test_info.to_string(),
+            str(num_flashcards) + "\n",
+        ]
+
+        list_flashcards: list[Flashcard]
+        reference_page: int
+        for reference_page, list_flashcards in sorted(
+            flashcards.items(), key=lambda x: x[0]
+        ):
+            for flashcard in list_flashcards:
+                content.append(DeckFormat.get_flashcard_record(flashcard))
+
+        return "".join(content)
+
+    @staticmethod
+    def write_deck_file(path_of_txt: str, content: str) -> None:
+        # the new content is written aside and then it replaces the old file in a single step, so an interrupted write never leaves a truncated deck
+        with open(path_of_txt + ".tmp", "w", encoding="utf-8") as file:
+            file.write(content)
+        os.replace(path_of_txt + ".tmp", path_of_txt)
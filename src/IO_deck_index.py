@@ -0,0 +1,313 @@
+# Copyright 2022, 2023 Andrea Cucchietti
+# This file is part of flashcards-from-pdf.
+
+# flashcards-from-pdf is free software: you can redistribute it and/or modify it under the terms of the GNU General Public License as published by the Free Software Foundation, either version 3 of the License, or (at your option) any later version.
+
+# flashcards-from-pdf is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License along with flashcards-from-pdf. If not, see <https://www.gnu.org/licenses/>.
+from collections.abc import MutableMapping
+from io import StringIO
+from typing import Iterator, Optional
+import mmap
+import os
+import struct
+
+from flashcard.flashcard import Flashcard
+from IO_deck_format import DeckFormat
+from application_constants import DECK_INDEX_EXTENSION
+from application_constants import DECK_LAZY_LOADING_MIN_SIZE
+from application_constants import FILE_FLASHCARDS_SEPARATOR
+from application_constants import NUM_SEPARATORS_PER_RECORD
+from application_constants import DECK_FORMAT_VERSION
+
+
+class DeckIndexEntry:
+    def __init__(
+        self, start: int, end: int, num_results: tuple[int, int, int]
+    ) -> None:
+        self.__start: int = start
+        self.__end: int = end
+        # number of flashcards for every Flashcard.Result, indexed by its value
+        self.__num_results: tuple[int, int, int] = num_results
+
+    def get_start(self) -> int:
+        return self.__start
+
+    def get_end(self) -> int:
+        return self.__end
+
+    def get_num_results(self) -> tuple[int, int, int]:
+        return self.__num_results
+
+    def get_num_flashcards(self) -> int:
+        return sum(self.__num_results)
+
+
+class DeckIndex:
+    """Byte range of the records of every page of a deck, stored next to its .txt file.
+
+    The records are saved sorted by page, so the records of a page are contiguous. The index is valid only while the .txt file has the same size and modification time.
+    """
+
+    MAGIC: bytes = b"FFPI"
+    VERSION: int = 2
+    # magic, version, mtime_ns, size of the .txt file, number of entries
+    HEADER: struct.Struct = struct.Struct("<4sHqqI")
+    # page, start, end, number of flashcards still learning, not done and known
+    ENTRY: struct.Struct = struct.Struct("<iQQIII")
+
+    def __init__(self, entries: dict[int, DeckIndexEntry]) -> None:
+        self.__entries: dict[int, DeckIndexEntry] = entries
+
+    def get_entries(self) -> dict[int, DeckIndexEntry]:
+        return self.__entries
+
+    @staticmethod
+    def get_index_path(path_of_txt: str) -> str:
+        directory, basename = os.path.split(path_of_txt)
+        basename_without_ext, _ = os.path.splitext(basename)
+        return os.path.join(directory, "." + basename_without_ext + DECK_INDEX_EXTENSION)
+
+    @staticmethod
+    def update(path_of_txt: str) -> None:
+        """Build the index after the .txt file is written, only the big decks are loaded through it"""
+        if os.path.getsize(path_of_txt) >= DECK_LAZY_LOADING_MIN_SIZE:
+            DeckIndex.build(path_of_txt)
+
+    @staticmethod
+    def load_or_build(path_of_txt: str, is_saved: bool = True) -> "DeckIndex":
+        deck_index: Optional[DeckIndex] = DeckIndex.load(path_of_txt)
+        if deck_index is None:
+            deck_index = DeckIndex.build(path_of_txt, is_saved)
+        return deck_index
+
+    @staticmethod
+    def load(path_of_txt: str) -> Optional["DeckIndex"]:
+        try:
+            with open(DeckIndex.get_index_path(path_of_txt), "rb") as file:
+                data: bytes = file.read()
+            magic, version, mtime_ns, size, num_entries = DeckIndex.HEADER.unpack_from(
+                data
+            )
+            stat_result: os.stat_result = os.stat(path_of_txt)
+            if (
+                magic != DeckIndex.MAGIC
+                or version != DeckIndex.VERSION
+                or mtime_ns != stat_result.st_mtime_ns
+                or size != stat_result.st_size
+            ):
+                return None
+
+            entries: dict[int, DeckIndexEntry] = dict()
+            offset: int = DeckIndex.HEADER.size
+            for _ in range(num_entries):
+                page, start, end, *num_results = DeckIndex.ENTRY.unpack_from(
+                    data, offset
+                )
+                offset += DeckIndex.ENTRY.size
+                entries[page] = DeckIndexEntry(start, end, tuple(num_results))
+            return DeckIndex(entries)
+        except (OSError, struct.error):
+            return None
+
+    @staticmethod
+    def build(path_of_txt: str, is_saved: bool = True) -> "DeckIndex":
+        """Scan the .txt file and save its index, if is_saved. Raises ValueError if the records are not sorted by page or the deck is in an older format"""
+        stat_result: os.stat_result = os.stat(path_of_txt)
+        entries: dict[int, DeckIndexEntry] = dict()
+        if stat_result.st_size > 0:
+            with open(path_of_txt, "rb") as file:
+                with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                    entries = DeckIndex.__scan(data)
+
+        deck_index: DeckIndex = DeckIndex(entries)
+        if not is_saved:
+            return deck_index
+        try:
+            deck_index.__save(path_of_txt, stat_result)
+        except OSError:
+            # the index is only an optimization, it is built again at the next load
+            pass
+        return deck_index
+
+    @staticmethod
+    def __scan(data: mmap.mmap) -> dict[int, DeckIndexEntry]:
+        separator: bytes = FILE_FLASHCARDS_SEPARATOR.encode("utf-8")
+        # header: version, number of completed tests, completed tests, first pass flag and number of flashcards
+        offset: int = data.find(b"\n") + 1
+        if data[:offset].strip() != (
+            DeckFormat.VERSION_PREFIX + str(DECK_FORMAT_VERSION)
+        ).encode("utf-8"):
+            # the flashcards of the older versions get their id only when the whole deck is parsed
+            raise ValueError("Only the decks in the current format can be indexed")
+        next_offset: int = data.find(b"\n", offset) + 1
+        num_completed_tests: int = int(data[offset:next_offset])
+        offset = next_offset
+        for _ in range(num_completed_tests + 2):
+            offset = data.find(b"\n", offset) + 1
+
+        entries: dict[int, DeckIndexEntry] = dict()
+        current_page: Optional[int] = None
+        page_start: int = offset
+        num_results: list[int] = [0, 0, 0]
+        while True:
+            # the fields of a record can span multiple lines, so only the separators are searched
+            positions: list[int] = []
+            position: int = offset
+            for _ in range(NUM_SEPARATORS_PER_RECORD):
+                position = data.find(separator, position)
+                if position < 0:
+                    break
+                positions.append(position)
+                position += len(separator)
+            if len(positions) < NUM_SEPARATORS_PER_RECORD:
+                break
+
+            page: int = int(data[offset : positions[0]]) - 1
+            current_result_field: bytes = data[
+                positions[4] + len(separator) : positions[5]
+            ].strip()
+            end: int = data.find(b"\n", position) + 1
+            if end == 0:
+                end = len(data)
+
+            if page != current_page:
+                if page in entries:
+                    raise ValueError("The records of the deck are not sorted by page")
+                if current_page is not None:
+                    entries[current_page] = DeckIndexEntry(
+                        page_start, offset, tuple(num_results)
+                    )
+                current_page = page
+                page_start = offset
+                num_results = [0, 0, 0]
+            if current_result_field in (b"0", b"1", b"2"):
+                num_results[int(current_result_field)] += 1
+            else:
+                # as when the record is parsed
+                num_results[Flashcard.Result.NOT_DONE.value] += 1
+            offset = end
+
+        if current_page is not None:
+            entries[current_page] = DeckIndexEntry(
+                page_start, offset, tuple(num_results)
+            )
+        return entries
+
+    def __save(self, path_of_txt: str, stat_result: os.stat_result) -> None:
+        index_path: str = DeckIndex.get_index_path(path_of_txt)
+        parts: list[bytes] = [
+            DeckIndex.HEADER.pack(
+                DeckIndex.MAGIC,
+                DeckIndex.VERSION,
+                stat_result.st_mtime_ns,
+                stat_result.st_size,
+                len(self.__entries),
+            )
+        ]
+        page: int
+        entry: DeckIndexEntry
+        for page, entry in self.__entries.items():
+            parts.append(
+                DeckIndex.ENTRY.pack(
+                    page, entry.get_start(), entry.get_end(), *entry.get_num_results()
+                )
+            )
+        with open(index_path + ".tmp", "wb") as file:
+            file.write(b"".join(parts))
+        os.replace(index_path + ".tmp", index_path)
+
+    @staticmethod
+    def read_page(path_of_txt: str, entry: DeckIndexEntry) -> list[Flashcard]:
+        # the file is mapped only while reading, on Windows a mapped file cannot be replaced by the next save
+        with open(path_of_txt, "rb") as file:
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                text: str = str(data[entry.get_start() : entry.get_end()], "utf-8")
+        # newline=None converts the \r\n written on Windows, as it happens when the .txt file is read
+        return list(DeckFormat.iter_flashcards_from_lines(StringIO(text, newline=None)))
+
+
+class LazyDeckPages(MutableMapping):
+    """Flashcards of a deck grouped by page, as the dict returned by IOFlashcards.get_flashcards_from_txt.
+
+    The flashcards of a page are read from the .txt file the first time the page is accessed, so the counts of the pages are available without loading the deck.
+    """
+
+    def __init__(self, path_of_txt: str, deck_index: DeckIndex) -> None:
+        self.__path_of_txt: str = path_of_txt
+        self.__entries: dict[int, DeckIndexEntry] = dict(deck_index.get_entries())
+        self.__stat_result: os.stat_result = os.stat(path_of_txt)
+        self.__loaded_pages: dict[int, list[Flashcard]] = dict()
+
+    def __getitem__(self, page: int) -> list[Flashcard]:
+        if page in self.__loaded_pages:
+            return self.__loaded_pages[page]
+        if page not in self.__entries:
+            raise KeyError(page)
+
+        stat_result: os.stat_result = os.stat(self.__path_of_txt)
+        if (
+            stat_result.st_mtime_ns != self.__stat_result.st_mtime_ns
+            or stat_result.st_size != self.__stat_result.st_size
+        ):
+            raise RuntimeError("The deck file changed before its pages were loaded")
+        list_flashcards: list[Flashcard] = DeckIndex.read_page(
+            self.__path_of_txt, self.__entries.pop(page)
+        )
+        self.__loaded_pages[page] = list_flashcards
+        return list_flashcards
+
+    def __setitem__(self, page: int, list_flashcards: list[Flashcard]) -> None:
+        self.__entries.pop(page, None)
+        self.__loaded_pages[page] = list_flashcards
+
+    def __delitem__(self, page: int) -> None:
+        if page not in self:
+            raise KeyError(page)
+        self.__entries.pop(page, None)
+        self.__loaded_pages.pop(page, None)
+
+    def __contains__(self, page: object) -> bool:
+        return page in self.__loaded_pages or page in self.__entries
+
+    def __iter__(self) -> Iterator[int]:
+        # accessing a page while iterating moves it to the loaded pages
+        return iter(list(self.__entries.keys()) + list(self.__loaded_pages.keys()))
+
+    def __len__(self) -> int:
+        return len(self.__entries) + len(self.__loaded_pages)
+
+    def get_num_flashcards(self, page: int) -> int:
+        """Number of flashcards of the page, without reading it"""
+        if page in self.__loaded_pages:
+            return len(self.__loaded_pages[page])
+        if page not in self.__entries:
+            raise KeyError(page)
+        return self.__entries[page].get_num_flashcards()
+
+    def get_num_loaded_pages(self) -> int:
+        return len(self.__loaded_pages)
+
+    def get_num_results(self) -> dict[Flashcard.Result, int]:
+        """Number of flashcards for every result, the pages not loaded are not read"""
+        num_results: dict[Flashcard.Result, int] = {x: 0 for x in Flashcard.Result}
+        entry: DeckIndexEntry
+        for entry in self.__entries.values():
+            for result in Flashcard.Result:
+                num_results[result] += entry.get_num_results()[result.value]
+        list_flashcards: list[Flashcard]
+        for list_flashcards in self.__loaded_pages.values():
+            for flashcard in list_flashcards:
+                num_results[flashcard.get_current_result()] += 1
+        return num_results
+
+    def get_num_results_of_page(self, page: int) -> tuple[int, int, int]:
+        """Number of flashcards of the page for every result, indexed by its value, without reading it"""
+        if page in self.__entries:
+            return self.__entries[page].get_num_results()
+        num_results: list[int] = [0] * len(Flashcard.Result)
+        flashcard: Flashcard
+        for flashcard in self[page]:
+            num_results[flashcard.get_current_result().value] += 1
+        return tuple(num_results)
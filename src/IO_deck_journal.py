@@ -0,0 +1,231 @@
+# Copyright 2022, 2023 Andrea Cucchietti
+# This file is part of flashcards-from-pdf.
+
+# flashcards-from-pdf is free software: you can redistribute it and/or modify it under the terms of the GNU General Public License as published by the Free Software Foundation, either version 3 of the License, or (at your option) any later version.
+
+# flashcards-from-pdf is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License along with flashcards-from-pdf. If not, see <https://www.gnu.org/licenses/>.
+from io import TextIOWrapper
+from itertools import islice
+from collections.abc import MutableMapping
+from typing import Optional, Iterable
+import os
+import time
+
+from flashcard.flashcard import Flashcard
+from IO_deck_format import DeckFormat
+from IO_deck_cache import DeckCache
+from IO_deck_index import DeckIndex
+from test_management.pdf_test_info import PDFTestsInfo
+from application_constants import DECK_JOURNAL_EXTENSION
+from application_constants import DECK_FORMAT_VERSION
+from application_constants import DECK_JOURNAL_MAX_SIZE
+from application_constants import DECK_JOURNAL_MAX_AGE
+
+
+class DeckJournal:
+    """Append-only log of the edits of a deck, stored next to its .txt file.
+
+    Every entry contains the tests info and all the flashcards of the pages changed by an edit, so replaying the entries in order over the .txt file gives the current deck. Once the journal is too big or too old, it is compacted: the whole deck is written in the .txt file and the journal is removed.
+    The header stores the size and the modification time of the .txt file the entries apply to, a journal left behind by an interrupted compaction is ignored.
+    The journal is written only by the DeckWriter thread of its deck.
+    """
+
+    # the records of the flashcards are in the format of this version of the deck
+    VERSION: int = DECK_FORMAT_VERSION
+    HEADER: str = "J"
+    BEGIN_ENTRY: str = "B"
+    TESTS_INFO: str = "T"
+    PAGE: str = "P"
+    END_ENTRY: str = "E"
+
+    def __init__(self, path_of_txt: str) -> None:
+        self.__path_of_txt: str = path_of_txt
+        self.__path_of_journal: str = DeckJournal.get_journal_path(path_of_txt)
+        self.__first_entry_time: Optional[float] = None
+        self.__version: int = DeckJournal.VERSION
+        if os.path.exists(self.__path_of_journal):
+            version: Optional[int] = DeckJournal.__read_version(
+                path_of_txt, self.__path_of_journal
+            )
+            if version is None:
+                os.remove(self.__path_of_journal)
+            else:
+                self.__version = version
+                self.__first_entry_time = os.path.getmtime(self.__path_of_journal)
+
+    @staticmethod
+    def get_journal_path(path_of_txt: str) -> str:
+        directory, basename = os.path.split(path_of_txt)
+        basename_without_ext, _ = os.path.splitext(basename)
+        return os.path.join(
+            directory, "." + basename_without_ext + DECK_JOURNAL_EXTENSION
+        )
+
+    @staticmethod
+    def replay(
+        path_of_txt: str,
+        pdf_test_info: PDFTestsInfo,
+        flashcards: MutableMapping[int, list[Flashcard]],
+    ) -> PDFTestsInfo:
+        """Apply the entries of the journal to flashcards, that is modified in place, and return the updated tests info"""
+        path_of_journal: str = DeckJournal.get_journal_path(path_of_txt)
+        if os.path.exists(path_of_journal) == False:
+            return pdf_test_info
+
+        version: Optional[int] = DeckJournal.__read_version(
+            path_of_txt, path_of_journal
+        )
+        if version is None:
+            return pdf_test_info
+
+        with open(path_of_journal, "r", encoding="utf-8") as file:
+            # header
+            file.readline()
+            try:
+                while True:
+                    entry: Optional[
+                        tuple[Optional[PDFTestsInfo], dict[int, list[Flashcard]]]
+                    ] = DeckJournal.__read_entry(file, version)
+                    if entry is None:
+                        break
+
+                    entry_tests_info: Optional[PDFTestsInfo]
+                    entry_pages: dict[int, list[Flashcard]]
+                    entry_tests_info, entry_pages = entry
+                    if entry_tests_info is not None:
+                        pdf_test_info = entry_tests_info
+                    page: int
+                    list_flashcards: list[Flashcard]
+                    for page, list_flashcards in entry_pages.items():
+                        if len(list_flashcards) == 0:
+                            flashcards.pop(page, None)
+                        else:
+                            flashcards[page] = list_flashcards
+            except (ValueError, IndexError):
+                # an interrupted append leaves an incomplete entry at the end, it is discarded
+                pass
+
+        return pdf_test_info
+
+    @staticmethod
+    def __read_version(path_of_txt: str, path_of_journal: str) -> Optional[int]:
+        """Returns the version of the journal, or None if it is stale"""
+        with open(path_of_journal, "r", encoding="utf-8") as file:
+            fields: list[str] = file.readline().split()
+        if (
+            len(fields) != 4
+            or fields[0] != DeckJournal.HEADER
+            or fields[1].isdigit() == False
+        ):
+            return None
+        version: int = int(fields[1])
+        if version > DeckJournal.VERSION:
+            return None
+        if " ".join(fields) + "\n" != DeckJournal.__get_header(path_of_txt, version):
+            return None
+        return version
+
+    @staticmethod
+    def __read_entry(
+        file: TextIOWrapper, version: int
+    ) -> Optional[tuple[Optional[PDFTestsInfo], dict[int, list[Flashcard]]]]:
+        if file.readline().strip() != DeckJournal.BEGIN_ENTRY:
+            return None
+
+        pdf_test_info: Optional[PDFTestsInfo] = None
+        pages: dict[int, list[Flashcard]] = dict()
+        while True:
+            fields: list[str] = file.readline().split()
+            if len(fields) == 0:
+                return None
+
+            match fields[0]:
+                case DeckJournal.TESTS_INFO:
+                    pdf_test_info = DeckFormat.read_tests_info(file)
+                case DeckJournal.PAGE:
+                    num_flashcards: int = int(fields[2])
+                    list_flashcards: list[Flashcard] = list(
+                        islice(
+                            DeckFormat.iter_flashcards_from_lines(file, version),
+                            num_flashcards,
+                        )
+                    )
+                    if len(list_flashcards) != num_flashcards:
+                        return None
+                    pages[int(fields[1])] = list_flashcards
+                case DeckJournal.END_ENTRY:
+                    return (pdf_test_info, pages)
+                case _:
+                    return None
+
+    @staticmethod
+    def get_page_snapshot(page: int, list_flashcards: list[Flashcard]) -> str:
+        content: list[str] = [
+            " ".join([DeckJournal.PAGE, str(page), str(len(list_flashcards))]) + "\n"
+        ]
+        flashcard: Flashcard
+        for flashcard in list_flashcards:
+            content.append(DeckFormat.get_flashcard_record(flashcard))
+        return "".join(content)
+
+    @staticmethod
+    def get_entry(tests_info: str, page_snapshots: Iterable[str]) -> str:
+        """tests_info is the result of PDFTestsInfo.to_string, page_snapshots the results of get_page_snapshot"""
+        return "".join(
+            [
+                DeckJournal.BEGIN_ENTRY + "\n",
+                DeckJournal.TESTS_INFO + "\n",
+                tests_info,
+                *page_snapshots,
+                DeckJournal.END_ENTRY + "\n",
+            ]
+        )
+
+    def append(self, entry: str) -> None:
+        is_new_journal: bool = os.path.exists(self.__path_of_journal) == False
+        with open(self.__path_of_journal, "a", encoding="utf-8") as file:
+            if is_new_journal:
+                file.write(DeckJournal.__get_header(self.__path_of_txt))
+            file.write(entry)
+        if self.__first_entry_time is None:
+            self.__first_entry_time = time.time()
+
+    def needs_compaction(self) -> bool:
+        if self.__first_entry_time is None:
+            return False
+        if self.__version != DeckJournal.VERSION:
+            # the entries of a journal written by an older version of the application are compacted before appending new ones
+            return True
+        if time.time() - self.__first_entry_time > DECK_JOURNAL_MAX_AGE:
+            return True
+        try:
+            return os.path.getsize(self.__path_of_journal) > DECK_JOURNAL_MAX_SIZE
+        except OSError:
+            return False
+
+    def compact(self, content: str, cache_content: bytes) -> None:
+        """Write the whole deck in the .txt file and remove the journal, whose entries are all included in content"""
+        DeckFormat.write_deck_file(self.__path_of_txt, content)
+        DeckCache.write(self.__path_of_txt, cache_content)
+        DeckIndex.update(self.__path_of_txt)
+        if os.path.exists(self.__path_of_journal):
+            os.remove(self.__path_of_journal)
+        self.__first_entry_time = None
+        self.__version = DeckJournal.VERSION
+
+    @staticmethod
+    def __get_header(path_of_txt: str, version: int = VERSION) -> str:
+        size: int = -1
+        mtime_ns: int = -1
+        if os.path.exists(path_of_txt):
+            stat_result: os.stat_result = os.stat(path_of_txt)
+            size = stat_result.st_size
+            mtime_ns = stat_result.st_mtime_ns
+        return (
+            " ".join(
+                [DeckJournal.HEADER, str(version), str(size), str(mtime_ns)]
+            )
+            + "\n"
+        )
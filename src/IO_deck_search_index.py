@@ -0,0 +1,268 @@
+# Copyright 2022, 2023 Andrea Cucchietti
+# This file is part of flashcards-from-pdf.
+
+# flashcards-from-pdf is free software: you can redistribute it and/or modify it under the terms of the GNU General Public License as published by the Free Software Foundation, either version 3 of the License, or (at your option) any later version.
+
+# flashcards-from-pdf is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License along with flashcards-from-pdf. If not, see <https://www.gnu.org/licenses/>.
+from collections.abc import Mapping, MutableMapping, Iterable
+from typing import Optional, Callable
+import sqlite3
+import os
+import re
+
+from flashcard.flashcard import Flashcard
+from IO_flashcards_management import IOFlashcards
+from IO_deck_database import DeckDatabase
+from IO_deck_journal import DeckJournal
+from application_constants import PATH_TO_DECKS_ABS
+
+# flashcard id, question and answer of the flashcards of every page
+SearchRows = dict[int, list[tuple[int, str, str]]]
+
+
+class DeckSearchHit:
+    def __init__(
+        self, deck_key: str, page: int, flashcard_id: int, question: str
+    ) -> None:
+        self.__deck_key: str = deck_key
+        self.__page: int = page
+        self.__flashcard_id: int = flashcard_id
+        self.__question: str = question
+
+    def get_deck_key(self) -> str:
+        return self.__deck_key
+
+    def get_path_of_pdf(self) -> str:
+        return os.path.join(PATH_TO_DECKS_ABS, self.__deck_key) + ".pdf"
+
+    def get_page(self) -> int:
+        return self.__page
+
+    def get_flashcard_id(self) -> int:
+        return self.__flashcard_id
+
+    def get_question(self) -> str:
+        return self.__question
+
+
+class DeckSearchIndex:
+    """Full-text index of the questions and answers of all the decks, stored in the private database with FTS5.
+
+    Every flashcard is a row of the flashcard_search table, whose rowid is the id of a row of flashcard_search_row with its deck and page, so the rows of a page are replaced without scanning the full-text table. The modification times of the .txt file and of the journal of every deck are stored in flashcard_search_deck.
+    The rows of the changed pages are replaced every time a deck is saved, and the decks changed outside the application are indexed again when the decks tree is loaded.
+    """
+
+    @staticmethod
+    def create_tables(con: sqlite3.Connection) -> None:
+        con.execute(
+            """CREATE VIRTUAL TABLE IF NOT EXISTS flashcard_search USING fts5(question,
+                                                                              answer,
+                                                                              tokenize = 'unicode61 remove_diacritics 2')"""
+        )
+        con.execute(
+            """CREATE TABLE IF NOT EXISTS flashcard_search_row (id integer primary key,
+                                                                deck text NOT NULL,
+                                                                page integer NOT NULL,
+                                                                flashcard_id integer NOT NULL)"""
+        )
+        con.execute(
+            "CREATE INDEX IF NOT EXISTS flashcard_search_row_deck ON flashcard_search_row (deck, page)"
+        )
+        con.execute(
+            """CREATE TABLE IF NOT EXISTS flashcard_search_deck (path text primary key,
+                                                                 txt_mtime_ns integer NOT NULL,
+                                                                 journal_mtime_ns integer NOT NULL)"""
+        )
+
+    @staticmethod
+    def get_rows(flashcards_of_pages: Mapping[int, list[Flashcard]]) -> SearchRows:
+        """Snapshot of the text of the flashcards, so it can be saved on another thread"""
+        return {
+            page: [
+                (flashcard.get_id(), flashcard.get_question(), flashcard.get_answer())
+                for flashcard in list_flashcards
+            ]
+            for page, list_flashcards in flashcards_of_pages.items()
+        }
+
+    @staticmethod
+    def save_pages(
+        path_of_txt: str,
+        rows_of_pages: SearchRows,
+        is_whole_deck: bool,
+        path_of_db: Optional[str] = None,
+    ) -> None:
+        """Replace the rows of the pages in rows_of_pages, or of all the deck if is_whole_deck. Called after the deck is written"""
+        if path_of_db is None:
+            path_of_db = DeckDatabase.get_db_path()
+        con: sqlite3.Connection = sqlite3.connect(path_of_db)
+        try:
+            with con:
+                DeckSearchIndex.create_tables(con)
+                DeckSearchIndex.__save_pages(
+                    con,
+                    path_of_txt,
+                    rows_of_pages,
+                    is_whole_deck,
+                    DeckSearchIndex.__get_mtimes(path_of_txt),
+                )
+        finally:
+            con.close()
+
+    @staticmethod
+    def __save_pages(
+        con: sqlite3.Connection,
+        path_of_txt: str,
+        rows_of_pages: SearchRows,
+        is_whole_deck: bool,
+        mtimes: tuple[int, int],
+    ) -> None:
+        """mtimes are the ones of the files of the deck read for rows_of_pages"""
+        deck_key: str = DeckDatabase.get_deck_key(path_of_txt)
+        if is_whole_deck:
+            DeckSearchIndex.__delete_rows(con, "deck = ?", (deck_key,))
+        page: int
+        rows: list[tuple[int, str, str]]
+        for page, rows in rows_of_pages.items():
+            if not is_whole_deck:
+                DeckSearchIndex.__delete_rows(
+                    con, "deck = ? AND page = ?", (deck_key, page)
+                )
+            flashcard_id: int
+            question: str
+            answer: str
+            for flashcard_id, question, answer in rows:
+                row_id: Optional[int] = con.execute(
+                    "INSERT INTO flashcard_search_row (deck, page, flashcard_id) VALUES (?, ?, ?)",
+                    (deck_key, page, flashcard_id),
+                ).lastrowid
+                con.execute(
+                    "INSERT INTO flashcard_search (rowid, question, answer) VALUES (?, ?, ?)",
+                    (row_id, question, answer),
+                )
+        con.execute(
+            "INSERT OR REPLACE INTO flashcard_search_deck VALUES (?, ?, ?)",
+            (deck_key, *mtimes),
+        )
+
+    @staticmethod
+    def __delete_rows(
+        con: sqlite3.Connection, condition: str, parameters: tuple
+    ) -> None:
+        con.execute(
+            "DELETE FROM flashcard_search WHERE rowid IN (SELECT id FROM flashcard_search_row WHERE "
+            + condition
+            + ")",
+            parameters,
+        )
+        con.execute("DELETE FROM flashcard_search_row WHERE " + condition, parameters)
+
+    @staticmethod
+    def __get_mtimes(path_of_txt: str) -> tuple[int, int]:
+        # -1 if the file does not exist
+        mtimes: list[int] = []
+        path: str
+        for path in (path_of_txt, DeckJournal.get_journal_path(path_of_txt)):
+            mtimes.append(os.stat(path).st_mtime_ns if os.path.exists(path) else -1)
+        return (mtimes[0], mtimes[1])
+
+    @staticmethod
+    def update_decks(
+        paths_of_txt: Iterable[str],
+        path_of_db: Optional[str] = None,
+        is_interrupted: Optional[Callable[[], bool]] = None,
+    ) -> int:
+        """Index again the decks changed since they were indexed and remove the decks that are not in paths_of_txt. Returns the number of decks indexed again.
+
+        Every deck is saved in its own transaction, so the decks already indexed can be searched while the others are indexed. The indexing stops before the next deck when is_interrupted returns True.
+        """
+        if path_of_db is None:
+            path_of_db = DeckDatabase.get_db_path()
+        paths_of_decks: dict[str, str] = {
+            DeckDatabase.get_deck_key(path_of_txt): path_of_txt
+            for path_of_txt in paths_of_txt
+        }
+        num_updated_decks: int = 0
+        con: sqlite3.Connection = sqlite3.connect(path_of_db)
+        try:
+            with con:
+                DeckSearchIndex.create_tables(con)
+                mtimes_of_decks: dict[str, tuple[int, int]] = {
+                    row[0]: (row[1], row[2])
+                    for row in con.execute("SELECT * FROM flashcard_search_deck")
+                }
+                deck_key: str
+                for deck_key in mtimes_of_decks.keys() - paths_of_decks.keys():
+                    DeckSearchIndex.__delete_rows(con, "deck = ?", (deck_key,))
+                    con.execute(
+                        "DELETE FROM flashcard_search_deck WHERE path = ?", (deck_key,)
+                    )
+
+            path_of_txt: str
+            for deck_key, path_of_txt in paths_of_decks.items():
+                if is_interrupted is not None and is_interrupted():
+                    # indexed again the next time
+                    break
+                # read before the deck, so a deck written while it is read is indexed again the next time
+                mtimes: tuple[int, int] = DeckSearchIndex.__get_mtimes(path_of_txt)
+                if mtimes_of_decks.get(deck_key) == mtimes:
+                    continue
+                with con:
+                    DeckSearchIndex.__save_pages(
+                        con,
+                        path_of_txt,
+                        DeckSearchIndex.get_rows(
+                            DeckSearchIndex.__load_flashcards(path_of_txt, path_of_db)
+                        ),
+                        True,
+                        mtimes,
+                    )
+                num_updated_decks += 1
+        finally:
+            con.close()
+        return num_updated_decks
+
+    @staticmethod
+    def __load_flashcards(
+        path_of_txt: str, path_of_db: str
+    ) -> MutableMapping[int, list[Flashcard]]:
+        flashcards: MutableMapping[int, list[Flashcard]]
+        deck_database: DeckDatabase = DeckDatabase(path_of_txt, path_of_db)
+        try:
+            if deck_database.is_deck_stored():
+                _, flashcards = deck_database.load_deck()
+                return flashcards
+        finally:
+            deck_database.close()
+        # the sidecar files of the deck are written only by its DeckWriter
+        _, flashcards = IOFlashcards.load_deck(path_of_txt, True)
+        return flashcards
+
+    @staticmethod
+    def search(
+        text_to_search: str, max_hits: int = 100, path_of_db: Optional[str] = None
+    ) -> list[DeckSearchHit]:
+        """The flashcards that contain all the words of text_to_search as prefixes of their words, the best matches first"""
+        words: list[str] = re.findall(r"\w+", text_to_search)
+        if len(words) == 0:
+            return []
+        # every word is quoted, so it is not read as an operator of the query syntax
+        query: str = " ".join('"' + word + '"*' for word in words)
+        if path_of_db is None:
+            path_of_db = DeckDatabase.get_db_path()
+        con: sqlite3.Connection = sqlite3.connect(path_of_db)
+        try:
+            DeckSearchIndex.create_tables(con)
+            return [
+                DeckSearchHit(row[0], row[1], row[2], row[3])
+                for row in con.execute(
+                    """SELECT flashcard_search_row.deck, flashcard_search_row.page, flashcard_search_row.flashcard_id, flashcard_search.question
+                    FROM flashcard_search JOIN flashcard_search_row ON flashcard_search_row.id = flashcard_search.rowid
+                    WHERE flashcard_search MATCH ? ORDER BY flashcard_search.rank LIMIT ?""",
+                    (query, max_hits),
+                )
+            ]
+        finally:
+            con.close()
@@ -0,0 +1,196 @@
+# Copyright 2022, 2023 Andrea Cucchietti
+# This file is part of flashcards-from-pdf.
+
+# flashcards-from-pdf is free software: you can redistribute it and/or modify it under the terms of the GNU General Public License as published by the Free Software Foundation, either version 3 of the License, or (at your option) any later version.
+
+# flashcards-from-pdf is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License along with flashcards-from-pdf. If not, see <https://www.gnu.org/licenses/>.
+from collections.abc import Mapping, MutableMapping
+from typing import Optional
+from datetime import datetime
+import sqlite3
+import os
+
+from flashcard.flashcard import Flashcard
+from IO_flashcards_management import IOFlashcards
+from IO_deck_database import DeckDatabase
+from IO_deck_index import LazyDeckPages
+from test_management.pdf_test_info import PDFTestsInfo
+
+
+class DeckSummary:
+    def __init__(
+        self,
+        num_flashcards: int = 0,
+        num_know: int = 0,
+        num_still_learning: int = 0,
+        num_not_done: int = 0,
+        num_completed_tests: int = 0,
+        last_modified: datetime = datetime.fromtimestamp(0),
+    ) -> None:
+        self.__num_flashcards: int = num_flashcards
+        self.__num_know: int = num_know
+        self.__num_still_learning: int = num_still_learning
+        self.__num_not_done: int = num_not_done
+        self.__num_completed_tests: int = num_completed_tests
+        self.__last_modified: datetime = last_modified
+
+    @staticmethod
+    def from_deck(
+        pdf_test_info: PDFTestsInfo,
+        flashcards: Mapping[int, list[Flashcard]],
+        last_modified: datetime,
+    ) -> "DeckSummary":
+        num_results: dict[Flashcard.Result, int]
+        if isinstance(flashcards, LazyDeckPages):
+            # the counts of the pages not loaded are in the index of the deck
+            num_results = flashcards.get_num_results()
+        else:
+            num_results = {x: 0 for x in Flashcard.Result}
+            list_flashcards: list[Flashcard]
+            for list_flashcards in flashcards.values():
+                for flashcard in list_flashcards:
+                    num_results[flashcard.get_current_result()] += 1
+        return DeckSummary.from_num_results(pdf_test_info, num_results, last_modified)
+
+    @staticmethod
+    def from_num_results(
+        pdf_test_info: PDFTestsInfo,
+        num_results: Mapping[Flashcard.Result, int],
+        last_modified: datetime,
+    ) -> "DeckSummary":
+        return DeckSummary(
+            sum(num_results.values()),
+            num_results[Flashcard.Result.KNOW],
+            num_results[Flashcard.Result.STILL_LEARNING],
+            num_results[Flashcard.Result.NOT_DONE],
+            pdf_test_info.get_num_completed_tests(),
+            last_modified,
+        )
+
+    def get_num_flashcards(self) -> int:
+        return self.__num_flashcards
+
+    def get_num_know(self) -> int:
+        return self.__num_know
+
+    def get_num_still_learning(self) -> int:
+        return self.__num_still_learning
+
+    def get_num_not_done(self) -> int:
+        return self.__num_not_done
+
+    def get_num_completed_tests(self) -> int:
+        return self.__num_completed_tests
+
+    def get_last_modified(self) -> datetime:
+        return self.__last_modified
+
+    def get_progress_string(self) -> str:
+        if self.get_num_flashcards() == 0:
+            return ""
+        return "{known}/{total} known".format(
+            known=self.get_num_know(), total=self.get_num_flashcards()
+        )
+
+
+class DeckSummaryIndex:
+    """Summary of every deck, stored in the deck_summary table of the private database.
+
+    A summary is saved every time its deck is saved, together with the modification time of the .txt file. When the .txt file is changed outside the application, or the deck was never saved since this index was introduced, the summary is computed again from the deck.
+    """
+
+    @staticmethod
+    def create_table(con: sqlite3.Connection) -> None:
+        con.execute(
+            """CREATE TABLE IF NOT EXISTS deck_summary (path text primary key,
+                                                        num_flashcards integer NOT NULL,
+                                                        num_know integer NOT NULL,
+                                                        num_still_learning integer NOT NULL,
+                                                        num_not_done integer NOT NULL,
+                                                        num_completed_tests integer NOT NULL,
+                                                        last_modified timestamp NOT NULL,
+                                                        txt_mtime_ns integer NOT NULL)"""
+        )
+
+    @staticmethod
+    def save_summary(
+        path_of_txt: str, summary: DeckSummary, path_of_db: Optional[str] = None
+    ) -> None:
+        if path_of_db is None:
+            path_of_db = DeckDatabase.get_db_path()
+        txt_mtime_ns: int = -1
+        if os.path.exists(path_of_txt):
+            txt_mtime_ns = os.stat(path_of_txt).st_mtime_ns
+
+        con: sqlite3.Connection = sqlite3.connect(path_of_db)
+        try:
+            with con:
+                DeckSummaryIndex.create_table(con)
+                con.execute(
+                    "INSERT OR REPLACE INTO deck_summary VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        DeckDatabase.get_deck_key(path_of_txt),
+                        summary.get_num_flashcards(),
+                        summary.get_num_know(),
+                        summary.get_num_still_learning(),
+                        summary.get_num_not_done(),
+                        summary.get_num_completed_tests(),
+                        summary.get_last_modified().isoformat(),
+                        txt_mtime_ns,
+                    ),
+                )
+        finally:
+            con.close()
+
+    @staticmethod
+    def load_summaries(
+        path_of_db: Optional[str] = None,
+    ) -> dict[str, tuple[DeckSummary, int]]:
+        """Returns the summaries of all the decks, with the modification time of their .txt file. The keys are given by DeckDatabase.get_deck_key"""
+        if path_of_db is None:
+            path_of_db = DeckDatabase.get_db_path()
+        summaries: dict[str, tuple[DeckSummary, int]] = dict()
+        con: sqlite3.Connection = sqlite3.connect(path_of_db)
+        try:
+            DeckSummaryIndex.create_table(con)
+            for row in con.execute("SELECT * FROM deck_summary"):
+                summaries[row[0]] = (
+                    DeckSummary(
+                        row[1],
+                        row[2],
+                        row[3],
+                        row[4],
+                        row[5],
+                        datetime.fromisoformat(row[6]),
+                    ),
+                    row[7],
+                )
+        finally:
+            con.close()
+        return summaries
+
+    @staticmethod
+    def get_summary(
+        path_of_txt: str,
+        summaries: dict[str, tuple[DeckSummary, int]],
+        path_of_db: Optional[str] = None,
+    ) -> Optional[DeckSummary]:
+        """Returns the summary of the deck from summaries, the result of load_summaries. If it is missing or stale, it is computed and saved"""
+        if os.path.exists(path_of_txt) == False:
+            return None
+        txt_mtime_ns: int = os.stat(path_of_txt).st_mtime_ns
+        key: str = DeckDatabase.get_deck_key(path_of_txt)
+        if key in summaries and summaries[key][1] == txt_mtime_ns:
+            return summaries[key][0]
+
+        pdf_test_info: PDFTestsInfo
+        flashcards: MutableMapping[int, list[Flashcard]]
+        pdf_test_info, flashcards = IOFlashcards.load_deck(path_of_txt)
+        summary: DeckSummary = DeckSummary.from_deck(
+            pdf_test_info, flashcards, datetime.fromtimestamp(txt_mtime_ns / 1e9)
+        )
+        DeckSummaryIndex.save_summary(path_of_txt, summary, path_of_db)
+        summaries[key] = (summary, txt_mtime_ns)
+        return summary
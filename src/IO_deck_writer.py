@@ -0,0 +1,227 @@
+# Copyright 2022, 2023 Andrea Cucchietti
+# This file is part of flashcards-from-pdf.
+
+# flashcards-from-pdf is free software: you can redistribute it and/or modify it under the terms of the GNU General Public License as published by the Free Software Foundation, either version 3 of the License, or (at your option) any later version.
+
+# flashcards-from-pdf is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License along with flashcards-from-pdf. If not, see <https://www.gnu.org/licenses/>.
+from collections.abc import Mapping
+from typing import Optional
+import copy
+import threading
+import time
+import weakref
+import logging
+import traceback
+
+from flashcard.flashcard import Flashcard
+from IO_deck_format import DeckFormat
+from IO_deck_cache import DeckCache
+from IO_deck_journal import DeckJournal
+from IO_deck_summary import DeckSummary, DeckSummaryIndex
+from IO_deck_search_index import DeckSearchIndex, SearchRows
+from test_management.pdf_test_info import PDFTestsInfo
+from application_constants import DECK_WRITER_DELAY
+
+
+class DeckWriter:
+    """Writes the edits of a deck on a worker thread.
+
+    The save methods take a snapshot of the changed flashcards on the calling thread and return immediately: the changed pages are taken as text, the whole deck as copies of its flashcards, serialized by the worker thread. The snapshots received within DECK_WRITER_DELAY seconds are coalesced: a page changed several times is written once, and a save of the whole deck discards the page snapshots that came before it.
+    """
+
+    # all the writers alive, flushed when the application exits
+    __writers: weakref.WeakSet = weakref.WeakSet()
+
+    def __init__(self, path_of_txt: str) -> None:
+        self.__path_of_txt: str = path_of_txt
+        self.__journal: DeckJournal = DeckJournal(path_of_txt)
+        self.__condition: threading.Condition = threading.Condition()
+        # state shared with the worker thread, guarded by the condition
+        self.__pending_tests_info: Optional[str] = None
+        self.__pending_pages: dict[int, str] = dict()
+        # tests info, number of flashcards and copies of the flashcards of the whole deck
+        self.__pending_deck: Optional[
+            tuple[PDFTestsInfo, int, dict[int, list[Flashcard]]]
+        ] = None
+        self.__is_writing_deck: bool = False
+        self.__pending_summary: Optional[DeckSummary] = None
+        # text of the flashcards for the DeckSearchIndex of the pages saved after the deck
+        self.__pending_search_pages: SearchRows = dict()
+        self.__num_pending_writes: int = 0
+        self.__first_pending_time: float = 0
+        self.__is_flush_requested: bool = False
+        self.__is_closed: bool = False
+
+        self.__thread: threading.Thread = threading.Thread(
+            target=self.__run, name="DeckWriter " + path_of_txt, daemon=True
+        )
+        self.__thread.start()
+        DeckWriter.__writers.add(self)
+
+    @staticmethod
+    def flush_all() -> None:
+        writer: DeckWriter
+        for writer in list(DeckWriter.__writers):
+            writer.close()
+
+    def save_pages(
+        self,
+        pdf_test_info: PDFTestsInfo,
+        flashcards_of_pages: dict[int, list[Flashcard]],
+    ) -> None:
+        tests_info: str = pdf_test_info.to_string()
+        page_snapshots: dict[int, str] = {
+            page: DeckJournal.get_page_snapshot(page, list_flashcards)
+            for page, list_flashcards in flashcards_of_pages.items()
+        }
+        search_rows: SearchRows = DeckSearchIndex.get_rows(flashcards_of_pages)
+        with self.__condition:
+            self.__pending_tests_info = tests_info
+            self.__pending_pages.update(page_snapshots)
+            self.__pending_search_pages.update(search_rows)
+            self.__add_pending_write()
+
+    def save_deck(
+        self,
+        pdf_test_info: PDFTestsInfo,
+        num_flashcards: int,
+        flashcards: Mapping[int, list[Flashcard]],
+    ) -> None:
+        # the fields of a flashcard are immutable, so a shallow copy is a snapshot of it
+        snapshot: dict[int, list[Flashcard]] = {
+            page: [copy.copy(flashcard) for flashcard in list_flashcards]
+            for page, list_flashcards in flashcards.items()
+        }
+        pending_deck: tuple[PDFTestsInfo, int, dict[int, list[Flashcard]]] = (
+            copy.deepcopy(pdf_test_info),
+            num_flashcards,
+            snapshot,
+        )
+        with self.__condition:
+            # the snapshot of the whole deck contains all the previous changes
+            self.__pending_tests_info = None
+            self.__pending_pages.clear()
+            self.__pending_deck = pending_deck
+            self.__pending_search_pages.clear()
+            self.__add_pending_write()
+
+    def save_summary(self, summary: DeckSummary) -> None:
+        """The summary is saved after the deck, with the modification time of the written .txt file"""
+        with self.__condition:
+            self.__pending_summary = summary
+            self.__add_pending_write()
+
+    def needs_compaction(self) -> bool:
+        with self.__condition:
+            # the journal is compacted by the deck waiting or being written
+            if self.__pending_deck is not None or self.__is_writing_deck:
+                return False
+            return self.__journal.needs_compaction()
+
+    def get_num_pending_writes(self) -> int:
+        """Number of saves received and not yet written to disk"""
+        with self.__condition:
+            return self.__num_pending_writes
+
+    def flush(self) -> None:
+        """Write the pending saves and wait until they are on disk"""
+        with self.__condition:
+            self.__is_flush_requested = True
+            self.__condition.notify_all()
+            while self.__num_pending_writes > 0 and self.__thread.is_alive():
+                self.__condition.wait()
+            self.__is_flush_requested = False
+
+    def close(self) -> None:
+        self.flush()
+        with self.__condition:
+            self.__is_closed = True
+            self.__condition.notify_all()
+        self.__thread.join()
+        DeckWriter.__writers.discard(self)
+
+    def __add_pending_write(self) -> None:
+        if self.__num_pending_writes == 0:
+            self.__first_pending_time = time.monotonic()
+        self.__num_pending_writes += 1
+        self.__condition.notify_all()
+
+    def __run(self) -> None:
+        while True:
+            with self.__condition:
+                while self.__num_pending_writes == 0 and not self.__is_closed:
+                    self.__condition.wait()
+                if self.__num_pending_writes == 0:
+                    return
+                # the edits of a burst are written together
+                remaining_time: float = (
+                    self.__first_pending_time + DECK_WRITER_DELAY - time.monotonic()
+                )
+                while (
+                    remaining_time > 0
+                    and not self.__is_flush_requested
+                    and not self.__is_closed
+                ):
+                    self.__condition.wait(remaining_time)
+                    remaining_time = (
+                        self.__first_pending_time
+                        + DECK_WRITER_DELAY
+                        - time.monotonic()
+                    )
+
+                pending_deck: Optional[
+                    tuple[PDFTestsInfo, int, dict[int, list[Flashcard]]]
+                ] = self.__pending_deck
+                pending_tests_info: Optional[str] = self.__pending_tests_info
+                pending_pages: dict[int, str] = self.__pending_pages
+                pending_summary: Optional[DeckSummary] = self.__pending_summary
+                pending_search_pages: SearchRows = self.__pending_search_pages
+                num_writes: int = self.__num_pending_writes
+                self.__pending_deck = None
+                self.__is_writing_deck = pending_deck is not None
+                self.__pending_tests_info = None
+                self.__pending_pages = dict()
+                self.__pending_summary = None
+                self.__pending_search_pages = dict()
+
+            try:
+                pending_search_deck: Optional[SearchRows] = None
+                if pending_deck is not None:
+                    pending_search_deck = DeckSearchIndex.get_rows(pending_deck[2])
+                self.__write(pending_deck, pending_tests_info, pending_pages)
+                if pending_summary is not None:
+                    DeckSummaryIndex.save_summary(self.__path_of_txt, pending_summary)
+                # after the deck, so the index stores the modification times of the written files
+                if pending_search_deck is not None:
+                    DeckSearchIndex.save_pages(
+                        self.__path_of_txt, pending_search_deck, True
+                    )
+                if len(pending_search_pages) > 0:
+                    DeckSearchIndex.save_pages(
+                        self.__path_of_txt, pending_search_pages, False
+                    )
+            except Exception:
+                logging.error(traceback.format_exc())
+
+            with self.__condition:
+                self.__num_pending_writes -= num_writes
+                self.__is_writing_deck = False
+                self.__condition.notify_all()
+
+    def __write(
+        self,
+        pending_deck: Optional[tuple[PDFTestsInfo, int, dict[int, list[Flashcard]]]],
+        pending_tests_info: Optional[str],
+        pending_pages: dict[int, str],
+    ) -> None:
+        if pending_deck is not None:
+            self.__journal.compact(
+                DeckFormat.get_deck_content(*pending_deck),
+                DeckCache.encode(pending_deck[0], pending_deck[2]),
+            )
+        if pending_tests_info is not None:
+            self.__journal.append(
+                DeckJournal.get_entry(pending_tests_info, pending_pages.values())
+            )
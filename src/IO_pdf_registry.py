@@ -0,0 +1,287 @@
+# Copyright 2022, 2023 Andrea Cucchietti
+# This file is part of flashcards-from-pdf.
+
+# flashcards-from-pdf is free software: you can redistribute it and/or modify it under the terms of the GNU General Public License as published by the Free Software Foundation, either version 3 of the License, or (at your option) any later version.
+
+# flashcards-from-pdf is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License along with flashcards-from-pdf. If not, see <https://www.gnu.org/licenses/>.
+from PyQt6.QtCore import QSizeF, QSize
+from PyQt6.QtGui import QImage
+from PyQt6 import QtPdf
+
+from typing import Optional
+from array import array
+import hashlib
+import sqlite3
+import threading
+import os
+
+from application_constants import PRIVATE_DB_FILENAME, PATH_TO_DECKS_ABS
+from application_constants import PDF_PAGE_HASH_DPI
+
+
+class PdfMetadata:
+    def __init__(
+        self, content_hash: str, page_sizes: list[tuple[float, float]]
+    ) -> None:
+        self.__content_hash: str = content_hash
+        # width and height of every page, in points
+        self.__page_sizes: list[tuple[float, float]] = page_sizes
+
+    def get_content_hash(self) -> str:
+        return self.__content_hash
+
+    def get_page_count(self) -> int:
+        return len(self.__page_sizes)
+
+    def get_page_size(self, page: int) -> tuple[float, float]:
+        return self.__page_sizes[page]
+
+    def get_page_sizes(self) -> list[tuple[float, float]]:
+        return self.__page_sizes
+
+
+class PdfDocumentRegistry:
+    """The pdf documents open in the application, each loaded once for the GUI thread and once for the workers, and shared by the windows, the deck state cache and the export to Anki.
+
+    The metadata of the pdfs is stored in the pdf_metadata table of the private database, together with the size and the modification time of the file, so the number of pages is known without loading the pdf again. When the file changes but its content hash is the same, the stored metadata is still used.
+    The hash of every page is computed only when it is needed, from a rendering of the page at PDF_PAGE_HASH_DPI, and stored with the metadata until the content of the pdf changes. The pages left unchanged by an update of the pdf keep their hash.
+    When the file of a pdf changes, the next users get a new document, while the users of the previous one keep it, with its pages, until they release it.
+    The documents are used only on the GUI thread, except the ones acquired for the workers: for every pdf, one more document is shared by the worker threads, which use it while holding its lock.
+    """
+
+    # path of the pdf and if it is for the workers, with the last loaded document and the modification time of the file when it was loaded
+    __documents: dict[tuple[str, bool], tuple[QtPdf.QPdfDocument, int]] = dict()
+    # id of every document in use, with the document, its key in __documents, its number of users and its lock
+    __users: dict[
+        int, tuple[QtPdf.QPdfDocument, tuple[str, bool], int, threading.Lock]
+    ] = dict()
+
+    @staticmethod
+    def acquire(path_of_pdf: str, is_for_workers: bool = False) -> QtPdf.QPdfDocument:
+        """The loaded document of the pdf. Every acquire has to be followed by a release of the document"""
+        key: tuple[str, bool] = (os.path.abspath(path_of_pdf), is_for_workers)
+        mtime_ns: int = os.stat(key[0]).st_mtime_ns
+        pdf_doc: QtPdf.QPdfDocument
+        if (
+            key in PdfDocumentRegistry.__documents
+            and PdfDocumentRegistry.__documents[key][1] == mtime_ns
+        ):
+            pdf_doc = PdfDocumentRegistry.__documents[key][0]
+        else:
+            # a document loaded before the pdf was updated is not reloaded, as its users rely on its pages
+            pdf_doc = QtPdf.QPdfDocument(None)
+            pdf_doc.load(key[0])
+            PdfDocumentRegistry.__documents[key] = (pdf_doc, mtime_ns)
+        num_users: int = 0
+        lock: threading.Lock = threading.Lock()
+        if id(pdf_doc) in PdfDocumentRegistry.__users:
+            _, _, num_users, lock = PdfDocumentRegistry.__users[id(pdf_doc)]
+        PdfDocumentRegistry.__users[id(pdf_doc)] = (pdf_doc, key, num_users + 1, lock)
+        return pdf_doc
+
+    @staticmethod
+    def get_lock(pdf_doc: QtPdf.QPdfDocument) -> threading.Lock:
+        """Held by the threads while they use a document acquired for the workers"""
+        return PdfDocumentRegistry.__users[id(pdf_doc)][3]
+
+    @staticmethod
+    def release(pdf_doc: QtPdf.QPdfDocument) -> None:
+        """The document is closed when it has no more users. The workers using it have to be finished"""
+        if id(pdf_doc) not in PdfDocumentRegistry.__users:
+            return
+        key: tuple[str, bool]
+        num_users: int
+        lock: threading.Lock
+        _, key, num_users, lock = PdfDocumentRegistry.__users[id(pdf_doc)]
+        if num_users > 1:
+            PdfDocumentRegistry.__users[id(pdf_doc)] = (
+                pdf_doc,
+                key,
+                num_users - 1,
+                lock,
+            )
+            return
+        PdfDocumentRegistry.__users.pop(id(pdf_doc))
+        if (
+            key in PdfDocumentRegistry.__documents
+            and PdfDocumentRegistry.__documents[key][0] is pdf_doc
+        ):
+            PdfDocumentRegistry.__documents.pop(key)
+        pdf_doc.close()
+
+    @staticmethod
+    def get_num_open_documents() -> int:
+        return len(PdfDocumentRegistry.__users)
+
+    @staticmethod
+    def get_page_count(path_of_pdf: str) -> int:
+        return PdfDocumentRegistry.get_metadata(path_of_pdf).get_page_count()
+
+    @staticmethod
+    def get_metadata(path_of_pdf: str, path_of_db: Optional[str] = None) -> PdfMetadata:
+        if path_of_db is None:
+            path_of_db = os.path.join(PATH_TO_DECKS_ABS, PRIVATE_DB_FILENAME)
+        stat_result: os.stat_result = os.stat(path_of_pdf)
+        # the pdfs are identified by their position in the data folder, as the decks
+        key: str = os.path.relpath(os.path.abspath(path_of_pdf), PATH_TO_DECKS_ABS)
+
+        con: sqlite3.Connection = sqlite3.connect(path_of_db)
+        try:
+            with con:
+                PdfDocumentRegistry.create_table(con)
+                row: Optional[tuple] = con.execute(
+                    "SELECT size, mtime_ns, content_hash, page_sizes, page_hashes FROM pdf_metadata WHERE path = ?",
+                    (key,),
+                ).fetchone()
+                if (
+                    row is not None
+                    and row[0] == stat_result.st_size
+                    and row[1] == stat_result.st_mtime_ns
+                ):
+                    return PdfMetadata(
+                        row[2], PdfDocumentRegistry.__decode_page_sizes(row[3])
+                    )
+
+                content_hash: str = PdfDocumentRegistry.get_content_hash(path_of_pdf)
+                metadata: PdfMetadata
+                page_hashes: Optional[bytes] = None
+                if row is not None and row[2] == content_hash:
+                    # touched but not changed
+                    metadata = PdfMetadata(
+                        content_hash, PdfDocumentRegistry.__decode_page_sizes(row[3])
+                    )
+                    page_hashes = row[4]
+                else:
+                    metadata = PdfMetadata(
+                        content_hash, PdfDocumentRegistry.__read_page_sizes(path_of_pdf)
+                    )
+                con.execute(
+                    "INSERT OR REPLACE INTO pdf_metadata VALUES (?, ?, ?, ?, ?, ?)",
+                    (
+                        key,
+                        stat_result.st_size,
+                        stat_result.st_mtime_ns,
+                        content_hash,
+                        PdfDocumentRegistry.__encode_page_sizes(
+                            metadata.get_page_sizes()
+                        ),
+                        page_hashes,
+                    ),
+                )
+                return metadata
+        finally:
+            con.close()
+
+    @staticmethod
+    def create_table(con: sqlite3.Connection) -> None:
+        con.execute(
+            """CREATE TABLE IF NOT EXISTS pdf_metadata (path text primary key,
+                                                        size integer NOT NULL,
+                                                        mtime_ns integer NOT NULL,
+                                                        content_hash text NOT NULL,
+                                                        page_sizes blob NOT NULL,
+                                                        page_hashes blob)"""
+        )
+        # the tables created before the hashes of the pages were stored
+        columns: list[str] = [
+            row[1] for row in con.execute("PRAGMA table_info(pdf_metadata)")
+        ]
+        if "page_hashes" not in columns:
+            con.execute("ALTER TABLE pdf_metadata ADD COLUMN page_hashes blob")
+
+    @staticmethod
+    def get_page_hashes(
+        path_of_pdf: str, path_of_db: Optional[str] = None
+    ) -> list[str]:
+        """The hash of every page of the pdf, the same while the rendering of the page does not change"""
+        if path_of_db is None:
+            path_of_db = os.path.join(PATH_TO_DECKS_ABS, PRIVATE_DB_FILENAME)
+        content_hash: str = PdfDocumentRegistry.get_metadata(
+            path_of_pdf, path_of_db
+        ).get_content_hash()
+        key: str = os.path.relpath(os.path.abspath(path_of_pdf), PATH_TO_DECKS_ABS)
+
+        con: sqlite3.Connection = sqlite3.connect(path_of_db)
+        try:
+            with con:
+                row: Optional[tuple] = con.execute(
+                    "SELECT page_hashes FROM pdf_metadata WHERE path = ? AND content_hash = ?",
+                    (key, content_hash),
+                ).fetchone()
+                if row is not None and row[0] is not None:
+                    return PdfDocumentRegistry.__decode_page_hashes(row[0])
+
+                page_hashes: list[str] = PdfDocumentRegistry.__compute_page_hashes(
+                    path_of_pdf
+                )
+                con.execute(
+                    "UPDATE pdf_metadata SET page_hashes = ? WHERE path = ? AND content_hash = ?",
+                    (
+                        b"".join(bytes.fromhex(page_hash) for page_hash in page_hashes),
+                        key,
+                        content_hash,
+                    ),
+                )
+                return page_hashes
+        finally:
+            con.close()
+
+    @staticmethod
+    def get_content_hash(path_of_pdf: str) -> str:
+        content_hash = hashlib.sha256()
+        with open(path_of_pdf, "rb") as file:
+            chunk: bytes
+            for chunk in iter(lambda: file.read(1 << 20), b""):
+                content_hash.update(chunk)
+        return content_hash.hexdigest()
+
+    @staticmethod
+    def __read_page_sizes(path_of_pdf: str) -> list[tuple[float, float]]:
+        # the document is loaded only if it is not already open
+        pdf_doc: QtPdf.QPdfDocument = PdfDocumentRegistry.acquire(path_of_pdf)
+        try:
+            page_sizes: list[tuple[float, float]] = []
+            page: int
+            for page in range(pdf_doc.pageCount()):
+                size: QSizeF = pdf_doc.pagePointSize(page)
+                page_sizes.append((size.width(), size.height()))
+            return page_sizes
+        finally:
+            PdfDocumentRegistry.release(pdf_doc)
+
+    @staticmethod
+    def __compute_page_hashes(path_of_pdf: str) -> list[str]:
+        pdf_doc: QtPdf.QPdfDocument = PdfDocumentRegistry.acquire(path_of_pdf)
+        try:
+            page_hashes: list[str] = []
+            page: int
+            for page in range(pdf_doc.pageCount()):
+                point_size: QSizeF = pdf_doc.pagePointSize(page)
+                size: QSize = (point_size * PDF_PAGE_HASH_DPI / 72).toSize()
+                image: QImage = pdf_doc.render(page, size)
+                page_hash = hashlib.sha256()
+                # pages with the same drawings but different sizes have different images
+                page_hash.update(
+                    array("d", [point_size.width(), point_size.height()]).tobytes()
+                )
+                page_hash.update(image.constBits().asstring(image.sizeInBytes()))
+                page_hashes.append(page_hash.hexdigest())
+            return page_hashes
+        finally:
+            PdfDocumentRegistry.release(pdf_doc)
+
+    @staticmethod
+    def __decode_page_hashes(data: bytes) -> list[str]:
+        return [data[i : i + 32].hex() for i in range(0, len(data), 32)]
+
+    @staticmethod
+    def __encode_page_sizes(page_sizes: list[tuple[float, float]]) -> bytes:
+        return array("d", [x for size in page_sizes for x in size]).tobytes()
+
+    @staticmethod
+    def __decode_page_sizes(data: bytes) -> list[tuple[float, float]]:
+        values: array = array("d")
+        values.frombytes(data)
+        return [(values[i], values[i + 1]) for i in range(0, len(values), 2)]
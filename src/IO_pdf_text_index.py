@@ -0,0 +1,134 @@
+# Copyright 2022, 2023 Andrea Cucchietti
+# This file is part of flashcards-from-pdf.
+
+# flashcards-from-pdf is free software: you can redistribute it and/or modify it under the terms of the GNU General Public License as published by the Free Software Foundation, either version 3 of the License, or (at your option) any later version.
+
+# flashcards-from-pdf is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License along with flashcards-from-pdf. If not, see <https://www.gnu.org/licenses/>.
+from typing import Optional
+import sqlite3
+import os
+
+from IO_pdf_registry import PdfDocumentRegistry
+from application_constants import PRIVATE_DB_FILENAME, PATH_TO_DECKS_ABS
+
+
+class PdfTextIndex:
+    """Text of the pages of the pdfs, stored in the private database and searched with the trigram tokenizer of FTS5.
+
+    The pages are identified by the content hash of their pdf, so the text is extracted again only when the content of the pdf changes. The text is stored in lower case and with its whitespace collapsed, so a search matches across the lines of a page.
+    The texts of the pdfs that are no longer in the pdf_metadata table are removed when the text of another pdf is saved.
+    """
+
+    @staticmethod
+    def create_tables(con: sqlite3.Connection) -> None:
+        con.execute(
+            """CREATE VIRTUAL TABLE IF NOT EXISTS pdf_page_text USING fts5(text,
+                                                                          content_hash UNINDEXED,
+                                                                          page UNINDEXED,
+                                                                          tokenize = 'trigram')"""
+        )
+        # the pdfs whose text is completely extracted
+        con.execute(
+            """CREATE TABLE IF NOT EXISTS pdf_text_document (content_hash text primary key,
+                                                             num_pages integer NOT NULL)"""
+        )
+
+    @staticmethod
+    def __get_db_path(path_of_db: Optional[str]) -> str:
+        if path_of_db is None:
+            return os.path.join(PATH_TO_DECKS_ABS, PRIVATE_DB_FILENAME)
+        return path_of_db
+
+    @staticmethod
+    def normalize_text(text: str) -> str:
+        return " ".join(text.split()).lower()
+
+    @staticmethod
+    def is_indexed(content_hash: str, path_of_db: Optional[str] = None) -> bool:
+        con: sqlite3.Connection = sqlite3.connect(
+            PdfTextIndex.__get_db_path(path_of_db)
+        )
+        try:
+            PdfTextIndex.create_tables(con)
+            return (
+                con.execute(
+                    "SELECT 1 FROM pdf_text_document WHERE content_hash = ?",
+                    (content_hash,),
+                ).fetchone()
+                is not None
+            )
+        finally:
+            con.close()
+
+    @staticmethod
+    def save_texts(
+        content_hash: str, texts_of_pages: list[str], path_of_db: Optional[str] = None
+    ) -> None:
+        """Replace the text of the pdf with content_hash with texts_of_pages, one for every page"""
+        con: sqlite3.Connection = sqlite3.connect(
+            PdfTextIndex.__get_db_path(path_of_db)
+        )
+        try:
+            with con:
+                PdfTextIndex.create_tables(con)
+                PdfDocumentRegistry.create_table(con)
+                # the pdfs removed or changed since their text was extracted
+                con.execute(
+                    "DELETE FROM pdf_page_text WHERE content_hash = ? OR content_hash NOT IN (SELECT content_hash FROM pdf_metadata)",
+                    (content_hash,),
+                )
+                con.execute(
+                    "DELETE FROM pdf_text_document WHERE content_hash = ? OR content_hash NOT IN (SELECT content_hash FROM pdf_metadata)",
+                    (content_hash,),
+                )
+                con.executemany(
+                    "INSERT INTO pdf_page_text (text, content_hash, page) VALUES (?, ?, ?)",
+                    (
+                        (PdfTextIndex.normalize_text(text), content_hash, page)
+                        for page, text in enumerate(texts_of_pages)
+                    ),
+                )
+                con.execute(
+                    "INSERT INTO pdf_text_document VALUES (?, ?)",
+                    (content_hash, len(texts_of_pages)),
+                )
+        finally:
+            con.close()
+
+    @staticmethod
+    def search(
+        content_hash: str, text_to_search: str, path_of_db: Optional[str] = None
+    ) -> list[int]:
+        """The pages of the pdf with content_hash that contain text_to_search, sorted"""
+        text_to_search = PdfTextIndex.normalize_text(text_to_search)
+        if text_to_search == "":
+            return []
+        con: sqlite3.Connection = sqlite3.connect(
+            PdfTextIndex.__get_db_path(path_of_db)
+        )
+        try:
+            PdfTextIndex.create_tables(con)
+            if len(text_to_search) < 3:
+                # shorter than a trigram, the text of every page is scanned
+                return [
+                    row[0]
+                    for row in con.execute(
+                        "SELECT page FROM pdf_page_text WHERE content_hash = ? AND instr(text, ?) > 0 ORDER BY page",
+                        (content_hash, text_to_search),
+                    )
+                ]
+            # as a phrase the text is matched as a substring, without the operators of the query syntax
+            return [
+                row[0]
+                for row in con.execute(
+                    "SELECT page FROM pdf_page_text WHERE pdf_page_text MATCH ? AND content_hash = ? ORDER BY page",
+                    (
+                        'text : "' + text_to_search.replace('"', '""') + '"',
+                        content_hash,
+                    ),
+                )
+            ]
+        finally:
+            con.close()
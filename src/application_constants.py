@@ -11,6 +11,7 @@ from PyQt6.QtGui import QFont
 import os
 from io import TextIOWrapper
 import logging
+from typing import Optional
 
 APPLICATION_NAME: str = "Flashcards from PDF"
 PATH_TO_DECKS_FROM_SRC: str = "../data/"
@@ -43,7 +44,39 @@ FIRST_PASS_TEST_FLAG_YES: str = "1"
 FIRST_PASS_TEST_FLAG_NO: str = "0"
 NO_ANSWER_FLAG: str = "!-!"
 FILE_FLASHCARDS_SEPARATOR: str = " ?^? "
+# version of the .txt format of the decks, the files without a version line are of version 1
+DECK_FORMAT_VERSION: int = 2
+# every record ends with a separator followed by a new line. The records of version 1 have no flashcard id
+NUM_SEPARATORS_PER_RECORD: int = 7
+NUM_SEPARATORS_PER_RECORD_V1: int = 6
 ANKI_FLASHCARDS_SEPARATOR: str = "\t"
+# resolution and format of the images of the pdf pages exported to Anki, the number of processes rendering them, all the cores if None, and the pages not exported that are rendered to join two runs of pages
+ANKI_EXPORT_DPI: int = 200
+ANKI_EXPORT_IMAGE_FORMAT: str = "JPEG"
+ANKI_EXPORT_MAX_WORKERS: Optional[int] = None
+ANKI_EXPORT_MAX_PAGES_BETWEEN_RUN_PAGES: int = 2
+# the pages rendered by a call of pdftoppm for a package, kept in memory, and the calls started for every process ahead of the page written, in the .txt files or in the package
+ANKI_EXPORT_PACKAGE_MAX_PAGES_PER_RUN: int = 4
+ANKI_EXPORT_PENDING_RUNS_PER_WORKER: int = 2
+# sidecar files are saved next to the deck with a leading dot, so they are not shown in the decks tree
+DECK_CACHE_EXTENSION: str = ".cache"
+DECK_JOURNAL_EXTENSION: str = ".journal"
+# the journal is compacted into the .txt file once it is bigger than this size, in bytes, or older than this age, in seconds
+DECK_JOURNAL_MAX_SIZE: int = 1 << 20
+DECK_JOURNAL_MAX_AGE: float = 600
+DECK_INDEX_EXTENSION: str = ".idx"
+# the decks bigger than this size, in bytes, are loaded one page at a time
+DECK_LAZY_LOADING_MIN_SIZE: int = 8 << 20
+# the edits of a deck received within this time, in seconds, are written together
+DECK_WRITER_DELAY: float = 0.5
+# number of pdf pages rendered ahead before and after the visualized one, and the memory for the rendered pages, in bytes
+PAGE_RENDER_PREFETCH_PAGES: int = 2
+PAGE_RENDER_CACHE_MAX_BYTES: int = 256 << 20
+# number of decks of the closed windows kept in memory, and their estimated memory, in bytes
+DECK_STATE_CACHE_MAX_DECKS: int = 4
+DECK_STATE_CACHE_MAX_BYTES: int = 128 << 20
+# resolution of the renderings of the pdf pages whose hash tells if a page changed
+PDF_PAGE_HASH_DPI: int = 50
 
 file: TextIOWrapper
 ANKI_CONTENT_DIRECTORY: str = ""
@@ -0,0 +1,43 @@
+# Copyright 2022, 2023 Andrea Cucchietti
+# This file is part of flashcards-from-pdf.
+
+# flashcards-from-pdf is free software: you can redistribute it and/or modify it under the terms of the GNU General Public License as published by the Free Software Foundation, either version 3 of the License, or (at your option) any later version.
+
+# flashcards-from-pdf is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License along with flashcards-from-pdf. If not, see <https://www.gnu.org/licenses/>.
+from PyQt6.QtCore import QObject, QThread
+
+from typing import Optional
+import logging
+
+from IO_deck_search_index import DeckSearchIndex
+
+
+class DeckSearchIndexer(QThread):
+    """Indexes again the decks changed outside the application on a worker thread, so the decks tree is shown without waiting for the DeckSearchIndex.
+
+    The decks already indexed can be searched while the others are indexed.
+    """
+
+    def __init__(
+        self,
+        paths_of_txt: list[str],
+        path_of_db: Optional[str] = None,
+        parent: Optional[QObject] = None,
+    ) -> None:
+        super().__init__(parent)
+        self.__paths_of_txt: list[str] = paths_of_txt
+        self.__path_of_db: Optional[str] = path_of_db
+        self.__num_updated_decks: int = 0
+
+    def run(self) -> None:
+        try:
+            self.__num_updated_decks = DeckSearchIndex.update_decks(
+                self.__paths_of_txt, self.__path_of_db, self.isInterruptionRequested
+            )
+        except Exception:
+            logging.exception("Error while indexing the decks for the search")
+
+    def get_num_updated_decks(self) -> int:
+        return self.__num_updated_decks
@@ -0,0 +1,77 @@
+# Copyright 2022, 2023 Andrea Cucchietti
+# This file is part of flashcards-from-pdf.
+
+# flashcards-from-pdf is free software: you can redistribute it and/or modify it under the terms of the GNU General Public License as published by the Free Software Foundation, either version 3 of the License, or (at your option) any later version.
+
+# flashcards-from-pdf is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License along with flashcards-from-pdf. If not, see <https://www.gnu.org/licenses/>.
+from PyQt6.QtWidgets import (
+    QWidget,
+    QVBoxLayout,
+    QLineEdit,
+    QListWidget,
+    QListWidgetItem,
+)
+
+from typing import Callable
+
+from IO_deck_search_index import DeckSearchIndex, DeckSearchHit
+from flashcard.flashcard import Flashcard
+
+
+class DeckSearchWidget(QWidget):
+    """Search box over the flashcards of all the decks. A double click on a result opens its deck at the flashcard"""
+
+    def __init__(
+        self, parent, method_to_open_deck: Callable[[str, int, int], None]
+    ) -> None:
+        super().__init__(parent)
+        # called with the path of the pdf, the page and the id of the flashcard
+        self.__method_to_open_deck: Callable[[str, int, int], None] = (
+            method_to_open_deck
+        )
+        self.__hits: list[DeckSearchHit] = []
+        self.__search_input: QLineEdit
+        self.__results_list: QListWidget
+
+        self.__set_layout()
+
+    def __set_layout(self) -> None:
+        layout = QVBoxLayout()
+        layout.setContentsMargins(0, 0, 0, 0)
+
+        self.__search_input = QLineEdit(self)
+        self.__search_input.setPlaceholderText("Search the flashcards of all the decks")
+        self.__search_input.textChanged.connect(self.__search)
+
+        self.__results_list = QListWidget(self)
+        self.__results_list.setVisible(False)
+        self.__results_list.itemDoubleClicked.connect(self.__open_hit)
+
+        layout.addWidget(self.__search_input)
+        layout.addWidget(self.__results_list)
+        self.setLayout(layout)
+
+    def __search(self, text_to_search: str) -> None:
+        self.__hits = DeckSearchIndex.search(text_to_search)
+        self.__results_list.clear()
+        hit: DeckSearchHit
+        for hit in self.__hits:
+            page: str = (
+                "generic"
+                if hit.get_page() == Flashcard.GENERIC_PAGE
+                else "page " + str(hit.get_page() + 1)
+            )
+            self.__results_list.addItem(
+                QListWidgetItem(
+                    hit.get_deck_key() + " (" + page + "): " + hit.get_question()
+                )
+            )
+        self.__results_list.setVisible(text_to_search.strip() != "")
+
+    def __open_hit(self, item: QListWidgetItem) -> None:
+        hit: DeckSearchHit = self.__hits[self.__results_list.row(item)]
+        self.__method_to_open_deck(
+            hit.get_path_of_pdf(), hit.get_page(), hit.get_flashcard_id()
+        )
@@ -13,9 +13,10 @@ from PyQt6.QtWidgets import (
     QMenu,
     QHeaderView,
     QApplication,
+    QMessageBox,
 )
 from PyQt6.QtGui import QColor, QFont, QAction, QCursor
-from PyQt6.QtCore import Qt
+from PyQt6.QtCore import Qt, QCoreApplication
 
 import os
 from typing import Optional
@@ -23,9 +24,13 @@ from typing import Optional
 import application_constants
 from pdf_visualization.pdf_visualization_control import PDFWindowVisualizationControl
 from pdf_visualization.pdf_visualization_layout import PDFWindowVisualizationLayout
+from pdf_visualization.deck_state_cache import DeckStateCache
 from deck_directory import DirectoryEntryFolder, DirectoryEntryFile, FILE, FOLDER
 from update_pdf import update_file
-from IO_flashcards_management import IOFlashcards
+from IO_anki_export import AnkiExport
+from IO_deck_database import DeckDatabase
+from IO_deck_summary import DeckSummary, DeckSummaryIndex
+from deck_search_indexer import DeckSearchIndexer
 
 
 class DecksStructure(QTreeWidget):
@@ -34,6 +39,10 @@ class DecksStructure(QTreeWidget):
 
         self.__set_state_variable(path)
         self.__create_tree()
+        app: Optional[QCoreApplication] = QCoreApplication.instance()
+        if app is not None:
+            # the thread has to be finished before the application exits
+            app.aboutToQuit.connect(self.__stop_search_indexer)
 
         # app = self.headerItem()
         # col = app.takeChild(self.num_col - self.num_hidden_col)
@@ -42,13 +51,17 @@ class DecksStructure(QTreeWidget):
         self.itemDoubleClicked.connect(self.__on_entry_double_clicked)
 
     def __set_state_variable(self, path: str) -> None:
-        self.__num_col: int = 4
+        self.__num_col: int = 5
         self.__col_path: int = self.__num_col - 1  # path column is the last
         self.__path: str = path
         self.__root_folder: DirectoryEntryFolder
         self.__pdf_window_control: PDFWindowVisualizationControl
         self.__menu_right_click: QMenu
         self.__path_to_update: str
+        self.__summaries: dict[str, tuple[DeckSummary, int]]
+        # .txt file of every deck in the tree
+        self.__paths_of_decks: list[str]
+        self.__search_indexer: Optional[DeckSearchIndexer] = None
 
     def __create_tree(self) -> None:
         self.__set_style_tree()
@@ -57,7 +70,7 @@ class DecksStructure(QTreeWidget):
     def __set_style_tree(self) -> None:
         self.setColumnCount(self.__num_col)
         self.setFont(QFont("Calisto MT", 12))
-        self.setHeaderLabels(["Name", "Type", "Buttons", "Path"])
+        self.setHeaderLabels(["Name", "Type", "Buttons", "Progress", "Path"])
         base_width = application_constants.BASE_HOME_WIDTH // (self.__num_col)
         app: Optional[QHeaderView] = self.header()
         if app is None:
@@ -67,6 +80,9 @@ class DecksStructure(QTreeWidget):
 
     def create_top_level_tree(self) -> None:
         self.clear()
+        # the progress of the decks is read from the summary index, without parsing them
+        self.__summaries = DeckSummaryIndex.load_summaries()
+        self.__paths_of_decks = []
         self.__root_folder = DirectoryEntryFolder(entry_name="root", path=self.__path)
         entries = self.__get_subtree(self.__root_folder)
         self.insertTopLevelItems(
@@ -77,6 +93,20 @@ class DecksStructure(QTreeWidget):
                 entries,
             ),
         )
+        # only the decks changed outside the application are indexed again, while the tree is shown
+        self.__stop_search_indexer()
+        self.__search_indexer = DeckSearchIndexer(
+            list(self.__paths_of_decks), parent=self
+        )
+        self.__search_indexer.start()
+
+    def __stop_search_indexer(self) -> None:
+        if self.__search_indexer is None:
+            return
+        # the decks not indexed yet are indexed by the next one
+        self.__search_indexer.requestInterruption()
+        self.__search_indexer.wait()
+        self.__search_indexer = None
 
     def __get_subtree(self, folder: DirectoryEntryFolder) -> list[QTreeWidgetItem]:
         entries: list[QTreeWidgetItem] = []
@@ -105,7 +135,7 @@ class DecksStructure(QTreeWidget):
             elif type == FOLDER:
                 assert isinstance(entry, DirectoryEntryFolder), True
                 child_entries = self.__get_subtree(entry)
-                child = QTreeWidgetItem([entry_name, "Dir", "", folder_path])
+                child = QTreeWidgetItem([entry_name, "Dir", "", "", folder_path])
                 child.setBackground(0, QColor(218, 224, 126))
                 child.addChildren(child_entries)
             else:
@@ -115,7 +145,14 @@ class DecksStructure(QTreeWidget):
 
     def __create_entry_file(self, entry_name: str, path: str) -> QTreeWidgetItem:
         ext = entry_name.split(".")[-1].upper()
-        child = QTreeWidgetItem([entry_name, ext, "", path])
+        path_without_ext, _ = os.path.splitext(os.path.join(path, entry_name))
+        summary: Optional[DeckSummary] = DeckSummaryIndex.get_summary(
+            path_without_ext + ".txt", self.__summaries
+        )
+        progress: str = "" if summary is None else summary.get_progress_string()
+        if summary is not None:
+            self.__paths_of_decks.append(path_without_ext + ".txt")
+        child = QTreeWidgetItem([entry_name, ext, "", progress, path])
 
         pixmapi = getattr(QStyle.StandardPixmap, "SP_MediaPlay")
         app: Optional[QStyle] = self.style()
@@ -141,12 +178,46 @@ class DecksStructure(QTreeWidget):
 
         export_anki_button = QAction("Export to txt", self.__menu_right_click)
         export_anki_button.setStatusTip(
-            "Creates the txt file that should be used to import the flashcards in Anki"
+            "Creates a new txt file that should be used to import in Anki the flashcards new or changed since the last export"
         )
         export_anki_button.triggered.connect(self.__export_to_anki)
 
+        export_all_anki_button = QAction(
+            "Export all to txt", self.__menu_right_click
+        )
+        export_all_anki_button.setStatusTip(
+            "Creates the txt file that should be used to import all the flashcards in Anki"
+        )
+        export_all_anki_button.triggered.connect(self.__export_all_to_anki)
+
+        export_anki_package_button = QAction(
+            "Export to Anki package", self.__menu_right_click
+        )
+        export_anki_package_button.setStatusTip(
+            "Creates in data/Anki an .apkg file with all the flashcards and their pdf pages, that is opened with Anki"
+        )
+        export_anki_package_button.triggered.connect(self.__export_to_anki_package)
+
+        import_database_button = QAction("Store in database", self.__menu_right_click)
+        import_database_button.setStatusTip(
+            "Moves the flashcards in the private database, the txt file is kept as a backup"
+        )
+        import_database_button.triggered.connect(self.__import_to_database)
+
+        export_database_button = QAction(
+            "Store in txt file", self.__menu_right_click
+        )
+        export_database_button.setStatusTip(
+            "Moves the flashcards from the private database back to the txt file"
+        )
+        export_database_button.triggered.connect(self.__export_from_database)
+
         self.__menu_right_click.addAction(update_button)
         self.__menu_right_click.addAction(export_anki_button)
+        self.__menu_right_click.addAction(export_all_anki_button)
+        self.__menu_right_click.addAction(export_anki_package_button)
+        self.__menu_right_click.addAction(import_database_button)
+        self.__menu_right_click.addAction(export_database_button)
 
     def __open_right_click_menu(self, event) -> None:
         selected_items = self.selectedItems()
@@ -161,18 +232,82 @@ class DecksStructure(QTreeWidget):
 
     def __update_file(self, event) -> None:
         update_file(self.__path_to_update)
+        path_without_ext, _ = os.path.splitext(self.__path_to_update)
+        DeckStateCache.invalidate(path_without_ext + ".txt")
 
     def __export_to_anki(self, event) -> None:
+        self.__export_flashcards_to_anki(AnkiExport(is_full_export=False))
+
+    def __export_all_to_anki(self, event) -> None:
+        self.__export_flashcards_to_anki(AnkiExport(is_full_export=True))
+
+    def __export_to_anki_package(self, event) -> None:
+        self.__export_flashcards_to_anki(
+            AnkiExport(
+                path_of_package=AnkiExport.get_package_path(self.__path_to_update)
+            )
+        )
+
+    def __export_flashcards_to_anki(self, anki_export: AnkiExport) -> None:
         _, ext = os.path.splitext(self.__path_to_update)
         QApplication.setOverrideCursor(Qt.CursorShape.WaitCursor)
-        if ext == ".pdf":
-            IOFlashcards.save_flashcards_to_anki(self.__path_to_update)
-        elif ext == "":
-            self.__export_directory_to_anki(self.__path_to_update)
+        is_completed: bool = False
+        try:
+            if ext == ".pdf":
+                anki_export.save_deck(self.__path_to_update)
+            elif ext == "":
+                self.__export_directory_to_anki(anki_export, self.__path_to_update)
+            is_completed = True
+        finally:
+            anki_export.close(is_completed)
+            QApplication.restoreOverrideCursor()
+        QMessageBox.information(
+            self,
+            application_constants.APPLICATION_NAME,
+            "Exported "
+            + str(anki_export.get_num_exported_flashcards())
+            + " flashcards of "
+            + str(anki_export.get_num_flashcards())
+            + " in "
+            + f"{anki_export.get_export_time():.1f}"
+            + " s ("
+            + f"{anki_export.get_flashcards_per_second():.1f}"
+            + " flashcards/s), "
+            + str(anki_export.get_num_rendered_pages())
+            + " pages rendered and "
+            + str(anki_export.get_num_cached_pages())
+            + " already exported",
+        )
 
+    def __import_to_database(self, event) -> None:
+        path_without_ext: str
+        path_without_ext, ext = os.path.splitext(self.__path_to_update)
+        if ext != ".pdf" or not os.path.isfile(path_without_ext + ".txt"):
+            return
+        QApplication.setOverrideCursor(Qt.CursorShape.WaitCursor)
+        # from now on the deck is read from the database
+        DeckStateCache.invalidate(path_without_ext + ".txt")
+        deck_database: DeckDatabase = DeckDatabase(path_without_ext + ".txt")
+        deck_database.import_deck(path_without_ext + ".txt")
+        deck_database.close()
         QApplication.restoreOverrideCursor()
 
-    def __export_directory_to_anki(self, path_dir_to_update: str) -> None:
+    def __export_from_database(self, event) -> None:
+        path_without_ext: str
+        path_without_ext, ext = os.path.splitext(self.__path_to_update)
+        if ext != ".pdf":
+            return
+        QApplication.setOverrideCursor(Qt.CursorShape.WaitCursor)
+        deck_database: DeckDatabase = DeckDatabase(path_without_ext + ".txt")
+        if deck_database.is_deck_stored():
+            deck_database.export_deck(path_without_ext + ".txt")
+            deck_database.remove_deck()
+        deck_database.close()
+        QApplication.restoreOverrideCursor()
+
+    def __export_directory_to_anki(
+        self, anki_export: AnkiExport, path_dir_to_update: str
+    ) -> None:
         dirpath: str
         dirnames: list[str]
         filenames: list[str]
@@ -180,7 +315,9 @@ class DecksStructure(QTreeWidget):
         for dirpath, dirnames, filenames in os.walk(path_dir_to_update):
             for filename in filenames:
                 full_path = os.path.join(dirpath, filename)
-                IOFlashcards.save_flashcards_to_anki(full_path)
+                # the .txt and the sidecar files of a deck are next to its pdf
+                if os.path.splitext(filename)[1] == ".pdf":
+                    anki_export.save_deck(full_path)
 
     def __on_entry_double_clicked(
         self, entry_pressed: QTreeWidgetItem, col_pressed: int
@@ -188,8 +325,19 @@ class DecksStructure(QTreeWidget):
         full_path: str = self.__get_entry_full_path(entry_pressed)
         app = full_path.strip().lower()[-4:]
         if app == ".pdf":
-            self.__pdf_window_control = PDFWindowVisualizationControl(full_path)
-            self.__pdf_window_control.get_pdf_window_visualization_layout().showMaximized()
+            self.open_deck(full_path)
+
+    def open_deck(
+        self,
+        path_of_pdf: str,
+        page: Optional[int] = None,
+        flashcard_id: Optional[int] = None,
+    ) -> None:
+        """Open the window of the deck, at the flashcard with flashcard_id of page if they are given"""
+        self.__pdf_window_control = PDFWindowVisualizationControl(path_of_pdf)
+        if page is not None and flashcard_id is not None:
+            self.__pdf_window_control.show_flashcard(page, flashcard_id)
+        self.__pdf_window_control.get_pdf_window_visualization_layout().showMaximized()
 
     def __get_entry_full_path(self, entry: QTreeWidgetItem) -> str:
         name_col = 0
@@ -10,12 +10,13 @@ from abc import ABC, abstractmethod
 
 
 class Card(ABC):
+    __slots__ = ("__pdf_page_index_before", "__flashcard_index_before")
+
     DEFAULT_VALUE: int = -5
 
     def __init__(self) -> None:
         self.__pdf_page_index_before: int = -1
         self.__flashcard_index_before: int = -1
-        pass
 
     @abstractmethod
     def get_pdf_page(self) -> int:
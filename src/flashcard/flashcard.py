@@ -7,6 +7,8 @@
 
 # You should have received a copy of the GNU General Public License along with flashcards-from-pdf. If not, see <https://www.gnu.org/licenses/>.
 from enum import Enum
+from typing import Optional
+from random import getrandbits
 
 from flashcard.card import Card
 from application_constants import NO_ANSWER_FLAG
@@ -14,6 +16,18 @@ from application_constants import FILE_FLASHCARDS_SEPARATOR
 
 
 class Flashcard(Card):
+    # the flashcards of a deck are many, without an instance dict each one takes less memory
+    __slots__ = (
+        "__question",
+        "__answer",
+        "__question_type",
+        "__past_results",
+        "__reference_page",
+        "__current_result",
+        "__id",
+        "__weakref__",
+    )
+
     GENERIC_PAGE: int = -2
 
     class QuestionType(Enum):
@@ -42,6 +56,7 @@ class Flashcard(Card):
         past_results: list[Result] = list(),
         reference_page: int = 0,
         current_result: Result = Result.NOT_DONE,
+        flashcard_id: Optional[int] = None,
     ) -> None:
         super().__init__()
         self.set_question(question)
@@ -50,27 +65,45 @@ class Flashcard(Card):
         self.set_past_results(past_results)
         self.set_reference_page(reference_page)
         self.set_current_result(current_result)
+        if flashcard_id is None:
+            flashcard_id = Flashcard.new_id()
+        self.set_id(flashcard_id)
+
+    @staticmethod
+    def new_id() -> int:
+        # random, so the flashcards created on different copies of a deck do not collide
+        return getrandbits(63)
+
+    def set_id(self, flashcard_id: int) -> None:
+        self.__id = flashcard_id
+
+    def get_id(self) -> int:
+        return self.__id
 
     def set_question(self, question: str) -> None:
-        self.__question: str = question
+        self.__question = question
 
     def set_answer(self, answer: str) -> None:
-        self.__answer: str = answer
+        self.__answer = answer
 
     def set_question_type(self, question_type: QuestionType) -> None:
-        self.__question_type: Flashcard.QuestionType = question_type
+        self.__question_type = question_type
 
     def set_past_results(self, past_results: list[Result]) -> None:
-        self.__past_results: list[Flashcard.Result] = past_results
+        self.__past_results = bytes(result.value for result in past_results)
+
+    def set_packed_past_results(self, past_results: bytes) -> None:
+        """past_results has a byte with the value of every Flashcard.Result"""
+        self.__past_results = past_results
 
     def set_reference_page(self, reference_page: int = 0) -> None:
-        self.__reference_page: int = reference_page
+        self.__reference_page = reference_page
 
     def set_reference_page_from_visualization(self, reference_page: int = 0) -> None:
         self.__reference_page = reference_page - 1
 
     def set_current_result(self, current_result: Result = Result.NOT_DONE) -> None:
-        self.__current_result: Flashcard.Result = current_result
+        self.__current_result = current_result
 
     def get_reference_page(self) -> int:
         return self.__reference_page
@@ -88,6 +121,9 @@ class Flashcard(Card):
         return self.__question_type
 
     def get_past_results(self) -> list["Flashcard.Result"]:
+        return [Flashcard.Result(value) for value in self.__past_results]
+
+    def get_packed_past_results(self) -> bytes:
         return self.__past_results
 
     def get_current_result(self) -> Result:
@@ -102,9 +138,8 @@ class Flashcard(Card):
         else:
             answer = self.get_answer()
 
-        past_results: str = ""
-        for res in self.get_past_results():
-            past_results = "".join([past_results, res.to_string()])
+        # the values of the results are single digits
+        past_results: str = "".join(str(value) for value in self.__past_results)
 
         return FILE_FLASHCARDS_SEPARATOR.join(
             [
@@ -114,6 +149,7 @@ class Flashcard(Card):
                 self.get_question_type().to_string(),
                 past_results,
                 self.get_current_result().to_string(),
+                str(self.get_id()),
             ]
         )
 
@@ -122,7 +158,7 @@ class Flashcard(Card):
             self.get_question() == value.get_question()
             and self.get_answer() == value.get_answer()
             and self.get_question_type().value == value.get_question_type().value
-            and self.get_past_results() == value.get_past_results()
+            and self.get_packed_past_results() == value.get_packed_past_results()
             and self.get_current_result() == value.get_current_result()
         ):
             return True
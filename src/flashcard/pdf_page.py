@@ -10,6 +10,8 @@ from flashcard.card import Card
 
 
 class PdfPage(Card):
+    __slots__ = ("num_page", "__card_index")
+
     GENERIC_CARD_INDEX = -1
 
     def __init__(
@@ -21,7 +23,7 @@ class PdfPage(Card):
         self.__card_index: int = PdfPage.GENERIC_CARD_INDEX
 
     def set_num_page(self, num_page: int) -> None:
-        self.num_page: int = num_page
+        self.num_page = num_page
 
     def get_num_page(self) -> int:
         return self.num_page
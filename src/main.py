@@ -34,7 +34,13 @@ from application_constants import (
     APPLICATION_LOG_PATH,
 )
 from decks_tree import DecksStructure
-from statistics_tab.get_statistics import get_statistics, create_table_timestamp
+from deck_search_widget import DeckSearchWidget
+from IO_deck_writer import DeckWriter
+from statistics_tab.get_statistics import (
+    get_statistics,
+    get_decks_summary,
+    create_table_timestamp,
+)
 
 import sys
 import sqlite3
@@ -42,6 +48,7 @@ import os
 from datetime import datetime
 import logging
 import traceback
+import multiprocessing
 
 
 class MainWindow(QWidget):
@@ -49,6 +56,7 @@ class MainWindow(QWidget):
         super().__init__(*args, **kwargs)
         self.__decks_page: QWidget
         self.__tree: DecksStructure
+        self.__deck_search: DeckSearchWidget
         self.__reload_tree_structure_button: QPushButton
 
         self.__set_window_style()
@@ -90,7 +98,10 @@ class MainWindow(QWidget):
         self.__tree = DecksStructure(self.__decks_page, PATH_TO_DECKS_ABS)
         self.__tree.show()
 
+        self.__deck_search = DeckSearchWidget(self.__decks_page, self.__tree.open_deck)
+
         layout.addWidget(self.__reload_tree_structure_button)
+        layout.addWidget(self.__deck_search)
         layout.addWidget(self.__tree)
         self.__decks_page.setLayout(layout)
         return self.__decks_page
@@ -105,6 +116,7 @@ class MainWindow(QWidget):
         label = QLabel(self)
         label.setText("Work in progress...")
         layout.addWidget(get_statistics())
+        layout.addWidget(get_decks_summary())
         layout.addWidget(label)
         stats_page.setLayout(layout)
         return stats_page
@@ -149,6 +161,8 @@ def __write_error_log(exc: Exception) -> None:
 
 
 if __name__ == "__main__":
+    # in the executable built by PyInstaller, the processes of the Anki export run their job instead of the application
+    multiprocessing.freeze_support()
     add_new_start_timestamp()
     exit_code: int = 0
     try:
@@ -160,6 +174,8 @@ if __name__ == "__main__":
     except Exception as exc:
         __write_error_log(exc)
     finally:
+        # the decks still open are written before exiting
+        DeckWriter.flush_all()
         add_new_end_timestamp()
 
         sys.exit(exit_code)
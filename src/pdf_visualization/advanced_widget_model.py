@@ -11,6 +11,7 @@ from PyQt6.QtCore import Qt
 
 
 from pdf_visualization.advanced_widget_layout import AdvancedOptionsLayout
+from collections.abc import Sequence
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
@@ -63,12 +64,13 @@ class AdvancedOptionsModel:
         if increment == 0:
             return
         current_index: int = self.__pdf_visualization_model.get_current_card_index()
-        cards: list[Card] = self.__pdf_visualization_model.get_cards_to_display()
+        cards: Sequence[Card] = self.__pdf_visualization_model.get_cards_to_display()
         num_pdf_pages: int = self.__pdf_visualization_model.get_num_pdf_pages()
         step: int = 1
         if end < current_index:
             step = -1
 
+        changed_pages: set[int] = set()
         for i in range(current_index, end, step):
             if isinstance(cards[i], Flashcard):
                 flashcard: Flashcard = cards[i]
@@ -80,13 +82,14 @@ class AdvancedOptionsModel:
                 elif flashcard.get_reference_page() + increment < 0:
                     new_reference_page = 0
 
+                changed_pages.add(flashcard.get_reference_page())
+                changed_pages.add(new_reference_page)
                 flashcard.set_reference_page(new_reference_page)
 
         # update
         QApplication.setOverrideCursor(Qt.CursorShape.WaitCursor)
-        self.__pdf_visualization_model.refresh_merged_cards(
-            self.__pdf_visualization_model.get_is_deck_ordered()
-        )
-        self.__pdf_visualization_model.save_flashcards_to_file()
+        self.__pdf_visualization_model.regroup_flashcards_by_page(changed_pages)
+        self.__pdf_visualization_model.update_merged_cards(changed_pages)
+        self.__pdf_visualization_model.save_flashcards_to_file(changed_pages)
         self.__pdf_visualization_model.set_current_card_index(current_index)
         QApplication.restoreOverrideCursor()
@@ -11,8 +11,8 @@ from PyQt6.QtCore import Qt, QPointF
 from PyQt6 import QtPdf, QtPdfWidgets
 
 import os
+from collections.abc import Mapping, Sequence
 from typing import Optional
-from random import shuffle
 
 
 from typing import TYPE_CHECKING
@@ -26,6 +26,12 @@ from flashcard.card import Card
 from IO_flashcards_management import IOFlashcards
 from test_management.pdf_test_info import PDFTestsInfo
 from pdf_visualization.right_panel_manager import RightPanelManager
+from pdf_visualization.ordered_cards_view import (
+    OrderedCardsView,
+    PdfPageToCardIndex,
+    FlashcardToCardIndex,
+)
+from pdf_visualization.shuffle_review_queue import ShuffleReviewQueue
 
 
 class CardsNavigator:
@@ -55,13 +61,13 @@ class CardsNavigator:
     def __get_num_pdf_pages(self) -> int:
         return self.__pdf_window_model.get_num_pdf_pages()
 
-    def get_cards_to_display(self) -> list[Card]:
+    def get_cards_to_display(self) -> Sequence[Card]:
         return self.__pdf_window_model.get_cards_to_display()
 
-    def __get_num_pdf_page_to_card_index(self) -> list[int]:
+    def __get_num_pdf_page_to_card_index(self) -> Sequence[int]:
         return self.__pdf_window_model.get_num_pdf_page_to_card_index()
 
-    def get_num_flashcard_to_card_index(self) -> list[int]:
+    def get_num_flashcard_to_card_index(self) -> Sequence[int]:
         return self.__pdf_window_model.get_num_flashcard_to_card_index()
 
     def __get_num_cards(self) -> int:
@@ -469,251 +475,66 @@ class CardsNavigator:
 
 # How the cards are created is strictly connected to how the navigator behave
 def merge_cards_ordered(
-    flashcards_per_page: dict[int, list[Flashcard]], num_pdf_pages: int
-) -> tuple[list[Card], list[int], list[int]]:
+    flashcards_per_page: Mapping[int, list[Flashcard]], num_pdf_pages: int
+) -> tuple[OrderedCardsView, PdfPageToCardIndex, FlashcardToCardIndex]:
     """Merge the flashcards and the pages in the correct order.
 
-    It orders the flashcards and the pdf pages in a unique list that matches the visualization outcome.
+    It orders the flashcards and the pdf pages in a unique sequence that matches the visualization outcome. The cards are computed when they are accessed, so the cost does not depend on the number of pdf pages.
 
     Parameters
     ----------
-    flashcards_per_page : dict[int, list[Flashcard]]
+    flashcards_per_page : Mapping[int, list[Flashcard]]
         The key is a page number, and the corresponding items are the flashcards for that page.
     num_pdf_pages : int
         The number of pages in the pdf visualized.
 
     Returns
     -------
-    tuple[list[Card]], list[int], list[int]]
-    The first returned parameter is a list of all ordered cards to be displayed. The second element is a vector that stores for each pdf page number the corresponding visualization position. The last returned value does the same with flashcards.
+    tuple[OrderedCardsView, PdfPageToCardIndex, FlashcardToCardIndex]
+    The first returned parameter is the sequence of all ordered cards to be displayed. The second element is a sequence that gives for each pdf page number the corresponding visualization position. The last returned value does the same with flashcards.
 
     """
-    # sort the flashcards by page number, same page number leaves the order that there was before. In this way the order in which the user put the flashcards is left
-    flashcards_per_page = dict(sorted(flashcards_per_page.items(), key=lambda x: x[0]))
-    flashcards: list[Flashcard] = get_flashcards_list(flashcards_per_page)
-
-    num_flashcards: int = len(flashcards)
-    num_cards: int = num_flashcards + num_pdf_pages
-
-    card_pos: int
-    index_flashcard_to_add: int = 0
-    index_pdf_page_to_add: int = 0
-
-    num_pdf_page_to_card_index: list[int] = []
-    num_flashcard_to_card_index: list[int] = []
-    merged_cards: list[Card] = []
-
-    for card_pos in range(0, num_cards, 1):
-        card: Card
-        is_flashcard_next = is_a_flashcard_next(
-            index_flashcard_to_add,
-            num_flashcards,
-            index_pdf_page_to_add,
-            num_pdf_pages,
-            flashcards,
-        )
-
-        if is_flashcard_next:
-            card = flashcards[index_flashcard_to_add]
-        else:
-            card = PdfPage(index_pdf_page_to_add)
-
-        card.set_pdf_page_index_before(index_pdf_page_to_add - 1)
-        card.set_flashcard_index_before(index_flashcard_to_add - 1)
-
-        if is_flashcard_next:
-            num_flashcard_to_card_index.append(len(merged_cards))
-            index_flashcard_to_add += 1
-        else:
-            num_pdf_page_to_card_index.append(len(merged_cards))
-            index_pdf_page_to_add += 1
-
-        merged_cards.append(card)
-
-    return (merged_cards, num_pdf_page_to_card_index, num_flashcard_to_card_index)
-
-
-def is_a_flashcard_next(
-    index_flashcard_to_add: int,
-    num_flashcards: int,
-    index_pdf_page_to_add: int,
-    num_pdf_pages: int,
-    flashcards: list[Flashcard],
-) -> bool:
-    is_flashcard_next: bool = True
-
-    if index_flashcard_to_add == num_flashcards:
-        is_flashcard_next = False
-    elif index_pdf_page_to_add == num_pdf_pages:
-        is_flashcard_next = True
-    elif (
-        flashcards[index_flashcard_to_add].get_reference_page() <= index_pdf_page_to_add
-    ):
-        is_flashcard_next = True
-    else:
-        is_flashcard_next = False
-    return is_flashcard_next
+    # same page number leaves the order that there was before. In this way the order in which the user put the flashcards is left
+    cards_view: OrderedCardsView = OrderedCardsView(flashcards_per_page, num_pdf_pages)
+    return (
+        cards_view,
+        PdfPageToCardIndex(cards_view),
+        FlashcardToCardIndex(cards_view),
+    )
 
 
 def merge_cards_shuffle(
-    flashcards_per_page: dict[int, list[Flashcard]], num_pdf_pages: int
-) -> tuple[list[Card], list[int], list[int]]:
+    flashcards_per_page: Mapping[int, list[Flashcard]], num_pdf_pages: int
+) -> tuple[ShuffleReviewQueue, PdfPageToCardIndex, FlashcardToCardIndex]:
     """It shuffles the untested flashcards and it merges it with the corresponding pdf pages. The pdf pages that are not referenced by any flashcards are positioned at the end.
 
-    The result is saved in a list that matches the visualization outcome.
+    The result is a queue that matches the visualization outcome. The answered flashcards are removed from it without shuffling the others again.
 
     Parameters
     ----------
-    flashcards_per_page : dict[int, list[Flashcard]]
+    flashcards_per_page : Mapping[int, list[Flashcard]]
         The key is a page number, and the corresponding items are the flashcards for that page.
     num_pdf_pages : int
         The number of pages in the pdf visualized.
 
     Returns
     -------
-    tuple[list[Card]], list[int], list[int]]
-    The first returned parameter is a list of all ordered cards to be displayed. The second element is a vector that stores for each pdf page number that is visualized the corresponding visualization position. The last returned value does the same with flashcards.
+    tuple[ShuffleReviewQueue, PdfPageToCardIndex, FlashcardToCardIndex]
+    The first returned parameter is the sequence of all the cards to be displayed. The second element is a sequence that gives for each pdf page number the corresponding visualization position. The last returned value does the same with flashcards.
 
     """
-
-    flashcards = get_shuffled_flashcards(flashcards_per_page)
-    num_flashcards: int = len(flashcards)
-
-    card_pos: int
-    pdf_pages_referenced_by_flashcard: set[int] = set()
-
-    num_pdf_page_to_card_index: list[int] = [-1] * num_pdf_pages
-    num_flashcard_to_card_index: list[int] = []
-    merged_cards: list[Card] = []
-    card: Card
-    flashcard: Flashcard
-
-    add_flashcards(
-        merged_cards,
-        flashcards,
-        num_flashcard_to_card_index,
-        num_pdf_page_to_card_index,
-        pdf_pages_referenced_by_flashcard,
+    review_queue: ShuffleReviewQueue = ShuffleReviewQueue(
+        flashcards_per_page, num_pdf_pages
     )
-    last_flashcard: Flashcard = None
-    if len(flashcards) != 0:
-        last_flashcard = flashcards[-1]
-    add_remaining_pdf_pages(
-        num_pdf_pages,
-        pdf_pages_referenced_by_flashcard,
-        num_flashcards,
-        last_flashcard,
-        merged_cards,
-        num_pdf_page_to_card_index,
+    return (
+        review_queue,
+        PdfPageToCardIndex(review_queue),
+        FlashcardToCardIndex(review_queue),
     )
 
-    return (merged_cards, num_pdf_page_to_card_index, num_flashcard_to_card_index)
-
-
-def get_shuffled_flashcards(flashcards_per_page) -> list[Flashcard]:
-    flashcards: list[Flashcard] = get_flashcards_list(flashcards_per_page)
-    shuffle(flashcards)
-    # add not_done flashcards
-    filtered_flashcards: list[Flashcard] = [
-        flashcard
-        for flashcard in flashcards
-        if flashcard.get_current_result() == Flashcard.Result.NOT_DONE
-    ]
-    return filtered_flashcards
-
 
 def get_flashcards_list(flashcards_per_page) -> list[Flashcard]:
     flashcards: list[Flashcard] = []
     for app in flashcards_per_page.values():
         flashcards.extend(app)
     return flashcards
-
-
-def add_flashcards(
-    merged_cards: list[Card],
-    flashcards: list[Flashcard],
-    num_flashcard_to_card_index: list[int],
-    num_pdf_page_to_card_index: list[int],
-    pdf_pages_referenced_by_flashcard: set[int],
-) -> None:
-    # add flashcards with the referenced PDF page afterwards
-    index_flashcard_to_add: int
-    num_flashcards: int = len(flashcards)
-    for index_flashcard_to_add in range(0, num_flashcards, 1):
-        flashcard: Flashcard = flashcards[index_flashcard_to_add]
-        flashcard.set_flashcard_index_before(index_flashcard_to_add - 1)
-        if (
-            flashcard.get_reference_page() - 1 >= 0
-            and flashcard.get_question_type() != Flashcard.QuestionType.GENERIC
-        ):
-            flashcard.set_pdf_page_index_before(flashcard.get_reference_page() - 1)
-        else:
-            flashcard.set_pdf_page_index_before(Flashcard.GENERIC_PAGE)
-
-        num_flashcard_to_card_index.append(len(merged_cards))
-        merged_cards.append(flashcard)
-
-        if flashcard.get_question_type() == Flashcard.QuestionType.PAGE_SPECIFIC:
-            add_page_specific_flashcard(
-                flashcard,
-                index_flashcard_to_add,
-                merged_cards,
-                num_pdf_page_to_card_index,
-                pdf_pages_referenced_by_flashcard,
-            )
-
-
-def add_page_specific_flashcard(
-    flashcard: Flashcard,
-    index_flashcard_to_add: int,
-    merged_cards: list[Card],
-    num_pdf_page_to_card_index: list[int],
-    pdf_pages_referenced_by_flashcard: set[int],
-) -> None:
-    # add PDF page afterwards
-    pdf_page: PdfPage = PdfPage(flashcard.get_reference_page())
-    pdf_page.set_card_index(len(merged_cards))
-    pdf_page.set_flashcard_index_before(index_flashcard_to_add)
-
-    pdf_pages_referenced_by_flashcard.add(flashcard.get_reference_page())
-    num_pdf_page_to_card_index[flashcard.get_reference_page()] = len(merged_cards)
-    if (
-        flashcard.get_reference_page() - 1 >= 0
-        and flashcard.get_question_type() != Flashcard.QuestionType.GENERIC
-    ):
-        pdf_page.set_pdf_page_index_before(flashcard.get_reference_page() - 1)
-    else:
-        pdf_page.set_pdf_page_index_before(Flashcard.GENERIC_PAGE)
-    merged_cards.append(pdf_page)
-
-
-def add_remaining_pdf_pages(
-    num_pdf_pages: int,
-    pdf_pages_referenced_by_flashcard: set[int],
-    num_flashcards: int,
-    last_flashcard: Flashcard,
-    merged_cards: list[Card],
-    num_pdf_page_to_card_index: list[int],
-) -> None:
-    # add remaining PDF pages. They are used if during a review the students needs to move more than one page onwards or move on a different pdf page
-    index_pdf_page_to_add: int
-
-    # the remaining PDF pages have all the same reference to the same previous flashcard
-    index_flashcard_before: int
-    if (
-        num_flashcards > 0
-        and last_flashcard.get_question_type() != Flashcard.QuestionType.GENERIC
-    ):
-        index_flashcard_before = num_flashcards - 1
-    else:
-        index_flashcard_before = Flashcard.GENERIC_PAGE
-
-    for index_pdf_page_to_add in range(0, num_pdf_pages, 1):
-        if index_pdf_page_to_add not in pdf_pages_referenced_by_flashcard:
-            pdf_page = PdfPage(index_pdf_page_to_add)
-            pdf_page.set_flashcard_index_before(index_flashcard_before)
-            pdf_page.set_pdf_page_index_before(index_pdf_page_to_add - 1)
-            pdf_page.set_card_index(len(merged_cards))
-
-            num_pdf_page_to_card_index[index_pdf_page_to_add] = len(merged_cards)
-            merged_cards.append(pdf_page)
@@ -0,0 +1,155 @@
+# Copyright 2022, 2023 Andrea Cucchietti
+# This file is part of flashcards-from-pdf.
+
+# flashcards-from-pdf is free software: you can redistribute it and/or modify it under the terms of the GNU General Public License as published by the Free Software Foundation, either version 3 of the License, or (at your option) any later version.
+
+# flashcards-from-pdf is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License along with flashcards-from-pdf. If not, see <https://www.gnu.org/licenses/>.
+from PyQt6.QtCore import QObject, QThread, pyqtSignal
+
+from collections.abc import MutableMapping
+from typing import Optional
+import logging
+
+from pdf_visualization.cards_navigator import merge_cards_ordered
+from pdf_visualization.flashcard_positions import FlashcardPositions
+from pdf_visualization.deck_state_cache import DeckState
+from pdf_visualization.search.flashcard_search_index import FlashcardSearchIndex
+from test_management.test_progress import TestProgress
+from test_management.pdf_test_info import PDFTestsInfo
+from flashcard.flashcard import Flashcard
+from IO_flashcards_management import IOFlashcards
+from IO_deck_database import DeckDatabase
+from application_constants import DECK_FORMAT_VERSION
+
+
+class DeckLoader(QThread):
+    """Reads a deck and builds the indexes of its cards on a worker thread, so the window of the deck is shown while they are loaded.
+
+    The deck is read with get_deck_state once the thread is finished. It is used only by the GUI thread from then on.
+    """
+
+    # percentage of the loading done and description of the current step
+    progress_changed = pyqtSignal(int, str)
+
+    def __init__(
+        self,
+        path_of_flashcards: str,
+        num_pdf_pages: int,
+        path_of_db: Optional[str] = None,
+        parent: Optional[QObject] = None,
+    ) -> None:
+        super().__init__(parent)
+        self.__path_of_flashcards: str = path_of_flashcards
+        self.__num_pdf_pages: int = num_pdf_pages
+        self.__path_of_db: Optional[str] = path_of_db
+
+        self.__deck_state: DeckState
+        # None if the deck is stored in the .txt file
+        self.__deck_database: Optional[DeckDatabase] = None
+        self.__is_loaded: bool = False
+        self.__error: Optional[str] = None
+
+    def run(self) -> None:
+        try:
+            self.__load()
+        except Exception as e:
+            logging.exception("Error while loading %s", self.__path_of_flashcards)
+            self.__error = str(e)
+
+    def __load(self) -> None:
+        self.progress_changed.emit(0, "Reading the flashcards")
+        io_flashcards_info: PDFTestsInfo
+        flashcards_from_pdf_page: MutableMapping[int, list[Flashcard]]
+        # the ids of the flashcards of a deck in an older format are saved only by a full save
+        is_older_format: bool = False
+        deck_database: DeckDatabase = DeckDatabase(
+            self.__path_of_flashcards, self.__path_of_db
+        )
+        if deck_database.is_deck_stored():
+            io_flashcards_info, flashcards_from_pdf_page = deck_database.load_deck()
+            # the same instance saves the deck, it knows the rows of the loaded flashcards
+            self.__deck_database = deck_database
+        else:
+            deck_database.close()
+            io_flashcards_info, flashcards_from_pdf_page = IOFlashcards.load_deck(
+                self.__path_of_flashcards
+            )
+            is_older_format = (
+                IOFlashcards.get_deck_version(self.__path_of_flashcards)
+                < DECK_FORMAT_VERSION
+            )
+        if self.isInterruptionRequested():
+            return
+
+        self.progress_changed.emit(50, "Checking the page references")
+        # the next save rewrites the whole deck
+        is_full_save_needed: bool = (
+            DeckLoader.__update_invalid_page_references(
+                flashcards_from_pdf_page, self.__num_pdf_pages
+            )
+            or is_older_format
+        )
+
+        self.progress_changed.emit(70, "Indexing the flashcards")
+        flashcard_positions: FlashcardPositions = FlashcardPositions(
+            flashcards_from_pdf_page
+        )
+        test_progress: TestProgress = TestProgress(flashcards_from_pdf_page)
+        search_index: Optional[FlashcardSearchIndex] = None
+        if isinstance(flashcards_from_pdf_page, dict):
+            # the pages of a lazily loaded deck are read only at the first search
+            search_index = FlashcardSearchIndex(flashcards_from_pdf_page)
+        if self.isInterruptionRequested():
+            return
+
+        self.progress_changed.emit(90, "Merging the cards")
+        self.__deck_state = DeckState(
+            io_flashcards_info,
+            flashcards_from_pdf_page,
+            is_full_save_needed,
+            flashcard_positions,
+            test_progress,
+            merge_cards_ordered(flashcards_from_pdf_page, self.__num_pdf_pages),
+            search_index,
+        )
+        self.__is_loaded = True
+        self.progress_changed.emit(100, "Deck loaded")
+
+    @staticmethod
+    def __update_invalid_page_references(
+        flashcards: MutableMapping[int, list[Flashcard]], num_pdf_pages: int
+    ) -> bool:
+        # if a pdf file is updated and afterwards it has less pages, old flashcards could have a reference_page to a not existing page.
+        # At the first update/addition/removal of a flashcard these changes will be saved to disk
+        is_updated: bool = False
+        num_page: int
+        list_flashcards: list[Flashcard]
+        # only the keys are iterated, so the pages of a lazily loaded deck are not read
+        for num_page in [x for x in list(flashcards.keys()) if x >= num_pdf_pages]:
+            list_flashcards = flashcards[num_page]
+            is_updated = True
+            for flashcard in list_flashcards:
+                flashcard.set_reference_page(num_pdf_pages - 1)
+            if num_pdf_pages - 1 in flashcards.keys():
+                flashcards[num_pdf_pages - 1].extend(list_flashcards)
+            else:
+                flashcards[num_pdf_pages - 1] = list_flashcards
+
+            flashcards.pop(num_page)
+
+        return is_updated
+
+    def get_is_loaded(self) -> bool:
+        """False if the loading failed or was interrupted"""
+        return self.__is_loaded
+
+    def get_error(self) -> Optional[str]:
+        return self.__error
+
+    def get_deck_state(self) -> DeckState:
+        return self.__deck_state
+
+    def get_deck_database(self) -> Optional[DeckDatabase]:
+        return self.__deck_database
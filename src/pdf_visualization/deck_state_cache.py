@@ -0,0 +1,207 @@
+# Copyright 2022, 2023 Andrea Cucchietti
+# This file is part of flashcards-from-pdf.
+
+# flashcards-from-pdf is free software: you can redistribute it and/or modify it under the terms of the GNU General Public License as published by the Free Software Foundation, either version 3 of the License, or (at your option) any later version.
+
+# flashcards-from-pdf is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License along with flashcards-from-pdf. If not, see <https://www.gnu.org/licenses/>.
+from PyQt6 import QtPdf
+
+from collections import OrderedDict
+from collections.abc import MutableMapping, Sequence
+from typing import Optional
+import os
+import sys
+
+from pdf_visualization.flashcard_positions import FlashcardPositions
+from pdf_visualization.search.flashcard_search_index import FlashcardSearchIndex
+from test_management.test_progress import TestProgress
+from test_management.pdf_test_info import PDFTestsInfo
+from flashcard.flashcard import Flashcard
+from flashcard.card import Card
+from IO_deck_journal import DeckJournal
+from IO_pdf_registry import PdfDocumentRegistry
+from application_constants import DECK_STATE_CACHE_MAX_DECKS
+from application_constants import DECK_STATE_CACHE_MAX_BYTES
+
+
+class DeckState:
+    """A deck read from its file, with the indexes of its cards in the ordered visualization"""
+
+    def __init__(
+        self,
+        io_flashcards_info: PDFTestsInfo,
+        flashcards_from_pdf_page: MutableMapping[int, list[Flashcard]],
+        is_full_save_needed: bool,
+        flashcard_positions: FlashcardPositions,
+        test_progress: TestProgress,
+        merged_cards: tuple[Sequence[Card], Sequence[int], Sequence[int]],
+        search_index: Optional[FlashcardSearchIndex],
+    ) -> None:
+        self.__io_flashcards_info: PDFTestsInfo = io_flashcards_info
+        self.__flashcards_from_pdf_page: MutableMapping[
+            int, list[Flashcard]
+        ] = flashcards_from_pdf_page
+        self.__is_full_save_needed: bool = is_full_save_needed
+        self.__flashcard_positions: FlashcardPositions = flashcard_positions
+        self.__test_progress: TestProgress = test_progress
+        self.__merged_cards: tuple[
+            Sequence[Card], Sequence[int], Sequence[int]
+        ] = merged_cards
+        # None if it is not built yet
+        self.__search_index: Optional[FlashcardSearchIndex] = search_index
+
+    def get_io_flashcards_info(self) -> PDFTestsInfo:
+        return self.__io_flashcards_info
+
+    def get_flashcards_from_pdf_page(self) -> MutableMapping[int, list[Flashcard]]:
+        return self.__flashcards_from_pdf_page
+
+    def get_is_full_save_needed(self) -> bool:
+        return self.__is_full_save_needed
+
+    def get_flashcard_positions(self) -> FlashcardPositions:
+        return self.__flashcard_positions
+
+    def get_test_progress(self) -> TestProgress:
+        return self.__test_progress
+
+    def get_merged_cards(self) -> tuple[Sequence[Card], Sequence[int], Sequence[int]]:
+        return self.__merged_cards
+
+    def get_search_index(self) -> Optional[FlashcardSearchIndex]:
+        return self.__search_index
+
+
+class DeckStateCache:
+    """The decks of the recently closed windows, so opening them again does not read them from the file.
+
+    At most DECK_STATE_CACHE_MAX_DECKS decks are kept, with an estimated size up to DECK_STATE_CACHE_MAX_BYTES, and the least recently closed ones are evicted first. An entry is valid while the .txt file, the journal and the pdf have the same size and modification time they had when the deck was closed. The pdf of every entry is kept loaded in the PdfDocumentRegistry.
+    Only the decks stored in .txt files and read completely are kept: the decks in the database are read from it without parsing, and the lazily loaded decks read their pages from the file.
+    A deck is taken out of the cache when it is opened, so only one window uses its state.
+    """
+
+    # estimated memory of a flashcard besides its question and answer, in bytes
+    __FLASHCARD_OVERHEAD: int = 1024
+
+    # path of the .txt file, the state of the deck, the path of the pdf, its document, the stamps of the files and the estimated size
+    __entries: OrderedDict[
+        str,
+        tuple[
+            DeckState,
+            str,
+            QtPdf.QPdfDocument,
+            tuple[Optional[tuple[int, int]], ...],
+            int,
+        ],
+    ] = OrderedDict()
+    __num_bytes: int = 0
+
+    @staticmethod
+    def put(path_of_txt: str, path_of_pdf: str, deck_state: DeckState) -> None:
+        """Keep the state of a deck whose window is closed. The changes of the deck have to be already written"""
+        if not isinstance(deck_state.get_flashcards_from_pdf_page(), dict):
+            return
+        path_of_txt = os.path.abspath(path_of_txt)
+        DeckStateCache.invalidate(path_of_txt)
+        num_bytes: int = DeckStateCache.__get_size_estimate(deck_state)
+        if num_bytes > DECK_STATE_CACHE_MAX_BYTES:
+            return
+
+        DeckStateCache.__entries[path_of_txt] = (
+            deck_state,
+            path_of_pdf,
+            # released when the entry is removed
+            PdfDocumentRegistry.acquire(path_of_pdf),
+            DeckStateCache.__get_stamps(path_of_txt, path_of_pdf),
+            num_bytes,
+        )
+        DeckStateCache.__num_bytes += num_bytes
+        while (
+            len(DeckStateCache.__entries) > DECK_STATE_CACHE_MAX_DECKS
+            or DeckStateCache.__num_bytes > DECK_STATE_CACHE_MAX_BYTES
+        ):
+            DeckStateCache.__remove(next(iter(DeckStateCache.__entries)))
+
+    @staticmethod
+    def take(path_of_txt: str) -> Optional[DeckState]:
+        """The state of the deck, if it is in the cache and its files did not change. The deck is removed from the cache"""
+        path_of_txt = os.path.abspath(path_of_txt)
+        if path_of_txt not in DeckStateCache.__entries:
+            return None
+        deck_state: DeckState
+        path_of_pdf: str
+        stamps: tuple[Optional[tuple[int, int]], ...]
+        deck_state, path_of_pdf, _, stamps, _ = DeckStateCache.__entries[
+            path_of_txt
+        ]
+        is_valid: bool = stamps == DeckStateCache.__get_stamps(path_of_txt, path_of_pdf)
+        DeckStateCache.__remove(path_of_txt)
+        if not is_valid:
+            return None
+        return deck_state
+
+    @staticmethod
+    def invalidate(path_of_txt: str) -> None:
+        """Remove the deck, called when it is changed outside of its window"""
+        path_of_txt = os.path.abspath(path_of_txt)
+        if path_of_txt in DeckStateCache.__entries:
+            DeckStateCache.__remove(path_of_txt)
+
+    @staticmethod
+    def clear() -> None:
+        while len(DeckStateCache.__entries) > 0:
+            DeckStateCache.__remove(next(iter(DeckStateCache.__entries)))
+
+    @staticmethod
+    def get_num_decks() -> int:
+        return len(DeckStateCache.__entries)
+
+    @staticmethod
+    def get_num_bytes() -> int:
+        return DeckStateCache.__num_bytes
+
+    @staticmethod
+    def __remove(path_of_txt: str) -> None:
+        pdf_doc: QtPdf.QPdfDocument
+        num_bytes: int
+        _, _, pdf_doc, _, num_bytes = DeckStateCache.__entries.pop(path_of_txt)
+        DeckStateCache.__num_bytes -= num_bytes
+        PdfDocumentRegistry.release(pdf_doc)
+
+    @staticmethod
+    def __get_stamps(
+        path_of_txt: str, path_of_pdf: str
+    ) -> tuple[Optional[tuple[int, int]], ...]:
+        return tuple(
+            DeckStateCache.__get_stamp(path)
+            for path in (
+                path_of_txt,
+                DeckJournal.get_journal_path(path_of_txt),
+                path_of_pdf,
+            )
+        )
+
+    @staticmethod
+    def __get_stamp(path: str) -> Optional[tuple[int, int]]:
+        # None if the file does not exist
+        try:
+            stat_result: os.stat_result = os.stat(path)
+        except FileNotFoundError:
+            return None
+        return (stat_result.st_size, stat_result.st_mtime_ns)
+
+    @staticmethod
+    def __get_size_estimate(deck_state: DeckState) -> int:
+        num_bytes: int = 0
+        list_flashcards: list[Flashcard]
+        for list_flashcards in deck_state.get_flashcards_from_pdf_page().values():
+            flashcard: Flashcard
+            for flashcard in list_flashcards:
+                num_bytes += (
+                    DeckStateCache.__FLASHCARD_OVERHEAD
+                    + sys.getsizeof(flashcard.get_question())
+                    + sys.getsizeof(flashcard.get_answer())
+                )
+        return num_bytes
@@ -0,0 +1,56 @@
+# Copyright 2022, 2023 Andrea Cucchietti
+# This file is part of flashcards-from-pdf.
+
+# flashcards-from-pdf is free software: you can redistribute it and/or modify it under the terms of the GNU General Public License as published by the Free Software Foundation, either version 3 of the License, or (at your option) any later version.
+
+# flashcards-from-pdf is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License along with flashcards-from-pdf. If not, see <https://www.gnu.org/licenses/>.
+from collections.abc import MutableMapping, Iterable
+
+from flashcard.flashcard import Flashcard
+
+
+class FlashcardPositions:
+    """Position of the flashcards in the list of their reference page, by flashcard id.
+
+    The table of a page is built the first time one of its flashcards is looked up and it is discarded when the page changes, so a lookup takes O(1) and a change costs as the list of the page.
+    """
+
+    def __init__(
+        self, flashcards_per_page: MutableMapping[int, list[Flashcard]]
+    ) -> None:
+        self.__flashcards_per_page: MutableMapping[
+            int, list[Flashcard]
+        ] = flashcards_per_page
+        self.__positions_of_pages: dict[int, dict[int, int]] = dict()
+
+    def get_page_and_position(self, flashcard: Flashcard) -> tuple[int, int]:
+        page: int = flashcard.get_reference_page()
+        positions: dict[int, int] = self.__get_positions_of_page(page)
+        if flashcard.get_id() not in positions:
+            raise ValueError("The flashcard is not in the list of its page")
+        return (page, positions[flashcard.get_id()])
+
+    def __get_positions_of_page(self, page: int) -> dict[int, int]:
+        if page not in self.__positions_of_pages:
+            self.__positions_of_pages[page] = {
+                flashcard.get_id(): position
+                for position, flashcard in enumerate(
+                    self.__flashcards_per_page.get(page, [])
+                )
+            }
+        return self.__positions_of_pages[page]
+
+    def remove(self, flashcard: Flashcard) -> None:
+        page: int
+        position: int
+        page, position = self.get_page_and_position(flashcard)
+        del self.__flashcards_per_page[page][position]
+        self.update_pages([page])
+
+    def update_pages(self, pages: Iterable[int]) -> None:
+        """Discard the tables of the pages whose list of flashcards changed"""
+        page: int
+        for page in pages:
+            self.__positions_of_pages.pop(page, None)
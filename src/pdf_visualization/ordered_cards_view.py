@@ -0,0 +1,281 @@
+# Copyright 2022, 2023 Andrea Cucchietti
+# This file is part of flashcards-from-pdf.
+
+# flashcards-from-pdf is free software: you can redistribute it and/or modify it under the terms of the GNU General Public License as published by the Free Software Foundation, either version 3 of the License, or (at your option) any later version.
+
+# flashcards-from-pdf is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License along with flashcards-from-pdf. If not, see <https://www.gnu.org/licenses/>.
+from collections.abc import Mapping, Sequence, Iterable
+from typing import Callable
+from bisect import insort
+
+from typing import TYPE_CHECKING
+
+# always false at running time. It is used for mypy typing check and avoiding circular imports
+if TYPE_CHECKING:
+    from pdf_visualization.shuffle_review_queue import ShuffleReviewQueue
+
+from flashcard.flashcard import Flashcard
+from flashcard.pdf_page import PdfPage
+from flashcard.card import Card
+from IO_deck_index import LazyDeckPages
+
+
+class FenwickTree:
+    """Prefix sums of a list of non-negative integers. Changing a value and computing a prefix sum take O(log n)"""
+
+    def __init__(self, values: list[int]) -> None:
+        # 1-based, the position i stores the sum of the values in (i - lowbit(i), i]
+        self.__tree: list[int] = [0] + values
+        i: int
+        for i in range(1, len(self.__tree)):
+            parent: int = i + (i & -i)
+            if parent < len(self.__tree):
+                self.__tree[parent] += self.__tree[i]
+
+    def get_size(self) -> int:
+        return len(self.__tree) - 1
+
+    def add(self, position: int, delta: int) -> None:
+        i: int = position + 1
+        while i < len(self.__tree):
+            self.__tree[i] += delta
+            i += i & -i
+
+    def append(self, value: int) -> None:
+        i: int = len(self.__tree)
+        # the new position stores the sum of the values in (i - lowbit(i), i]
+        self.__tree.append(
+            value + self.get_prefix_sum(i - 1) - self.get_prefix_sum(i - (i & -i))
+        )
+
+    def get_prefix_sum(self, num_values: int) -> int:
+        """Sum of the first num_values values"""
+        total: int = 0
+        i: int = num_values
+        while i > 0:
+            total += self.__tree[i]
+            i -= i & -i
+        return total
+
+    def search(self, is_within: Callable[[int, int], bool]) -> int:
+        """Returns the biggest n for which is_within(n, sum of the first n values) is true.
+
+        is_within has to be true for n = 0 and, once it is false, it has to stay false for the bigger values of n.
+        """
+        position: int = 0
+        total: int = 0
+        # the highest power of 2 not greater than the size
+        step: int = 0
+        if self.get_size() > 0:
+            step = 1 << (self.get_size().bit_length() - 1)
+        while step > 0:
+            next_position: int = position + step
+            if next_position <= self.get_size() and is_within(
+                next_position, total + self.__tree[next_position]
+            ):
+                position = next_position
+                total += self.__tree[next_position]
+            step >>= 1
+        return position
+
+
+class OrderedCardsView(Sequence):
+    """Cards of the ordered visualization, computed when they are accessed.
+
+    The flashcards of a page come before the page itself, sorted by page and, inside a page, in the order given by the user. The generic flashcards are at the beginning and the flashcards referencing a page after the last one are at the end.
+    The number of flashcards of every page is kept in a FenwickTree, so the position of a card is found in O(log n) and, when the flashcards of some pages change, update_pages updates the view without building it again. A PdfPage is created the first time it is accessed.
+    """
+
+    def __init__(
+        self, flashcards_per_page: Mapping[int, list[Flashcard]], num_pdf_pages: int
+    ) -> None:
+        self.__flashcards_per_page: Mapping[int, list[Flashcard]] = flashcards_per_page
+        self.__num_pdf_pages: int = num_pdf_pages
+        self.__pdf_pages: dict[int, PdfPage] = dict()
+
+        # number of flashcards of the pages with at least one flashcard
+        self.__num_flashcards: dict[int, int] = dict()
+        # pages with flashcards that are before the first pdf page or after the last one, sorted
+        self.__outside_pages: list[int] = []
+        # a slot for the pages before the first pdf page, one for every pdf page and one for the pages after the last pdf page
+        num_flashcards_of_slots: list[int] = [0] * (num_pdf_pages + 2)
+        page: int
+        for page in flashcards_per_page.keys():
+            num_flashcards: int = OrderedCardsView.__get_num_flashcards_of_page(
+                flashcards_per_page, page
+            )
+            if num_flashcards == 0:
+                continue
+            self.__num_flashcards[page] = num_flashcards
+            num_flashcards_of_slots[self.__get_slot(page)] += num_flashcards
+            if self.__is_outside_page(page):
+                insort(self.__outside_pages, page)
+        self.__tree: FenwickTree = FenwickTree(num_flashcards_of_slots)
+
+    @staticmethod
+    def __get_num_flashcards_of_page(
+        flashcards_per_page: Mapping[int, list[Flashcard]], page: int
+    ) -> int:
+        if page not in flashcards_per_page:
+            return 0
+        if isinstance(flashcards_per_page, LazyDeckPages):
+            # the page is not read from the file
+            return flashcards_per_page.get_num_flashcards(page)
+        return len(flashcards_per_page[page])
+
+    def __is_outside_page(self, page: int) -> bool:
+        return page < 0 or page >= self.__num_pdf_pages
+
+    def __get_slot(self, page: int) -> int:
+        return min(max(page + 1, 0), self.__num_pdf_pages + 1)
+
+    def __get_num_pages_before_slot(self, slot: int) -> int:
+        # each slot of a pdf page ends with the page itself
+        return min(max(slot - 1, 0), self.__num_pdf_pages)
+
+    def __get_num_flashcards_of_slot(self, slot: int) -> int:
+        if 1 <= slot <= self.__num_pdf_pages:
+            return self.__num_flashcards.get(slot - 1, 0)
+        return sum(
+            self.__num_flashcards[page]
+            for page in self.__outside_pages
+            if self.__get_slot(page) == slot
+        )
+
+    def __get_flashcard_of_slot(self, slot: int, offset: int) -> Flashcard:
+        if 1 <= slot <= self.__num_pdf_pages:
+            return self.__flashcards_per_page[slot - 1][offset]
+        page: int
+        for page in self.__outside_pages:
+            if self.__get_slot(page) != slot:
+                continue
+            if offset < self.__num_flashcards[page]:
+                return self.__flashcards_per_page[page][offset]
+            offset -= self.__num_flashcards[page]
+        raise IndexError("flashcard not found")
+
+    def update_pages(self, pages: Iterable[int]) -> None:
+        """Update the view after flashcards were added to or removed from pages, or moved between them"""
+        page: int
+        for page in set(pages):
+            num_flashcards: int = OrderedCardsView.__get_num_flashcards_of_page(
+                self.__flashcards_per_page, page
+            )
+            delta: int = num_flashcards - self.__num_flashcards.get(page, 0)
+            if delta == 0:
+                continue
+            self.__tree.add(self.__get_slot(page), delta)
+
+            if num_flashcards == 0:
+                self.__num_flashcards.pop(page)
+                if self.__is_outside_page(page):
+                    self.__outside_pages.remove(page)
+            else:
+                if page not in self.__num_flashcards and self.__is_outside_page(page):
+                    insort(self.__outside_pages, page)
+                self.__num_flashcards[page] = num_flashcards
+
+    def __len__(self) -> int:
+        return self.get_num_flashcards() + self.__num_pdf_pages
+
+    def __getitem__(self, card_index: int) -> Card:
+        if card_index < 0:
+            card_index += len(self)
+        if card_index < 0 or card_index >= len(self):
+            raise IndexError("card index out of range")
+
+        # the slot of the card is the first one that ends after card_index
+        slot: int = self.__tree.search(
+            lambda num_slots, num_flashcards: num_flashcards
+            + self.__get_num_pages_before_slot(num_slots)
+            <= card_index
+        )
+        num_pages_before: int = self.__get_num_pages_before_slot(slot)
+        num_flashcards_before: int = self.__tree.get_prefix_sum(slot)
+        offset: int = card_index - num_flashcards_before - num_pages_before
+        num_flashcards_of_slot: int = self.__get_num_flashcards_of_slot(slot)
+        if offset < num_flashcards_of_slot:
+            flashcard: Flashcard = self.__get_flashcard_of_slot(slot, offset)
+            flashcard.set_pdf_page_index_before(num_pages_before - 1)
+            flashcard.set_flashcard_index_before(num_flashcards_before + offset - 1)
+            return flashcard
+
+        num_page: int = slot - 1
+        if num_page not in self.__pdf_pages:
+            self.__pdf_pages[num_page] = PdfPage(num_page)
+        pdf_page: PdfPage = self.__pdf_pages[num_page]
+        # the flashcards before the page can change, so the indexes are set at every access
+        pdf_page.set_pdf_page_index_before(num_page - 1)
+        pdf_page.set_flashcard_index_before(
+            num_flashcards_before + num_flashcards_of_slot - 1
+        )
+        return pdf_page
+
+    def get_card_index_of_pdf_page(self, num_page: int) -> int:
+        # the flashcards of the page and of the pages before are before it
+        return num_page + self.__tree.get_prefix_sum(self.__get_slot(num_page) + 1)
+
+    def get_card_index_of_flashcard(self, flashcard_index: int) -> int:
+        slot: int = self.__tree.search(
+            lambda _, num_flashcards: num_flashcards <= flashcard_index
+        )
+        return flashcard_index + self.__get_num_pages_before_slot(slot)
+
+    def get_card_index_of_page_flashcard(self, page: int, position: int) -> int:
+        """Card index of the flashcard at position in the list of page"""
+        slot: int = self.__get_slot(page)
+        card_index: int = (
+            self.__tree.get_prefix_sum(slot)
+            + self.__get_num_pages_before_slot(slot)
+            + position
+        )
+        if self.__is_outside_page(page):
+            # the pages before it in the same slot
+            card_index += sum(
+                self.__num_flashcards[other_page]
+                for other_page in self.__outside_pages
+                if other_page < page and self.__get_slot(other_page) == slot
+            )
+        return card_index
+
+    def get_num_flashcards(self) -> int:
+        return self.__tree.get_prefix_sum(self.__tree.get_size())
+
+    def get_num_pdf_pages(self) -> int:
+        return self.__num_pdf_pages
+
+
+class PdfPageToCardIndex(Sequence):
+    """For each pdf page number, the corresponding position in an OrderedCardsView or a ShuffleReviewQueue"""
+
+    def __init__(self, cards_view: "OrderedCardsView | ShuffleReviewQueue") -> None:
+        self.__cards_view: "OrderedCardsView | ShuffleReviewQueue" = cards_view
+
+    def __len__(self) -> int:
+        return self.__cards_view.get_num_pdf_pages()
+
+    def __getitem__(self, num_page: int) -> int:
+        if num_page < 0:
+            num_page += len(self)
+        if num_page < 0 or num_page >= len(self):
+            raise IndexError("pdf page out of range")
+        return self.__cards_view.get_card_index_of_pdf_page(num_page)
+
+
+class FlashcardToCardIndex(Sequence):
+    """For each flashcard number, the corresponding position in an OrderedCardsView or a ShuffleReviewQueue"""
+
+    def __init__(self, cards_view: "OrderedCardsView | ShuffleReviewQueue") -> None:
+        self.__cards_view: "OrderedCardsView | ShuffleReviewQueue" = cards_view
+
+    def __len__(self) -> int:
+        return self.__cards_view.get_num_flashcards()
+
+    def __getitem__(self, flashcard_index: int) -> int:
+        if flashcard_index < 0:
+            flashcard_index += len(self)
+        if flashcard_index < 0 or flashcard_index >= len(self):
+            raise IndexError("flashcard index out of range")
+        return self.__cards_view.get_card_index_of_flashcard(flashcard_index)
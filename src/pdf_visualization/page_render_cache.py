@@ -0,0 +1,179 @@
+# Copyright 2022, 2023 Andrea Cucchietti
+# This file is part of flashcards-from-pdf.
+
+# flashcards-from-pdf is free software: you can redistribute it and/or modify it under the terms of the GNU General Public License as published by the Free Software Foundation, either version 3 of the License, or (at your option) any later version.
+
+# flashcards-from-pdf is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License along with flashcards-from-pdf. If not, see <https://www.gnu.org/licenses/>.
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, QSize, pyqtSignal
+from PyQt6.QtGui import QImage
+from PyQt6 import QtPdf
+
+from collections import OrderedDict
+from typing import Optional
+import time
+import logging
+import threading
+
+from IO_pdf_registry import PdfDocumentRegistry
+from application_constants import PAGE_RENDER_CACHE_MAX_BYTES
+from application_constants import PAGE_RENDER_PREFETCH_PAGES
+
+
+class PageRenderCache(QObject):
+    """Images of the pdf pages rendered in the background, kept in an LRU cache with a memory budget.
+
+    The pages around the visualized one are rendered ahead at the size they would be displayed, so moving to them does not wait for the rendering. The document has to be acquired for the workers from the PdfDocumentRegistry, and the pages are rendered one at a time, holding its lock, because QtPdf does not render the pages of a document in parallel.
+    """
+
+    # page, size of the image, image and rendering time in seconds. Emitted on the thread of the cache
+    page_rendered = pyqtSignal(int, QSize, QImage, float)
+
+    def __init__(
+        self, pdf_doc: QtPdf.QPdfDocument, parent: Optional[QObject] = None
+    ) -> None:
+        super().__init__(parent)
+        self.__pdf_doc: QtPdf.QPdfDocument = pdf_doc
+        self.__lock: threading.Lock = PdfDocumentRegistry.get_lock(pdf_doc)
+        self.__thread_pool: QThreadPool = QThreadPool(self)
+        self.__thread_pool.setMaxThreadCount(1)
+
+        self.__images: OrderedDict[tuple[int, int, int], QImage] = OrderedDict()
+        self.__num_bytes: int = 0
+        # pages whose rendering is queued or running
+        self.__pending_renders: set[tuple[int, int, int]] = set()
+
+        self.__num_hits: int = 0
+        self.__num_misses: int = 0
+        self.__num_renders: int = 0
+        self.__total_render_time: float = 0
+        self.__max_render_time: float = 0
+
+        self.page_rendered.connect(self.__add_image)
+
+    @staticmethod
+    def __get_key(page: int, size: QSize) -> tuple[int, int, int]:
+        return (page, size.width(), size.height())
+
+    def get_image(self, page: int, size: QSize) -> Optional[QImage]:
+        """The rendered image of the page at size, if it is in the cache"""
+        key: tuple[int, int, int] = PageRenderCache.__get_key(page, size)
+        if key not in self.__images:
+            self.__num_misses += 1
+            return None
+        self.__num_hits += 1
+        self.__images.move_to_end(key)
+        return self.__images[key]
+
+    def prefetch(self, page: int, size: QSize) -> None:
+        """Render the page and the PAGE_RENDER_PREFETCH_PAGES pages before and after it, the nearest ones first"""
+        self.__render(page, size, PAGE_RENDER_PREFETCH_PAGES + 1)
+        distance: int
+        for distance in range(1, PAGE_RENDER_PREFETCH_PAGES + 1):
+            priority: int = PAGE_RENDER_PREFETCH_PAGES + 1 - distance
+            self.__render(page + distance, size, priority)
+            self.__render(page - distance, size, priority)
+
+    def __render(self, page: int, size: QSize, priority: int) -> None:
+        if page < 0 or page >= self.__pdf_doc.pageCount():
+            return
+        key: tuple[int, int, int] = PageRenderCache.__get_key(page, size)
+        if key in self.__images:
+            # recently used, so it is not evicted by the pages rendered ahead
+            self.__images.move_to_end(key)
+            return
+        if key in self.__pending_renders:
+            return
+        self.__pending_renders.add(key)
+        self.__thread_pool.start(
+            PageRenderCache.RenderJob(
+                self, self.__pdf_doc, self.__lock, page, QSize(size)
+            ),
+            priority,
+        )
+
+    def __add_image(
+        self, page: int, size: QSize, image: QImage, render_time: float
+    ) -> None:
+        key: tuple[int, int, int] = PageRenderCache.__get_key(page, size)
+        self.__pending_renders.discard(key)
+        self.__num_renders += 1
+        self.__total_render_time += render_time
+        self.__max_render_time = max(self.__max_render_time, render_time)
+        if image.isNull() or image.sizeInBytes() > PAGE_RENDER_CACHE_MAX_BYTES:
+            return
+
+        if key in self.__images:
+            self.__num_bytes -= self.__images.pop(key).sizeInBytes()
+        self.__images[key] = image
+        self.__num_bytes += image.sizeInBytes()
+        while self.__num_bytes > PAGE_RENDER_CACHE_MAX_BYTES:
+            _, evicted_image = self.__images.popitem(last=False)
+            self.__num_bytes -= evicted_image.sizeInBytes()
+
+    def close(self) -> None:
+        """Discard the renderings not started and wait for the running one"""
+        self.__thread_pool.clear()
+        self.__thread_pool.waitForDone()
+        logging.info(
+            "Page render cache: hit rate %.2f, %d renders, mean %.1f ms, max %.1f ms",
+            self.get_hit_rate(),
+            self.get_num_renders(),
+            self.get_mean_render_time() * 1000,
+            self.get_max_render_time() * 1000,
+        )
+
+    def get_num_hits(self) -> int:
+        return self.__num_hits
+
+    def get_num_misses(self) -> int:
+        return self.__num_misses
+
+    def get_hit_rate(self) -> float:
+        num_requests: int = self.__num_hits + self.__num_misses
+        if num_requests == 0:
+            return 0.0
+        return self.__num_hits / num_requests
+
+    def get_num_renders(self) -> int:
+        return self.__num_renders
+
+    def get_mean_render_time(self) -> float:
+        """In seconds"""
+        if self.__num_renders == 0:
+            return 0.0
+        return self.__total_render_time / self.__num_renders
+
+    def get_max_render_time(self) -> float:
+        """In seconds"""
+        return self.__max_render_time
+
+    def get_num_bytes(self) -> int:
+        return self.__num_bytes
+
+    class RenderJob(QRunnable):
+        def __init__(
+            self,
+            cache: "PageRenderCache",
+            pdf_doc: QtPdf.QPdfDocument,
+            lock: threading.Lock,
+            page: int,
+            size: QSize,
+        ) -> None:
+            super().__init__()
+            self.__cache: PageRenderCache = cache
+            self.__pdf_doc: QtPdf.QPdfDocument = pdf_doc
+            self.__lock: threading.Lock = lock
+            self.__page: int = page
+            self.__size: QSize = size
+
+        def run(self) -> None:
+            start: float = time.perf_counter()
+            image: QImage
+            with self.__lock:
+                image = self.__pdf_doc.render(self.__page, self.__size)
+            # the signal is queued to the thread of the cache
+            self.__cache.page_rendered.emit(
+                self.__page, self.__size, image, time.perf_counter() - start
+            )
@@ -0,0 +1,68 @@
+# Copyright 2022, 2023 Andrea Cucchietti
+# This file is part of flashcards-from-pdf.
+
+# flashcards-from-pdf is free software: you can redistribute it and/or modify it under the terms of the GNU General Public License as published by the Free Software Foundation, either version 3 of the License, or (at your option) any later version.
+
+# flashcards-from-pdf is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License along with flashcards-from-pdf. If not, see <https://www.gnu.org/licenses/>.
+from PyQt6.QtCore import QObject, QThread
+from PyQt6 import QtPdf
+
+from typing import Optional
+import threading
+import logging
+
+from IO_pdf_registry import PdfDocumentRegistry
+from IO_pdf_text_index import PdfTextIndex
+
+
+class PdfTextExtractor(QThread):
+    """Extracts the text of the pages of a pdf on a worker thread and saves it in the PdfTextIndex, if it is not already there.
+
+    The text is read from the document acquired for the workers from the PdfDocumentRegistry, one page at a time while holding its lock, so the page render cache can render in between.
+    """
+
+    def __init__(
+        self,
+        path_of_pdf: str,
+        pdf_doc: QtPdf.QPdfDocument,
+        content_hash: str,
+        path_of_db: Optional[str] = None,
+        parent: Optional[QObject] = None,
+    ) -> None:
+        super().__init__(parent)
+        self.__path_of_pdf: str = path_of_pdf
+        self.__pdf_doc: QtPdf.QPdfDocument = pdf_doc
+        self.__lock: threading.Lock = PdfDocumentRegistry.get_lock(pdf_doc)
+        self.__content_hash: str = content_hash
+        self.__path_of_db: Optional[str] = path_of_db
+        self.__is_indexed: bool = False
+
+    def run(self) -> None:
+        try:
+            self.__extract()
+        except Exception:
+            logging.exception("Error while extracting the text of %s", self.__path_of_pdf)
+
+    def __extract(self) -> None:
+        if PdfTextIndex.is_indexed(self.__content_hash, self.__path_of_db):
+            self.__is_indexed = True
+            return
+        texts_of_pages: list[str] = []
+        page: int
+        for page in range(self.__pdf_doc.pageCount()):
+            if self.isInterruptionRequested():
+                # extracted again the next time the pdf is opened
+                return
+            with self.__lock:
+                texts_of_pages.append(self.__pdf_doc.getAllText(page).text())
+        PdfTextIndex.save_texts(self.__content_hash, texts_of_pages, self.__path_of_db)
+        self.__is_indexed = True
+
+    def get_is_indexed(self) -> bool:
+        """If the text of the pdf can be searched in the PdfTextIndex"""
+        return self.__is_indexed
+
+    def get_content_hash(self) -> str:
+        return self.__content_hash
@@ -6,8 +6,6 @@
 # flashcards-from-pdf is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for more details.
 
 # You should have received a copy of the GNU General Public License along with flashcards-from-pdf. If not, see <https://www.gnu.org/licenses/>.
-from PyQt6.QtWidgets import QApplication
-from PyQt6.QtCore import Qt
 from PyQt6.QtGui import QShortcut, QKeySequence
 
 from functools import partial
@@ -43,20 +41,26 @@ class PDFWindowVisualizationControl:
         self.__shortcut_know: QShortcut
         self.__shortcut_stil_learning: QShortcut
 
-        # change the CursorShape while loading the pdf
-        QApplication.setOverrideCursor(Qt.CursorShape.WaitCursor)
+        # the window is shown while the deck is loaded, the controls are set once it is loaded
         self.__pdf_window_model: PDFWindowVisualizationModel = (
             PDFWindowVisualizationModel(path_of_pdf)
         )
         self.__pdf_window_layout: PDFWindowVisualizationLayout = (
             self.__pdf_window_model.get_pdf_window_visualization()
         )
-        self.__set_controls_window_layout()
-        QApplication.restoreOverrideCursor()
+        self.__pdf_window_layout.set_method_to_call_on_close(
+            self.__pdf_window_model.close_deck
+        )
+        self.__pdf_window_model.set_method_to_call_on_deck_loaded(
+            self.__set_controls_window_layout
+        )
 
     def get_pdf_window_visualization_layout(self) -> PDFWindowVisualizationLayout:
         return self.__pdf_window_layout
 
+    def show_flashcard(self, page: int, flashcard_id: int) -> None:
+        self.__pdf_window_model.show_flashcard(page, flashcard_id)
+
     def __set_controls_window_layout(self) -> None:
         self.__set_controls_shortcut_without_btn()
         self.__set_controls_header_widget()
@@ -138,6 +142,9 @@ class PDFWindowVisualizationControl:
         self.__shortcut_zoom_decrease.activated.connect(
             self.__pdf_window_layout.decrease_zoom
         )
+        self.__pdf_window_layout.get_pdf_view().zoomFactorChanged.connect(
+            self.__pdf_window_model.update_zoom
+        )
         self.__pdf_window_layout.get_flashcard_label().set_method_to_call(
             self.__pdf_window_model.modify_current_flashcard
         )
@@ -15,12 +15,14 @@ from PyQt6.QtWidgets import (
     QSpinBox,
     QPlainTextEdit,
     QCheckBox,
+    QScrollArea,
+    QProgressBar,
 )
 from PyQt6.QtCore import Qt, QPointF
-from PyQt6.QtGui import QFont
+from PyQt6.QtGui import QFont, QCloseEvent
 from PyQt6 import QtPdf, QtPdfWidgets
 
-from typing import Optional
+from typing import Optional, Callable
 
 from application_constants import APPLICATION_NAME
 from pdf_visualization.q_label_custom import QLabelCustom
@@ -50,6 +52,9 @@ class PDFWindowVisualizationLayout(QWidget):
         self.__pdf_doc: QtPdf.QPdfDocument
         self.__pdf_nav: QtPdf.QPdfPageNavigator
         self.__point: QPointF
+        # a pdf page already rendered is shown as an image instead of in the pdf view
+        self.__page_image_label: QLabel
+        self.__page_image_scroll_area: QScrollArea
         # right panel
         self.__question_input: QPlainTextEdit
         self.__answer_input: QPlainTextEdit
@@ -69,9 +74,25 @@ class PDFWindowVisualizationLayout(QWidget):
         self.__still_learning_button: QPushButton
         self.__know_button: QPushButton
 
+        # the widgets that are disabled while the deck is loaded
+        self.__header_widget: QWidget
+        self.__right_panel_widget: QWidget
+        self.__bottom_widget: QWidget
+        self.__loading_progress_bar: QProgressBar
+
+        self.__method_to_call_on_close: Optional[Callable[..., None]] = None
+
         self.__set_window_style()
         self.__set_window_layout()
 
+    def closeEvent(self, event: QCloseEvent | None) -> None:
+        if self.__method_to_call_on_close is not None:
+            self.__method_to_call_on_close()
+        super().closeEvent(event)
+
+    def set_method_to_call_on_close(self, method_to_call: Callable[..., None]) -> None:
+        self.__method_to_call_on_close = method_to_call
+
     def __set_window_style(self) -> None:
         self.setWindowTitle(APPLICATION_NAME)
 
@@ -79,17 +100,20 @@ class PDFWindowVisualizationLayout(QWidget):
         window_layout: QVBoxLayout = QVBoxLayout(self)
         self.setLayout(window_layout)
 
-        header = self.__set_header_widget()
+        self.__header_widget = self.__set_header_widget()
+        self.__loading_progress_bar = QProgressBar(self)
+        self.__loading_progress_bar.setVisible(False)
         main_layout: QHBoxLayout = QHBoxLayout(self)
         left_panel = self.__set_left_panel_widget()
-        right_panel = self.__set_right_panel_widget()
-        bottom = self.__set_bottom_widget()
+        self.__right_panel_widget = self.__set_right_panel_widget()
+        self.__bottom_widget = self.__set_bottom_widget()
 
-        window_layout.addWidget(header)
+        window_layout.addWidget(self.__header_widget)
+        window_layout.addWidget(self.__loading_progress_bar)
         main_layout.addWidget(left_panel, stretch=4)
-        main_layout.addWidget(right_panel, stretch=1)
+        main_layout.addWidget(self.__right_panel_widget, stretch=1)
         window_layout.addLayout(main_layout)
-        window_layout.addWidget(bottom)
+        window_layout.addWidget(self.__bottom_widget)
 
     def __set_header_widget(self) -> QWidget:
         # header
@@ -165,9 +189,6 @@ class PDFWindowVisualizationLayout(QWidget):
         self.__pdf_view.setZoomMode(QtPdfWidgets.QPdfView.ZoomMode.Custom)
         self.__left_panel_layout.addWidget(self.__pdf_view)
 
-        self.__pdf_doc = QtPdf.QPdfDocument(self)
-        self.__pdf_view.setDocument(self.__pdf_doc)
-
         app: Optional[QtPdf.QPdfPageNavigator]
         app = self.__pdf_view.pageNavigator()
         if app is None:
@@ -176,6 +197,13 @@ class PDFWindowVisualizationLayout(QWidget):
         self.__point = QPointF(0, 0)
         self.__pdf_nav.jump(0, self.__point)
 
+        self.__page_image_label = QLabel(main)
+        self.__page_image_scroll_area = QScrollArea(main)
+        self.__page_image_scroll_area.setWidget(self.__page_image_label)
+        self.__page_image_scroll_area.setAlignment(Qt.AlignmentFlag.AlignHCenter)
+        self.__page_image_scroll_area.setVisible(False)
+        self.__left_panel_layout.addWidget(self.__page_image_scroll_area)
+
         self.__left_panel_layout.addWidget(self.__flashcard_label)
         main.setLayout(self.__left_panel_layout)
         return main
@@ -298,6 +326,17 @@ class PDFWindowVisualizationLayout(QWidget):
 
         return layout_current_card
 
+    def set_is_deck_loading(self, is_deck_loading: bool) -> None:
+        """While the deck is loaded only the pdf is shown, the other widgets are disabled"""
+        self.__loading_progress_bar.setVisible(is_deck_loading)
+        self.__header_widget.setDisabled(is_deck_loading)
+        self.__right_panel_widget.setDisabled(is_deck_loading)
+        self.__bottom_widget.setDisabled(is_deck_loading)
+
+    def set_loading_progress(self, percentage: int, description: str) -> None:
+        self.__loading_progress_bar.setValue(percentage)
+        self.__loading_progress_bar.setFormat(description + "... %p%")
+
     def increase_zoom(self) -> None:
         self.__pdf_view.setZoomFactor(self.__pdf_view.zoomFactor() * 1.25)
 
@@ -332,9 +371,19 @@ class PDFWindowVisualizationLayout(QWidget):
     def get_pdf_doc(self) -> QtPdf.QPdfDocument:
         return self.__pdf_doc
 
+    def set_pdf_doc(self, pdf_doc: QtPdf.QPdfDocument) -> None:
+        self.__pdf_doc = pdf_doc
+        self.__pdf_view.setDocument(self.__pdf_doc)
+
     def get_pdf_nav(self) -> QtPdf.QPdfPageNavigator:
         return self.__pdf_nav
 
+    def get_page_image_label(self) -> QLabel:
+        return self.__page_image_label
+
+    def get_page_image_scroll_area(self) -> QScrollArea:
+        return self.__page_image_scroll_area
+
     def get_previous_page_button(self) -> QPushButton:
         return self.__previous_page_button
 
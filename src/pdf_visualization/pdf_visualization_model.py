@@ -6,10 +6,15 @@
 # flashcards-from-pdf is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for more details.
 
 # You should have received a copy of the GNU General Public License along with flashcards-from-pdf. If not, see <https://www.gnu.org/licenses/>.
-from PyQt6.QtWidgets import QPushButton, QPlainTextEdit, QCheckBox
-from PyQt6.QtCore import QPointF
+from PyQt6.QtWidgets import QPushButton, QPlainTextEdit, QCheckBox, QMessageBox
+from PyQt6.QtCore import QPointF, QSize, QSizeF
+from PyQt6.QtGui import QImage, QPixmap
+from PyQt6 import QtPdf, QtPdfWidgets
 
+from collections.abc import Mapping, MutableMapping, Sequence
+from typing import Optional, Iterable, Callable
 import os
+from datetime import datetime
 
 from pdf_visualization.pdf_visualization_layout import PDFWindowVisualizationLayout
 from pdf_visualization.cards_navigator import (
@@ -18,7 +23,15 @@ from pdf_visualization.cards_navigator import (
     merge_cards_ordered,
 )
 from pdf_visualization.right_panel_manager import RightPanelManager
+from pdf_visualization.ordered_cards_view import OrderedCardsView
+from pdf_visualization.shuffle_review_queue import ShuffleReviewQueue
+from pdf_visualization.flashcard_positions import FlashcardPositions
+from pdf_visualization.page_render_cache import PageRenderCache
+from pdf_visualization.deck_loader import DeckLoader
+from pdf_visualization.pdf_text_extractor import PdfTextExtractor
+from pdf_visualization.deck_state_cache import DeckState, DeckStateCache
 from test_management.test_manager import TestManager
+from test_management.test_progress import TestProgress
 from pdf_visualization.advanced_widget_layout import AdvancedOptionsLayout
 from pdf_visualization.advanced_widget_model import AdvancedOptionsModel
 from pdf_visualization.advanced_widget_control import AdvancedOptionsControl
@@ -26,11 +39,18 @@ from pdf_visualization.advanced_widget_control import AdvancedOptionsControl
 from pdf_visualization.search.search_flashcard_control import SearchFlashcardControl
 from pdf_visualization.search.search_flashcard_layout import SearchFlashcardLayout
 from pdf_visualization.search.search_flashcard_model import SearchFlashcardModel
+from pdf_visualization.search.flashcard_search_index import FlashcardSearchIndex
 
 from flashcard.flashcard import Flashcard
 from flashcard.pdf_page import PdfPage
 from flashcard.card import Card
-from IO_flashcards_management import IOFlashcards
+from IO_pdf_registry import PdfDocumentRegistry
+from IO_pdf_text_index import PdfTextIndex
+from application_constants import APPLICATION_NAME
+from IO_deck_writer import DeckWriter
+from IO_deck_database import DeckDatabase
+from IO_deck_summary import DeckSummary, DeckSummaryIndex
+from IO_deck_search_index import DeckSearchIndex
 from test_management.pdf_test_info import PDFTestsInfo
 
 
@@ -47,38 +67,47 @@ class PDFWindowVisualizationModel:
                 file.write("0\n1\n0\n")
 
         self.__path_of_pdf: str = path_of_pdf
+        self.__path_of_flashcards: str = path_of_flashcards
         self.__filename: str = os.path.basename(path_of_pdf)
-        self.__num_pdf_pages: int = IOFlashcards.get_pdf_page_count(self.__path_of_pdf)
-        self.__point: QPointF = QPointF(0, 0)
-
-        self.__io_flashcards_info: PDFTestsInfo = IOFlashcards.get_past_tests_info(
-            path_of_flashcards
+        # shared with the other users of the same pdf
+        self.__pdf_doc: QtPdf.QPdfDocument = PdfDocumentRegistry.acquire(
+            self.__path_of_pdf
         )
-        self.__flashcards_from_pdf_page: dict[
-            int, list[Flashcard]
-        ] = IOFlashcards.get_flashcards_from_txt(path_of_flashcards)
-        self.__update_invalid_page_references(
-            self.__flashcards_from_pdf_page, self.__num_pdf_pages
+        # shared with the workers of the other users of the same pdf
+        self.__workers_pdf_doc: QtPdf.QPdfDocument = PdfDocumentRegistry.acquire(
+            self.__path_of_pdf, True
         )
+        self.__num_pdf_pages: int = self.__pdf_doc.pageCount()
+        self.__point: QPointF = QPointF(0, 0)
 
-        self.__cards_to_display: list[Card]
-        self.__num_pdf_page_to_card_index: list[int]
-        self.__num_flashcard_to_card_index: list[int]
-
-        (
-            self.__cards_to_display,
-            self.__num_pdf_page_to_card_index,
-            self.__num_flashcard_to_card_index,
-        ) = merge_cards_ordered(self.__flashcards_from_pdf_page, self.__num_pdf_pages)
+        # set when the deck is loaded
+        self.__io_flashcards_info: PDFTestsInfo
+        self.__flashcards_from_pdf_page: MutableMapping[int, list[Flashcard]]
+        self.__deck_storage: DeckWriter | DeckDatabase
+        self.__is_full_save_needed: bool
+        self.__flashcard_positions: FlashcardPositions
+        self.__test_progress: TestProgress
+        self.__cards_to_display: Sequence[Card]
+        self.__num_pdf_page_to_card_index: Sequence[int]
+        self.__num_flashcard_to_card_index: Sequence[int]
+        self.__cards_navigator: CardsNavigator
+        # built at the first search if the deck is loaded lazily
+        self.__search_index: Optional[FlashcardSearchIndex] = None
+        self.__is_deck_loaded: bool = False
+        self.__method_to_call_on_deck_loaded: Optional[Callable[..., None]] = None
+        # page and id of the flashcard shown once the deck is loaded
+        self.__flashcard_to_show: Optional[tuple[int, int]] = None
         self.__is_deck_ordered: bool = True
 
-        self.__cards_navigator: CardsNavigator = CardsNavigator(self)
         self.__flashcard_manager: RightPanelManager = RightPanelManager(self)
 
         self.__window_layout: PDFWindowVisualizationLayout = (
             PDFWindowVisualizationLayout(self.__filename, self.__num_pdf_pages)
         )
         self.__test_manager: TestManager = TestManager(self, self.__window_layout)
+        self.__page_render_cache: PageRenderCache = PageRenderCache(
+            self.__workers_pdf_doc, self.__window_layout
+        )
 
         self.__advanced_controls_widget_layout: AdvancedOptionsLayout
         self.__advanced_controls_widget_control: AdvancedOptionsControl
@@ -88,22 +117,141 @@ class PDFWindowVisualizationModel:
         self.__search_flashcard_widget_model: SearchFlashcardControl
         self.__search_flashcard_widget_control: SearchFlashcardModel
 
+        self.__load_pdf_doc()
+        # None if the deck of a window closed recently is used
+        self.__deck_loader: Optional[DeckLoader] = None
+        # started once the deck is loaded, so it does not slow down the loading
+        self.__pdf_text_extractor: Optional[PdfTextExtractor] = None
+        deck_state: Optional[DeckState] = DeckStateCache.take(path_of_flashcards)
+        if deck_state is not None:
+            self.__attach_deck(deck_state, DeckWriter(path_of_flashcards))
+        else:
+            self.__start_deck_loader()
+
+    def __start_deck_loader(self) -> None:
+        # the first page is shown while the deck is loaded
+        self.__window_layout.get_pdf_nav().jump(0, self.__point)
+        self.__window_layout.set_is_deck_loading(True)
+        self.__deck_loader = DeckLoader(
+            self.__path_of_flashcards,
+            self.__num_pdf_pages,
+            parent=self.__window_layout,
+        )
+        self.__deck_loader.progress_changed.connect(
+            self.__window_layout.set_loading_progress
+        )
+        self.__deck_loader.finished.connect(self.__on_deck_loader_finished)
+        self.__deck_loader.start()
+
+    def __on_deck_loader_finished(self) -> None:
+        """Called on the GUI thread when the deck loader is finished"""
+        if self.__deck_loader is None:
+            return
+        if not self.__deck_loader.get_is_loaded():
+            QMessageBox.critical(
+                self.__window_layout,
+                APPLICATION_NAME,
+                "The flashcards of "
+                + self.__filename
+                + " could not be loaded: "
+                + str(self.__deck_loader.get_error()),
+            )
+            self.__window_layout.close()
+            return
+
+        deck_database: Optional[DeckDatabase] = self.__deck_loader.get_deck_database()
+        self.__attach_deck(
+            self.__deck_loader.get_deck_state(),
+            deck_database
+            if deck_database is not None
+            else DeckWriter(self.__path_of_flashcards),
+        )
+        self.__window_layout.set_is_deck_loading(False)
+
+    def __attach_deck(
+        self, deck_state: DeckState, deck_storage: DeckWriter | DeckDatabase
+    ) -> None:
+        self.__io_flashcards_info = deck_state.get_io_flashcards_info()
+        self.__flashcards_from_pdf_page = deck_state.get_flashcards_from_pdf_page()
+        self.__deck_storage = deck_storage
+        self.__is_full_save_needed = deck_state.get_is_full_save_needed()
+        self.__flashcard_positions = deck_state.get_flashcard_positions()
+        self.__test_progress = deck_state.get_test_progress()
+        (
+            self.__cards_to_display,
+            self.__num_pdf_page_to_card_index,
+            self.__num_flashcard_to_card_index,
+        ) = deck_state.get_merged_cards()
+        self.__search_index = deck_state.get_search_index()
+        self.__cards_navigator = CardsNavigator(self)
+        self.__is_deck_loaded = True
+        self.__start_pdf_text_extractor()
+
         self.__setup_window_layout()
         self.set_current_card_index(0)
+        if self.__flashcard_to_show is not None:
+            self.show_flashcard(*self.__flashcard_to_show)
+        if self.__method_to_call_on_deck_loaded is not None:
+            self.__method_to_call_on_deck_loaded()
+
+    def __start_pdf_text_extractor(self) -> None:
+        self.__pdf_text_extractor = PdfTextExtractor(
+            self.__path_of_pdf,
+            self.__workers_pdf_doc,
+            PdfDocumentRegistry.get_metadata(self.__path_of_pdf).get_content_hash(),
+            parent=self.__window_layout,
+        )
+        self.__pdf_text_extractor.start()
+
+    def search_pdf_pages(self, text_to_search: str) -> list[int]:
+        """The pdf pages whose text contains text_to_search, sorted. Empty until the text of the pdf is extracted"""
+        if (
+            self.__pdf_text_extractor is None
+            or not self.__pdf_text_extractor.get_is_indexed()
+        ):
+            return []
+        return PdfTextIndex.search(
+            self.__pdf_text_extractor.get_content_hash(), text_to_search
+        )
+
+    def show_flashcard(self, page: int, flashcard_id: int) -> None:
+        """Show the flashcard with flashcard_id of page, when the deck is loaded"""
+        if not self.__is_deck_loaded:
+            self.__flashcard_to_show = (page, flashcard_id)
+            return
+        self.__flashcard_to_show = None
+        flashcard: Flashcard
+        for flashcard in self.__flashcards_from_pdf_page.get(page, []):
+            if flashcard.get_id() == flashcard_id:
+                card_index: int = self.get_card_index_of_flashcard(flashcard)
+                if card_index != -1:
+                    self.set_current_card_index(card_index)
+                return
+
+    def set_method_to_call_on_deck_loaded(
+        self, method_to_call: Callable[..., None]
+    ) -> None:
+        """method_to_call is called at once if the deck is already loaded"""
+        self.__method_to_call_on_deck_loaded = method_to_call
+        if self.__is_deck_loaded:
+            method_to_call()
+
+    def get_is_deck_loaded(self) -> bool:
+        return self.__is_deck_loaded
 
-    def get_flashcards_from_pdf_page(self) -> dict[int, list[Flashcard]]:
+    def get_flashcards_from_pdf_page(self) -> MutableMapping[int, list[Flashcard]]:
         return self.__flashcards_from_pdf_page
 
     def get_num_pdf_pages(self) -> int:
         return self.__num_pdf_pages
 
-    def get_cards_to_display(self) -> list[Card]:
+    def get_cards_to_display(self) -> Sequence[Card]:
         return self.__cards_to_display
 
-    def get_num_pdf_page_to_card_index(self) -> list[int]:
+    def get_num_pdf_page_to_card_index(self) -> Sequence[int]:
         return self.__num_pdf_page_to_card_index
 
-    def get_num_flashcard_to_card_index(self) -> list[int]:
+    def get_num_flashcard_to_card_index(self) -> Sequence[int]:
         return self.__num_flashcard_to_card_index
 
     def get_num_cards(self) -> int:
@@ -169,26 +317,16 @@ class PDFWindowVisualizationModel:
     def get_test_manager(self) -> TestManager:
         return self.__test_manager
 
-    def get_pdf_tests_info(self) -> PDFTestsInfo:
-        return self.__io_flashcards_info
+    def get_test_progress(self) -> TestProgress:
+        return self.__test_progress
 
-    def __update_invalid_page_references(
-        self, flashcards: dict[int, list[Flashcard]], num_pdf_pages: int
-    ) -> None:
-        # if a pdf file is updated and afterwards it has less pages, old flashcards could have a reference_page to a not existing page.
-        # At the first update/addition/removal of a flashcard these changes will be saved to disk
-        num_page: int
-        list_flashcards: list[Flashcard]
-        for num_page, list_flashcards in flashcards.copy().items():
-            if num_page >= num_pdf_pages:
-                for flashcard in list_flashcards:
-                    flashcard.set_reference_page(num_pdf_pages - 1)
-                if num_pdf_pages - 1 in flashcards.keys():
-                    flashcards[num_pdf_pages - 1].extend(list_flashcards)
-                else:
-                    flashcards[num_pdf_pages - 1] = list_flashcards
+    def get_search_index(self) -> FlashcardSearchIndex:
+        if self.__search_index is None:
+            self.__search_index = FlashcardSearchIndex(self.__flashcards_from_pdf_page)
+        return self.__search_index
 
-                flashcards.pop(num_page)
+    def get_pdf_tests_info(self) -> PDFTestsInfo:
+        return self.__io_flashcards_info
 
     def __setup_window_layout(self) -> None:
         self.__window_layout.get_pdf_spinbox_label().setText(
@@ -252,6 +390,24 @@ class PDFWindowVisualizationModel:
                 self.__flashcards_from_pdf_page, self.__num_pdf_pages
             )
 
+    def update_merged_cards(self, changed_pages: Iterable[int]) -> None:
+        """Update the cards after flashcards were added to or removed from changed_pages, or moved between them. The cards are updated in place, without shuffling them again"""
+        changed_pages = list(changed_pages)
+        self.__flashcard_positions.update_pages(changed_pages)
+        self.__test_progress.update_pages(changed_pages)
+        if self.__search_index is not None:
+            self.__search_index.update_pages(changed_pages)
+        if isinstance(self.__cards_to_display, OrderedCardsView | ShuffleReviewQueue):
+            # the two indexes are views on the same cards
+            self.__cards_to_display.update_pages(changed_pages)
+        else:
+            self.refresh_merged_cards(self.__is_deck_ordered)
+
+    def remove_answered_flashcard(self, flashcard: Flashcard) -> None:
+        """Remove a flashcard answered during the test from the shuffled cards, the order of the others does not change"""
+        if isinstance(self.__cards_to_display, ShuffleReviewQueue):
+            self.__cards_to_display.remove(flashcard)
+
     def update_page_spinbox_change(self) -> None:
         if not self.__is_page_spinbox_event_disabled:
             new_page_num: int = self.get_pdf_page_from_spinbox()
@@ -307,11 +463,10 @@ class PDFWindowVisualizationModel:
         self.__cards_navigator.next_page()
 
     def __setup_left_panel(self) -> None:
-        self.__load_pdf_doc(self.__path_of_pdf)
         self.update_card(self.get_current_card_index())
 
-    def __load_pdf_doc(self, path_of_pdf: str) -> None:
-        self.__window_layout.get_pdf_doc().load(path_of_pdf)
+    def __load_pdf_doc(self) -> None:
+        self.__window_layout.set_pdf_doc(self.__pdf_doc)
 
     def __setup_bottom_widget(self) -> None:
         self.__setup_current_card_bottom_layout()
@@ -348,19 +503,59 @@ class PDFWindowVisualizationModel:
         element_to_display: Card = self.__cards_to_display[current_card_index]
         if isinstance(element_to_display, PdfPage):
             self.__window_layout.get_flashcard_label().setVisible(False)
-            self.__window_layout.get_pdf_nav().jump(
-                element_to_display.get_pdf_page(), self.__point
-            )
-            self.__window_layout.get_pdf_view().setVisible(True)
+            self.__show_pdf_page(element_to_display.get_pdf_page())
         elif isinstance(element_to_display, Flashcard):
             quest: Flashcard = element_to_display
             self.__window_layout.get_pdf_view().setVisible(False)
+            self.__window_layout.get_page_image_scroll_area().setVisible(False)
             self.__window_layout.get_flashcard_label().setText(quest.get_question())
             self.__window_layout.get_flashcard_label().setVisible(True)
         else:
             raise TypeError("Class type is different from what is expected")
         return None
 
+    def __show_pdf_page(self, num_page: int) -> None:
+        """Show the page from the render cache if it was rendered ahead, otherwise in the pdf view"""
+        size: QSize = self.__get_page_render_size(num_page)
+        image: Optional[QImage] = self.__page_render_cache.get_image(num_page, size)
+        if image is not None:
+            pixmap: QPixmap = QPixmap.fromImage(image)
+            pixmap.setDevicePixelRatio(
+                self.__window_layout.get_pdf_view().devicePixelRatioF()
+            )
+            self.__window_layout.get_page_image_label().setPixmap(pixmap)
+            self.__window_layout.get_page_image_label().adjustSize()
+            self.__window_layout.get_pdf_view().setVisible(False)
+            self.__window_layout.get_page_image_scroll_area().setVisible(True)
+        else:
+            self.__window_layout.get_page_image_scroll_area().setVisible(False)
+            self.__window_layout.get_pdf_nav().jump(num_page, self.__point)
+            self.__window_layout.get_pdf_view().setVisible(True)
+        self.__page_render_cache.prefetch(num_page, size)
+
+    def __get_page_render_size(self, num_page: int) -> QSize:
+        # the same size of the page in the pdf view: its size in points at the zoom factor and at the resolution of the screen
+        pdf_view: QtPdfWidgets.QPdfView = self.__window_layout.get_pdf_view()
+        scale: float = (
+            pdf_view.zoomFactor()
+            * pdf_view.logicalDpiX()
+            / 72
+            * pdf_view.devicePixelRatioF()
+        )
+        point_size: QSizeF = self.__pdf_doc.pagePointSize(num_page)
+        return QSize(
+            round(point_size.width() * scale), round(point_size.height() * scale)
+        )
+
+    def update_zoom(self) -> None:
+        """Show again the current pdf page after a change of the zoom factor of the pdf view"""
+        card: Card = self.__cards_to_display[self.get_current_card_index()]
+        if isinstance(card, PdfPage):
+            self.__show_pdf_page(card.get_pdf_page())
+
+    def get_page_render_cache(self) -> PageRenderCache:
+        return self.__page_render_cache
+
     def get_pdf_window_visualization(self) -> PDFWindowVisualizationLayout:
         return self.__window_layout
 
@@ -395,14 +590,178 @@ class PDFWindowVisualizationModel:
     def modify_current_flashcard(self) -> None:
         self.__flashcard_manager.modify_current_flashcard()
 
-    def save_flashcards_to_file(self) -> None:
-        IOFlashcards.save_flashcards_file(
-            self.__path_of_pdf,
+    def save_flashcards_to_file(
+        self, changed_pages: Optional[Iterable[int]] = None
+    ) -> None:
+        """Save the flashcards of changed_pages. If changed_pages is None, all the deck is saved.
+
+        The .txt decks are written in the background by their DeckWriter, the decks imported in the database update only the rows of changed_pages.
+        """
+        if (
+            changed_pages is None
+            or self.__is_full_save_needed
+            or self.__deck_storage.needs_compaction()
+        ):
+            self.__deck_storage.save_deck(
+                self.__io_flashcards_info,
+                self.get_num_flashcards(),
+                self.__flashcards_from_pdf_page,
+            )
+            self.__is_full_save_needed = False
+            self.__save_search_rows(self.__flashcards_from_pdf_page, True)
+        else:
+            flashcards_of_pages: dict[int, list[Flashcard]] = {
+                page: self.__flashcards_from_pdf_page.get(page, [])
+                for page in changed_pages
+            }
+            self.__deck_storage.save_pages(
+                self.__io_flashcards_info, flashcards_of_pages
+            )
+            self.__save_search_rows(flashcards_of_pages, False)
+        self.__save_summary()
+
+    def __save_search_rows(
+        self, flashcards_of_pages: Mapping[int, list[Flashcard]], is_whole_deck: bool
+    ) -> None:
+        # the DeckWriter of a .txt deck saves them after writing the deck
+        if isinstance(self.__deck_storage, DeckDatabase):
+            DeckSearchIndex.save_pages(
+                self.__path_of_flashcards,
+                DeckSearchIndex.get_rows(flashcards_of_pages),
+                is_whole_deck,
+            )
+
+    def save_flashcard_result(self, flashcard: Flashcard) -> None:
+        if isinstance(self.__deck_storage, DeckDatabase):
+            self.__deck_storage.save_flashcard_result(
+                self.__io_flashcards_info, flashcard
+            )
+            self.__save_summary()
+        else:
+            self.save_flashcards_to_file([flashcard.get_reference_page()])
+
+    def __save_summary(self) -> None:
+        summary: DeckSummary = DeckSummary.from_num_results(
+            self.__io_flashcards_info,
+            self.__test_progress.get_num_results(),
+            datetime.now(),
+        )
+        if isinstance(self.__deck_storage, DeckDatabase):
+            DeckSummaryIndex.save_summary(self.__path_of_flashcards, summary)
+        else:
+            # it is saved after the deck, on the writer thread
+            self.__deck_storage.save_summary(summary)
+
+    def close_deck(self) -> None:
+        """Write the pending changes of the deck, stop rendering the pages and extracting their text and release the pdf, called when the window is closed.
+
+        The deck of a .txt file is kept in the DeckStateCache, so it is not read again if the window is opened soon.
+        """
+        if self.__deck_loader is not None and not self.__is_deck_loaded:
+            # the window is closed while the deck is loaded, the loaded deck is discarded
+            self.__deck_loader.finished.disconnect(self.__on_deck_loader_finished)
+            self.__deck_loader.requestInterruption()
+            self.__deck_loader.wait()
+            deck_database: Optional[DeckDatabase] = (
+                self.__deck_loader.get_deck_database()
+            )
+            if deck_database is not None:
+                deck_database.close()
+        elif self.__is_deck_loaded:
+            self.__deck_storage.close()
+            if isinstance(self.__deck_storage, DeckWriter):
+                DeckStateCache.put(
+                    self.__path_of_flashcards,
+                    self.__path_of_pdf,
+                    self.__get_deck_state(),
+                )
+        if self.__pdf_text_extractor is not None:
+            self.__pdf_text_extractor.requestInterruption()
+            self.__pdf_text_extractor.wait()
+        self.__page_render_cache.close()
+        PdfDocumentRegistry.release(self.__workers_pdf_doc)
+        PdfDocumentRegistry.release(self.__pdf_doc)
+
+    def __get_deck_state(self) -> DeckState:
+        merged_cards: tuple[Sequence[Card], Sequence[int], Sequence[int]]
+        if isinstance(self.__cards_to_display, OrderedCardsView):
+            merged_cards = (
+                self.__cards_to_display,
+                self.__num_pdf_page_to_card_index,
+                self.__num_flashcard_to_card_index,
+            )
+        else:
+            # a window is always opened with the ordered cards
+            merged_cards = merge_cards_ordered(
+                self.__flashcards_from_pdf_page, self.__num_pdf_pages
+            )
+        return DeckState(
             self.__io_flashcards_info,
-            self.get_num_flashcards(),
             self.__flashcards_from_pdf_page,
+            self.__is_full_save_needed,
+            self.__flashcard_positions,
+            self.__test_progress,
+            merged_cards,
+            self.__search_index,
+        )
+
+    def get_num_pending_writes(self) -> int:
+        if not self.__is_deck_loaded:
+            return 0
+        return self.__deck_storage.get_num_pending_writes()
+
+    def regroup_flashcards_by_page(self, pages: Iterable[int]) -> None:
+        """Move the flashcards of pages under the key of their reference page, that could have changed. pages has to contain both the old and the new reference pages.
+
+        The flashcards end up in the same order they would have after saving and reloading the deck.
+        """
+        pages = set(pages)
+        flashcards_to_regroup: list[Flashcard] = []
+        page: int
+        for page in sorted(pages):
+            flashcards_to_regroup.extend(self.__flashcards_from_pdf_page.pop(page, []))
+
+        flashcard: Flashcard
+        for flashcard in flashcards_to_regroup:
+            self.__flashcards_from_pdf_page.setdefault(
+                flashcard.get_reference_page(), []
+            ).append(flashcard)
+        self.__flashcard_positions.update_pages(
+            pages.union(
+                flashcard.get_reference_page() for flashcard in flashcards_to_regroup
+            )
         )
 
+    def get_position_in_page(self, flashcard: Flashcard) -> int:
+        """Position of flashcard in the list of its reference page"""
+        return self.__flashcard_positions.get_page_and_position(flashcard)[1]
+
+    def remove_flashcard(self, flashcard: Flashcard) -> None:
+        """Remove flashcard from the list of its reference page. The cards have to be updated afterwards with update_merged_cards"""
+        self.__flashcard_positions.remove(flashcard)
+
+    def get_card_index_of_flashcard(self, flashcard: Flashcard) -> int:
+        """Returns -1 if the flashcard is not displayed"""
+        if self.__is_deck_ordered and isinstance(
+            self.__cards_to_display, OrderedCardsView
+        ):
+            page: int
+            position: int
+            try:
+                page, position = self.__flashcard_positions.get_page_and_position(
+                    flashcard
+                )
+            except ValueError:
+                return -1
+            return self.__cards_to_display.get_card_index_of_page_flashcard(
+                page, position
+            )
+        if isinstance(self.__cards_to_display, ShuffleReviewQueue):
+            return self.__cards_to_display.get_card_index_of_flashcard_id(
+                flashcard.get_id()
+            )
+        return -1
+
     def get_num_flashcards(self) -> int:
         cont: int = 0
         list_flashcards: list[Flashcard]
@@ -9,6 +9,7 @@
 from PyQt6.QtWidgets import QApplication, QPushButton, QPlainTextEdit, QCheckBox
 from PyQt6.QtCore import Qt
 
+from collections.abc import Sequence
 from typing import Optional
 from typing import TYPE_CHECKING
 
@@ -41,17 +42,19 @@ class RightPanelManager:
 
         QApplication.setOverrideCursor(Qt.CursorShape.WaitCursor)
 
+        changed_pages: list[int]
         if self.__is_flashcard_being_modified:
-            self.__modify_flashcard(flag_generic)
+            changed_pages = self.__modify_flashcard(flag_generic)
         else:
-            self.__add_page_flashcard(flag_generic)
+            changed_pages = self.__add_page_flashcard(flag_generic)
 
-        self.__pdf_visualization_model.save_flashcards_to_file()
+        self.__pdf_visualization_model.save_flashcards_to_file(changed_pages)
         self.clear_input_fields()
         self.__pdf_visualization_model.focus_advanced_options()
         QApplication.restoreOverrideCursor()
 
-    def __modify_flashcard(self, flag_generic: bool) -> None:
+    def __modify_flashcard(self, flag_generic: bool) -> list[int]:
+        """Returns the pdf pages whose flashcards have changed"""
         flashcard: Flashcard = self.__current_modified_flashcard
         flashcard.set_question(
             self.__pdf_visualization_model.get_input_text_question().toPlainText()
@@ -60,64 +63,58 @@ class RightPanelManager:
             self.__pdf_visualization_model.get_input_text_answer().toPlainText()
         )
 
+        old_reference_page: int = flashcard.get_reference_page()
+        # the cards are updated only after the flashcard is moved, so the current card is read before
+        current_card: Card = self.__get_cards_to_display()[
+            self.__get_current_card_index()
+        ]
         # remove flashcard from old position
-        self.__get_flashcards_from_pdf_page()[flashcard.get_reference_page()].remove(
-            flashcard
-        )
+        self.__pdf_visualization_model.remove_flashcard(flashcard)
 
         if flag_generic:
             flashcard.set_reference_page(Flashcard.GENERIC_PAGE)
             flashcard.set_question_type(Flashcard.QuestionType.GENERIC)
         else:
-            flashcard.set_reference_page(
-                self.__pdf_visualization_model.get_current_page_index()
-            )
+            flashcard.set_reference_page(current_card.get_pdf_page())
             self.__set_page_specific_field(flashcard)
 
         # add flashcard in the new position
-        index_in_list: int = self.__get_index_list_position()
+        index_in_list: int = self.__get_index_list_position(current_card)
         self.__add_flashcard_at_index(flashcard, index_in_list)
 
-        self.__pdf_visualization_model.refresh_merged_cards(
-            self.__get_is_deck_ordered()
+        self.__pdf_visualization_model.update_merged_cards(
+            [old_reference_page, flashcard.get_reference_page()]
         )
 
         self.__is_flashcard_being_modified = False
         self.__reset_card_before_modification(flashcard)
+        return [old_reference_page, flashcard.get_reference_page()]
 
-    def __get_flashcard_index(self, flashcard_to_search: Flashcard) -> int:
-        i: int = 0
-        list_flashcards: list[Flashcard]
-        for _, list_flashcards in sorted(
-            self.__get_flashcards_from_pdf_page().items(), key=lambda x: x[0]
-        ):
-            for flashcard in list_flashcards:
-                if flashcard == flashcard_to_search:
-                    return i
-                i += 1
-        return -1
-
-    def __add_page_flashcard(self, flag_generic: bool = False) -> None:
+    def __add_page_flashcard(self, flag_generic: bool = False) -> list[int]:
+        """Returns the pdf pages whose flashcards have changed"""
         app: Optional[Flashcard] = self.__get_new_flashcard()
         if app is None:
-            return
+            return []
         flashcard: Flashcard = app
 
         if flag_generic:
             flashcard.set_reference_page(Flashcard.GENERIC_PAGE)
             flashcard.set_question_type(Flashcard.QuestionType.GENERIC)
 
-        index_in_list: int = self.__get_index_list_position()
+        index_in_list: int = self.__get_index_list_position(
+            self.__get_cards_to_display()[self.__get_current_card_index()]
+        )
 
         self.__add_flashcard_at_index(flashcard, index_in_list)
 
-        self.__pdf_visualization_model.refresh_merged_cards(
-            self.__get_is_deck_ordered()
+        self.__pdf_visualization_model.update_merged_cards(
+            [flashcard.get_reference_page()]
         )
 
         self.__get_cards_navigator().set_current_card_index(
             self.__get_current_card_index() + 1
         )
+        return [flashcard.get_reference_page()]
 
     def __get_new_flashcard(self) -> Optional[Flashcard]:
         flashcard: Flashcard = Flashcard()
@@ -164,31 +161,22 @@ class RightPanelManager:
     def __get_page_specific_checkbox(self) -> QCheckBox:
         return self.__pdf_visualization_model.get_include_pdf_page_checkbox()
 
-    def __get_index_list_position(self) -> int:
-        current_card: Card = self.__get_cards_to_display()[
-            self.__get_current_card_index()
-        ]
+    def __get_index_list_position(self, current_card: Card) -> int:
+        if isinstance(current_card, Flashcard):
+            try:
+                return self.__pdf_visualization_model.get_position_in_page(
+                    current_card
+                )
+            except ValueError:
+                # the current card is the flashcard being modified, that was removed from its page
+                pass
+
         flashcards_current_page: Optional[
             list[Flashcard]
         ] = self.__get_flashcards_from_pdf_page().get(current_card.get_pdf_page())
-        current_flashcard: Flashcard
-        if isinstance(current_card, Flashcard):
-            current_flashcard = current_card
-        else:
-            if flashcards_current_page is None:
-                return 0
-            return len(flashcards_current_page)
-
         if flashcards_current_page is None:
-            raise ValueError("Not expected value")
-        i: int = 0
-        while (
-            i < len(flashcards_current_page)
-            and flashcards_current_page[i] != current_flashcard
-        ):
-            i += 1
-
-        return i
+            return 0
+        return len(flashcards_current_page)
 
     def __add_flashcard(self, flashcard: Flashcard):
         if (
@@ -203,8 +191,8 @@ class RightPanelManager:
                 flashcard
             ]
 
-        self.__pdf_visualization_model.refresh_merged_cards(
-            self.__get_is_deck_ordered()
+        self.__pdf_visualization_model.update_merged_cards(
+            [flashcard.get_reference_page()]
         )
 
     def __add_flashcard_at_index(self, flashcard: Flashcard, index_in_list):
@@ -230,14 +218,14 @@ class RightPanelManager:
             return
 
         flashcard: Flashcard = card
-        self.__get_flashcards_from_pdf_page()[flashcard.get_reference_page()].remove(
-            flashcard
-        )
+        self.__pdf_visualization_model.remove_flashcard(flashcard)
 
-        self.__pdf_visualization_model.refresh_merged_cards(
-            self.__get_is_deck_ordered()
+        self.__pdf_visualization_model.update_merged_cards(
+            [flashcard.get_reference_page()]
+        )
+        self.__pdf_visualization_model.save_flashcards_to_file(
+            [flashcard.get_reference_page()]
         )
-        self.__pdf_visualization_model.save_flashcards_to_file()
         self.__get_cards_navigator().set_current_card_index(
             self.__get_current_card_index()
         )
@@ -289,7 +277,7 @@ class RightPanelManager:
     def __get_cancel_modification_flashcard_button(self) -> QPushButton:
         return self.__pdf_visualization_model.get_cancel_modification_flashcard_button()
 
-    def __get_cards_to_display(self) -> list[Card]:
+    def __get_cards_to_display(self) -> Sequence[Card]:
         return self.__pdf_visualization_model.get_cards_to_display()
 
     def __get_current_card_index(self) -> int:
@@ -336,10 +324,10 @@ class RightPanelManager:
         else:
             self.__get_page_specific_checkbox().setChecked(True)
 
-    def get_num_pdf_page_to_card_index(self) -> list[int]:
+    def get_num_pdf_page_to_card_index(self) -> Sequence[int]:
         return self.__pdf_visualization_model.get_num_pdf_page_to_card_index()
 
-    def get_num_flashcard_to_card_index(self) -> list[int]:
+    def get_num_flashcard_to_card_index(self) -> Sequence[int]:
         return self.__pdf_visualization_model.get_num_flashcard_to_card_index()
 
     def __set_input_text_question(self, string: str) -> None:
@@ -364,8 +352,9 @@ class RightPanelManager:
         QApplication.restoreOverrideCursor()
 
     def __reset_card_before_modification(self, flashcard: Flashcard) -> None:
-        flashcard_index: int = self.__get_flashcard_index(flashcard)
-        # riposition on the flashcard
-        self.__get_cards_navigator().set_current_card_index(
-            self.get_num_flashcard_to_card_index()[flashcard_index]
+        card_index: int = self.__pdf_visualization_model.get_card_index_of_flashcard(
+            flashcard
         )
+        # riposition on the flashcard
+        if card_index >= 0:
+            self.__get_cards_navigator().set_current_card_index(card_index)
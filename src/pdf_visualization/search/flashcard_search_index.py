@@ -0,0 +1,101 @@
+# Copyright 2022, 2023 Andrea Cucchietti
+# This file is part of flashcards-from-pdf.
+
+# flashcards-from-pdf is free software: you can redistribute it and/or modify it under the terms of the GNU General Public License as published by the Free Software Foundation, either version 3 of the License, or (at your option) any later version.
+
+# flashcards-from-pdf is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License along with flashcards-from-pdf. If not, see <https://www.gnu.org/licenses/>.
+from collections.abc import Mapping, Iterable
+
+from flashcard.flashcard import Flashcard
+
+
+class FlashcardSearchIndex:
+    """Inverted index from the trigrams of the text of the flashcards to their ids.
+
+    The text of a flashcard is its question followed by its answer, in lower case. The flashcards that contain a text of at least 3 characters are found among the ones with all its trigrams, the shorter texts are searched in the text of every flashcard.
+    The flashcards are indexed by page, when the flashcards of some pages change update_pages indexes them again.
+    """
+
+    TRIGRAM_LENGTH: int = 3
+
+    def __init__(self, flashcards_per_page: Mapping[int, list[Flashcard]]) -> None:
+        self.__flashcards_per_page: Mapping[int, list[Flashcard]] = flashcards_per_page
+        self.__ids_of_trigrams: dict[str, set[int]] = dict()
+        self.__texts: dict[int, str] = dict()
+        self.__flashcards: dict[int, Flashcard] = dict()
+        self.__ids_of_pages: dict[int, list[int]] = dict()
+        self.update_pages(list(flashcards_per_page.keys()))
+
+    @staticmethod
+    def get_text(flashcard: Flashcard) -> str:
+        return (flashcard.get_question() + flashcard.get_answer()).lower()
+
+    @staticmethod
+    def __get_trigrams(text: str) -> set[str]:
+        return {
+            text[i : i + FlashcardSearchIndex.TRIGRAM_LENGTH]
+            for i in range(len(text) - FlashcardSearchIndex.TRIGRAM_LENGTH + 1)
+        }
+
+    def update_pages(self, pages: Iterable[int]) -> None:
+        """Index again the flashcards of pages, after flashcards were added, modified or removed, or moved between them"""
+        pages = set(pages)
+        page: int
+        # all the pages are removed before adding them again, as a flashcard can be moved between them
+        for page in pages:
+            flashcard_id: int
+            for flashcard_id in self.__ids_of_pages.pop(page, []):
+                self.__remove(flashcard_id)
+        for page in pages:
+            flashcard: Flashcard
+            for flashcard in self.__flashcards_per_page.get(page, []):
+                self.__add(flashcard)
+                self.__ids_of_pages.setdefault(page, []).append(flashcard.get_id())
+
+    def __add(self, flashcard: Flashcard) -> None:
+        text: str = FlashcardSearchIndex.get_text(flashcard)
+        self.__texts[flashcard.get_id()] = text
+        self.__flashcards[flashcard.get_id()] = flashcard
+        trigram: str
+        for trigram in FlashcardSearchIndex.__get_trigrams(text):
+            self.__ids_of_trigrams.setdefault(trigram, set()).add(flashcard.get_id())
+
+    def __remove(self, flashcard_id: int) -> None:
+        trigram: str
+        for trigram in FlashcardSearchIndex.__get_trigrams(
+            self.__texts.pop(flashcard_id)
+        ):
+            ids: set[int] = self.__ids_of_trigrams[trigram]
+            ids.discard(flashcard_id)
+            if len(ids) == 0:
+                self.__ids_of_trigrams.pop(trigram)
+        self.__flashcards.pop(flashcard_id)
+
+    def search(self, text_to_search: str) -> list[Flashcard]:
+        """The flashcards whose text contains text_to_search, in no particular order"""
+        text_to_search = text_to_search.lower()
+        candidate_ids: Iterable[int]
+        if len(text_to_search) < FlashcardSearchIndex.TRIGRAM_LENGTH:
+            candidate_ids = self.__texts.keys()
+        else:
+            # the rarest trigrams first, so the intersection stays small
+            ids_of_trigrams: list[set[int]] = sorted(
+                (
+                    self.__ids_of_trigrams.get(trigram, set())
+                    for trigram in FlashcardSearchIndex.__get_trigrams(text_to_search)
+                ),
+                key=len,
+            )
+            candidate_ids = set(ids_of_trigrams[0]).intersection(*ids_of_trigrams[1:])
+
+        # the trigrams can be in a different order in the text
+        return [
+            self.__flashcards[flashcard_id]
+            for flashcard_id in candidate_ids
+            if text_to_search in self.__texts[flashcard_id]
+        ]
+
+    def get_num_flashcards(self) -> int:
+        return len(self.__texts)
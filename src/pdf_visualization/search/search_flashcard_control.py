@@ -31,6 +31,12 @@ class SearchFlashcardControl:
                 consider_current_card=True,
             )
         )
+        self.__search_flashcard_layout.get_search_pdf_pages_checkbox().stateChanged.connect(
+            partial(
+                self.__search_flashcard_model.search_flashcard,
+                consider_current_card=True,
+            )
+        )
         self.__search_flashcard_layout.get_continue_search().clicked.connect(
             partial(
                 self.__search_flashcard_model.search_flashcard,
@@ -12,6 +12,7 @@ from PyQt6.QtWidgets import (
     QPushButton,
     QLabel,
     QPlainTextEdit,
+    QCheckBox,
 )
 
 
@@ -25,24 +26,33 @@ class SearchFlashcardLayout(QWidget):
 
         self.__info_label_left: QLabel
         self.__search_input_text: QPlainTextEdit
+        self.__search_pdf_pages_checkbox: QCheckBox
         self.__continue_search: QPushButton
 
         self.__set_layout()
 
     def __set_layout(self) -> None:
         self.__info_label_left = QLabel(
-            "Add the text to search. The text should be a continouos subset of either the question or the answer of a flashcard"
+            "Add the text to search. The text should be a continouos subset of either the question or the answer of a flashcard, or of the text of a pdf page"
         )
         self.__info_label_left.setWordWrap(True)
         self.__search_input_text = QPlainTextEdit()
+        self.__search_pdf_pages_checkbox = QCheckBox(
+            "Search also the text of the pdf pages"
+        )
+        self.__search_pdf_pages_checkbox.setChecked(True)
         self.__continue_search = QPushButton("Continue the search")
 
         self.__window_layout.addWidget(self.__info_label_left)
         self.__window_layout.addWidget(self.__search_input_text)
+        self.__window_layout.addWidget(self.__search_pdf_pages_checkbox)
         self.__window_layout.addWidget(self.__continue_search)
 
     def get_search_input_text(self) -> QPlainTextEdit:
         return self.__search_input_text
 
+    def get_search_pdf_pages_checkbox(self) -> QCheckBox:
+        return self.__search_pdf_pages_checkbox
+
     def get_continue_search(self) -> QPushButton:
         return self.__continue_search
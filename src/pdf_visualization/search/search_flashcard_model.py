@@ -11,14 +11,14 @@ from PyQt6.QtCore import Qt
 
 
 from pdf_visualization.search.search_flashcard_layout import SearchFlashcardLayout
+from bisect import bisect_left, bisect_right
+from collections.abc import Sequence
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
     from pdf_visualization.pdf_visualization_model import PDFWindowVisualizationModel
 
-from pdf_visualization.cards_navigator import get_flashcards_list
 from flashcard.flashcard import Flashcard
-from flashcard.card import Card
 
 
 class SearchFlashcardModel:
@@ -46,25 +46,20 @@ class SearchFlashcardModel:
         )
         QApplication.setOverrideCursor(Qt.CursorShape.WaitCursor)
         card_index: int = self.__pdf_visualization_model.get_current_card_index()
-        cards: list[Card] = self.__pdf_visualization_model.get_cards_to_display()
-        num_cards: int = len(cards)
-
-        num_pdf_pages: int = self.__pdf_visualization_model.get_num_pdf_pages()
-        if num_pdf_pages > 2000:
-            print(
-                "Warning: search_flashcard is not efficient with a great number of pdf pages\n"
-            )
+        card_indexes: list[int] = self.__get_card_indexes_of_matches(text_to_search)
 
+        result_search: int = -1
         # consider the cards in a position >= than the current one
-        result_search = self.__search_flashcard_interval(
-            card_index, num_cards, text_to_search, cards, consider_current_card
-        )
-
-        # consider the cards in a position < than the current one
-        if result_search == -1:
-            result_search = self.__search_flashcard_interval(
-                0, card_index, text_to_search, cards, consider_current_card
-            )
+        position: int
+        if consider_current_card:
+            position = bisect_left(card_indexes, card_index)
+        else:
+            position = bisect_right(card_indexes, card_index)
+        if position < len(card_indexes):
+            result_search = card_indexes[position]
+        elif len(card_indexes) > 0 and card_indexes[0] < card_index:
+            # consider the cards in a position < than the current one
+            result_search = card_indexes[0]
 
         if result_search != -1:
             # jumping to a flashcard, even in shuffle mode, is allowed
@@ -75,46 +70,27 @@ class SearchFlashcardModel:
             )
         QApplication.restoreOverrideCursor()
 
-    def __search_flashcard_interval(
-        self,
-        start_index: int,
-        end_index: int,
-        text_to_search: str,
-        cards: list[Card],
-        consider_current_card: bool,
-    ) -> int:
-        """
-        Search if a text is present in the question or the answer of the flashcards in a certain interval
-
-        Parameters
-        ----------
-        start_index:int
-        end_index:int
-                The end_index is the first index to not be considered
-        text_to_search: str
-        cards: list[Card]
-        consider_current_card: bool
-
-        Returns
-        -------
-        int
-            -1 if the search was not successful. Otherwise it is returned the card index
-
-        """
-        for card_index in range(start_index, end_index):
-            if (
-                consider_current_card == False
-                and card_index
-                == self.__pdf_visualization_model.get_current_card_index()
+    def __get_card_indexes_of_matches(self, text_to_search: str) -> list[int]:
+        """Card indexes of the flashcards whose question or answer contain text_to_search and, if requested, of the pdf pages whose text contains it, sorted"""
+        card_indexes: list[int] = []
+        if self.__search_flashcard_layout.get_search_pdf_pages_checkbox().isChecked():
+            num_pdf_page_to_card_index: Sequence[int] = (
+                self.__pdf_visualization_model.get_num_pdf_page_to_card_index()
+            )
+            page: int
+            for page in self.__pdf_visualization_model.search_pdf_pages(
+                text_to_search
             ):
-                continue
-            if isinstance(cards[card_index], Flashcard):
-                flashcard: Flashcard = cards[card_index]
-                if (
-                    text_to_search
-                    in (flashcard.get_question() + flashcard.get_answer()).lower()
-                ):
-                    return card_index
-
-            card_index += 1
-        return -1
+                if page < len(num_pdf_page_to_card_index):
+                    card_indexes.append(num_pdf_page_to_card_index[page])
+        flashcard: Flashcard
+        for flashcard in self.__pdf_visualization_model.get_search_index().search(
+            text_to_search
+        ):
+            card_index: int = (
+                self.__pdf_visualization_model.get_card_index_of_flashcard(flashcard)
+            )
+            if card_index != -1:
+                card_indexes.append(card_index)
+        card_indexes.sort()
+        return card_indexes
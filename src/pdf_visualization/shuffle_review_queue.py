@@ -0,0 +1,238 @@
+# Copyright 2022, 2023 Andrea Cucchietti
+# This file is part of flashcards-from-pdf.
+
+# flashcards-from-pdf is free software: you can redistribute it and/or modify it under the terms of the GNU General Public License as published by the Free Software Foundation, either version 3 of the License, or (at your option) any later version.
+
+# flashcards-from-pdf is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License along with flashcards-from-pdf. If not, see <https://www.gnu.org/licenses/>.
+from collections.abc import Mapping, Sequence, Iterable
+from typing import Optional
+from bisect import insort
+from random import shuffle
+
+from flashcard.flashcard import Flashcard
+from flashcard.pdf_page import PdfPage
+from flashcard.card import Card
+from pdf_visualization.ordered_cards_view import FenwickTree
+
+
+class ShuffleReviewQueue(Sequence):
+    """Cards of the shuffled visualization during a test, computed when they are accessed.
+
+    The flashcards not done are shuffled once, when the queue is created, and every page specific flashcard is followed by its pdf page. The pdf pages that are not referenced by any flashcard are at the end.
+    Every flashcard has a slot in the shuffled order. When a flashcard is answered its slot is emptied, so the order of the others does not change and the queue is not shuffled again. The number of cards of every slot is kept in a FenwickTree, so the position of a card is found in O(log n).
+    """
+
+    def __init__(
+        self, flashcards_per_page: Mapping[int, list[Flashcard]], num_pdf_pages: int
+    ) -> None:
+        self.__flashcards_per_page: Mapping[int, list[Flashcard]] = flashcards_per_page
+        self.__num_pdf_pages: int = num_pdf_pages
+
+        # None when the slot is empty
+        self.__flashcards: list[Optional[Flashcard]] = []
+        # the pdf page that follows the flashcard of a slot, if any
+        self.__pdf_pages: list[Optional[int]] = []
+        self.__reference_pages: list[int] = []
+        self.__slot_of_flashcard_ids: dict[int, int] = dict()
+        # the non empty slots of every reference page, sorted
+        self.__slots_of_pages: dict[int, list[int]] = dict()
+        # number of flashcards followed by each pdf page
+        self.__num_flashcards_of_pdf_pages: list[int] = [0] * num_pdf_pages
+
+        self.__num_cards_of_slots: FenwickTree = FenwickTree([])
+        self.__num_flashcards_of_slots: FenwickTree = FenwickTree([])
+        # 1 for the pdf pages that are not referenced by any flashcard, that are at the end
+        self.__remaining_pdf_pages: FenwickTree = FenwickTree([1] * num_pdf_pages)
+
+        flashcards: list[Flashcard] = [
+            flashcard
+            for list_flashcards in flashcards_per_page.values()
+            for flashcard in list_flashcards
+        ]
+        shuffle(flashcards)
+        flashcard: Flashcard
+        for flashcard in flashcards:
+            if flashcard.get_current_result() == Flashcard.Result.NOT_DONE:
+                self.__fill_slot(self.__add_slot(flashcard), flashcard)
+
+    def __add_slot(self, flashcard: Flashcard) -> int:
+        slot: int = len(self.__flashcards)
+        self.__flashcards.append(None)
+        self.__pdf_pages.append(None)
+        self.__reference_pages.append(flashcard.get_reference_page())
+        self.__num_cards_of_slots.append(0)
+        self.__num_flashcards_of_slots.append(0)
+        self.__slot_of_flashcard_ids[flashcard.get_id()] = slot
+        return slot
+
+    def __fill_slot(self, slot: int, flashcard: Flashcard) -> None:
+        pdf_page: Optional[int] = None
+        if (
+            flashcard.get_question_type() == Flashcard.QuestionType.PAGE_SPECIFIC
+            and 0 <= flashcard.get_reference_page() < self.__num_pdf_pages
+        ):
+            pdf_page = flashcard.get_reference_page()
+            self.__num_flashcards_of_pdf_pages[pdf_page] += 1
+            if self.__num_flashcards_of_pdf_pages[pdf_page] == 1:
+                self.__remaining_pdf_pages.add(pdf_page, -1)
+
+        self.__flashcards[slot] = flashcard
+        self.__pdf_pages[slot] = pdf_page
+        self.__reference_pages[slot] = flashcard.get_reference_page()
+        insort(
+            self.__slots_of_pages.setdefault(flashcard.get_reference_page(), []), slot
+        )
+        self.__num_cards_of_slots.add(slot, 1 if pdf_page is None else 2)
+        self.__num_flashcards_of_slots.add(slot, 1)
+
+    def __empty_slot(self, slot: int) -> None:
+        pdf_page: Optional[int] = self.__pdf_pages[slot]
+        if pdf_page is not None:
+            self.__num_flashcards_of_pdf_pages[pdf_page] -= 1
+            if self.__num_flashcards_of_pdf_pages[pdf_page] == 0:
+                self.__remaining_pdf_pages.add(pdf_page, 1)
+
+        slots_of_page: list[int] = self.__slots_of_pages[self.__reference_pages[slot]]
+        slots_of_page.remove(slot)
+        if len(slots_of_page) == 0:
+            self.__slots_of_pages.pop(self.__reference_pages[slot])
+        self.__num_cards_of_slots.add(slot, -1 if pdf_page is None else -2)
+        self.__num_flashcards_of_slots.add(slot, -1)
+        self.__flashcards[slot] = None
+        self.__pdf_pages[slot] = None
+
+    def remove(self, flashcard: Flashcard) -> None:
+        """Remove an answered flashcard, the order of the others does not change"""
+        slot: Optional[int] = self.__slot_of_flashcard_ids.get(flashcard.get_id())
+        if slot is not None and self.__flashcards[slot] is not None:
+            self.__empty_slot(slot)
+
+    def update_pages(self, pages: Iterable[int]) -> None:
+        """Update the queue after flashcards were added to or removed from pages, or moved between them. A modified flashcard keeps its position and a new one is put at the end"""
+        pages = set(pages)
+        page: int
+        slot: int
+        for page in pages:
+            for slot in list(self.__slots_of_pages.get(page, [])):
+                self.__empty_slot(slot)
+
+        flashcard: Flashcard
+        for page in pages:
+            for flashcard in self.__flashcards_per_page.get(page, []):
+                if flashcard.get_current_result() != Flashcard.Result.NOT_DONE:
+                    continue
+                if flashcard.get_id() in self.__slot_of_flashcard_ids:
+                    slot = self.__slot_of_flashcard_ids[flashcard.get_id()]
+                else:
+                    slot = self.__add_slot(flashcard)
+                if self.__flashcards[slot] is None:
+                    self.__fill_slot(slot, flashcard)
+
+    def __len__(self) -> int:
+        return self.__get_num_cards_of_flashcards() + self.__get_num_remaining_pages()
+
+    def __get_num_cards_of_flashcards(self) -> int:
+        return self.__num_cards_of_slots.get_prefix_sum(
+            self.__num_cards_of_slots.get_size()
+        )
+
+    def __get_num_remaining_pages(self) -> int:
+        return self.__remaining_pdf_pages.get_prefix_sum(self.__num_pdf_pages)
+
+    def __getitem__(self, card_index: int) -> Card:
+        if card_index < 0:
+            card_index += len(self)
+        if card_index < 0 or card_index >= len(self):
+            raise IndexError("card index out of range")
+
+        if card_index >= self.__get_num_cards_of_flashcards():
+            return self.__get_remaining_pdf_page(card_index)
+
+        # the slot of the card is the first one that ends after card_index
+        slot: int = self.__num_cards_of_slots.search(
+            lambda _, num_cards: num_cards <= card_index
+        )
+        flashcard: Flashcard = self.__flashcards[slot]
+        flashcard_index: int = self.__num_flashcards_of_slots.get_prefix_sum(slot)
+        pdf_page_index_before: int = ShuffleReviewQueue.__get_pdf_page_index_before(
+            flashcard
+        )
+        if card_index == self.__num_cards_of_slots.get_prefix_sum(slot):
+            flashcard.set_flashcard_index_before(flashcard_index - 1)
+            flashcard.set_pdf_page_index_before(pdf_page_index_before)
+            return flashcard
+
+        # a pdf page can follow more flashcards, so a new instance is created for each position
+        pdf_page: PdfPage = PdfPage(self.__pdf_pages[slot])
+        pdf_page.set_card_index(card_index)
+        pdf_page.set_flashcard_index_before(flashcard_index)
+        pdf_page.set_pdf_page_index_before(pdf_page_index_before)
+        return pdf_page
+
+    @staticmethod
+    def __get_pdf_page_index_before(flashcard: Flashcard) -> int:
+        if (
+            flashcard.get_reference_page() - 1 >= 0
+            and flashcard.get_question_type() != Flashcard.QuestionType.GENERIC
+        ):
+            return flashcard.get_reference_page() - 1
+        return Flashcard.GENERIC_PAGE
+
+    def __get_remaining_pdf_page(self, card_index: int) -> PdfPage:
+        position: int = card_index - self.__get_num_cards_of_flashcards()
+        num_page: int = self.__remaining_pdf_pages.search(
+            lambda _, num_pages: num_pages <= position
+        )
+        pdf_page: PdfPage = PdfPage(num_page)
+        pdf_page.set_card_index(card_index)
+        # the remaining pdf pages have all the same reference to the last flashcard
+        pdf_page.set_flashcard_index_before(Flashcard.GENERIC_PAGE)
+        num_flashcards: int = self.get_num_flashcards()
+        if num_flashcards > 0:
+            last_flashcard: Flashcard = self.__flashcards[
+                self.__get_slot_of_flashcard(num_flashcards - 1)
+            ]
+            if last_flashcard.get_question_type() != Flashcard.QuestionType.GENERIC:
+                pdf_page.set_flashcard_index_before(num_flashcards - 1)
+        pdf_page.set_pdf_page_index_before(num_page - 1)
+        return pdf_page
+
+    def __get_slot_of_flashcard(self, flashcard_index: int) -> int:
+        return self.__num_flashcards_of_slots.search(
+            lambda _, num_flashcards: num_flashcards <= flashcard_index
+        )
+
+    def get_card_index_of_pdf_page(self, num_page: int) -> int:
+        if self.__num_flashcards_of_pdf_pages[num_page] == 0:
+            return (
+                self.__get_num_cards_of_flashcards()
+                + self.__remaining_pdf_pages.get_prefix_sum(num_page)
+            )
+        # the page after the last flashcard that references it
+        slot: int
+        for slot in reversed(self.__slots_of_pages[num_page]):
+            if self.__pdf_pages[slot] == num_page:
+                return self.__num_cards_of_slots.get_prefix_sum(slot) + 1
+        raise ValueError("The pdf page is not referenced by a flashcard")
+
+    def get_card_index_of_flashcard(self, flashcard_index: int) -> int:
+        return self.__num_cards_of_slots.get_prefix_sum(
+            self.__get_slot_of_flashcard(flashcard_index)
+        )
+
+    def get_card_index_of_flashcard_id(self, flashcard_id: int) -> int:
+        """Returns -1 if the flashcard is not in the queue"""
+        slot: Optional[int] = self.__slot_of_flashcard_ids.get(flashcard_id)
+        if slot is None or self.__flashcards[slot] is None:
+            return -1
+        return self.__num_cards_of_slots.get_prefix_sum(slot)
+
+    def get_num_flashcards(self) -> int:
+        return self.__num_flashcards_of_slots.get_prefix_sum(
+            self.__num_flashcards_of_slots.get_size()
+        )
+
+    def get_num_pdf_pages(self) -> int:
+        return self.__num_pdf_pages
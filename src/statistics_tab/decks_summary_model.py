@@ -0,0 +1,64 @@
+# Copyright 2022, 2023 Andrea Cucchietti
+# This file is part of flashcards-from-pdf.
+
+# flashcards-from-pdf is free software: you can redistribute it and/or modify it under the terms of the GNU General Public License as published by the Free Software Foundation, either version 3 of the License, or (at your option) any later version.
+
+# flashcards-from-pdf is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License along with flashcards-from-pdf. If not, see <https://www.gnu.org/licenses/>.
+from PyQt6 import QtCore
+from PyQt6.QtCore import Qt, QModelIndex
+
+from IO_deck_summary import DeckSummary
+
+COLUMNS: list[str] = [
+    "Deck",
+    "Flashcards",
+    "Known",
+    "Still learning",
+    "Not done",
+    "Completed tests",
+    "Last modified",
+]
+
+
+class DecksSummaryModel(QtCore.QAbstractTableModel):
+    def __init__(self, summaries: list[tuple[str, DeckSummary]]):
+        super(DecksSummaryModel, self).__init__()
+        self.__summaries: list[tuple[str, DeckSummary]] = summaries
+
+    def data(self, index: QModelIndex, role: int = Qt.ItemDataRole.DisplayRole):
+        if role != Qt.ItemDataRole.DisplayRole:
+            return None
+        deck: str
+        summary: DeckSummary
+        deck, summary = self.__summaries[index.row()]
+        match index.column():
+            case 0:
+                return deck
+            case 1:
+                return str(summary.get_num_flashcards())
+            case 2:
+                return str(summary.get_num_know())
+            case 3:
+                return str(summary.get_num_still_learning())
+            case 4:
+                return str(summary.get_num_not_done())
+            case 5:
+                return str(summary.get_num_completed_tests())
+            case 6:
+                return summary.get_last_modified().strftime("%Y/%m/%d %H:%M")
+
+    def rowCount(self, index):
+        return len(self.__summaries)
+
+    def columnCount(self, index):
+        return len(COLUMNS)
+
+    def headerData(self, section, orientation, role):
+        if (
+            role == Qt.ItemDataRole.DisplayRole
+            and orientation == Qt.Orientation.Horizontal
+        ):
+            return COLUMNS[section]
+        return None
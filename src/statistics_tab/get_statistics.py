@@ -16,6 +16,8 @@ import sqlite3
 import os
 
 import statistics_tab.heatmap_model as hm
+from statistics_tab.decks_summary_model import DecksSummaryModel
+from IO_deck_summary import DeckSummaryIndex
 from application_constants import PRIVATE_DB_FILENAME, PATH_TO_DECKS_ABS
 
 
@@ -42,6 +44,20 @@ def get_statistics() -> QTableView:
     return heatmap
 
 
+def get_decks_summary() -> QTableView:
+    table: QTableView = QTableView()
+    summaries = DeckSummaryIndex.load_summaries()
+    table.setModel(
+        DecksSummaryModel(
+            sorted(
+                [(deck, summary) for deck, (summary, _) in summaries.items()],
+                key=lambda x: x[0],
+            )
+        )
+    )
+    return table
+
+
 def __get_timestamps_from_db(con: sqlite3.Connection) -> pd.DataFrame:
     df: pd.DataFrame = pd.read_sql_query("SELECT * from timestamp", con)
     df = df.drop(["id"], axis=1)
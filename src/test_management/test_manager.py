@@ -10,6 +10,7 @@ from PyQt6.QtWidgets import QApplication, QPushButton, QMessageBox
 from PyQt6.QtCore import Qt
 
 import datetime
+from collections.abc import Sequence
 from typing import TYPE_CHECKING
 
 # always false at running time. It is used for mypy typing check and avoiding circular imports
@@ -25,6 +26,7 @@ from flashcard.flashcard import Flashcard
 from flashcard.pdf_page import PdfPage
 from flashcard.card import Card
 from IO_flashcards_management import IOFlashcards
+from test_management.test_progress import TestProgress
 
 
 class TestManager:
@@ -48,7 +50,7 @@ class TestManager:
     def __update_test_button(self, button: QPushButton) -> None:
         if (
             self.__pdf_window_model.get_is_deck_ordered()
-            or self.__pdf_window_model.get_num_not_done_flashcards() == 0
+            or self.__get_test_progress().get_num_not_done() == 0
         ):
             button.setDisabled(True)
         else:
@@ -70,19 +72,21 @@ class TestManager:
     def __change_current_flashcard_result(self, result: Flashcard.Result) -> None:
         if (
             self.__pdf_window_model.get_is_deck_ordered()
-            or self.__pdf_window_model.get_num_not_done_flashcards() == 0
+            or self.__get_test_progress().get_num_not_done() == 0
         ):
             return
 
         QApplication.setOverrideCursor(Qt.CursorShape.WaitCursor)
         flashcard: Flashcard = self.__get_current_flashcard()
-        flashcard.set_current_result(result)
-        self.__finalize_flashcard_change()
+        self.__get_test_progress().set_result(flashcard, result)
+        self.__finalize_flashcard_change(flashcard)
         QApplication.restoreOverrideCursor()
 
     def __get_current_flashcard(self) -> Flashcard:
-        cards_to_display: list[Card] = self.get_cards_navigator().get_cards_to_display()
-        num_flashcard_to_card_index: list[
+        cards_to_display: Sequence[Card] = (
+            self.get_cards_navigator().get_cards_to_display()
+        )
+        num_flashcard_to_card_index: Sequence[
             int
         ] = self.get_cards_navigator().get_num_flashcard_to_card_index()
         current_flashcard_card_index: int = num_flashcard_to_card_index[
@@ -94,20 +98,33 @@ class TestManager:
             raise ValueError()
         return flashcard
 
-    def __finalize_flashcard_change(self) -> None:
-        if self.__pdf_window_model.get_num_not_done_flashcards() == 1:
-            # this is the last flashcard
+    def __finalize_flashcard_change(self, flashcard: Flashcard) -> None:
+        if self.__get_test_progress().get_num_not_done() == 0:
+            # this was the last flashcard
             self.__update_tests_info()
             self.__show_dialog_test_completed()
             self.__setup_next_test()
+            # the results of all the flashcards have changed
+            self.__pdf_window_model.save_flashcards_to_file()
+            self.__pdf_window_model.refresh_merged_cards(
+                self.__pdf_window_model.get_is_deck_ordered()
+            )
+            self.get_cards_navigator().set_current_card_index(0)
+            return
 
-        self.__pdf_window_model.save_flashcards_to_file()
-        self.__pdf_window_model.refresh_merged_cards(
-            self.__pdf_window_model.get_is_deck_ordered()
+        self.__pdf_window_model.save_flashcard_result(flashcard)
+        # the answered flashcard leaves the queue and the next one takes its place
+        flashcard_index: int = self.get_cards_navigator().get_current_flashcard_index()
+        self.__pdf_window_model.remove_answered_flashcard(flashcard)
+        num_flashcard_to_card_index: Sequence[
+            int
+        ] = self.get_cards_navigator().get_num_flashcard_to_card_index()
+        if flashcard_index >= len(num_flashcard_to_card_index):
+            flashcard_index = 0
+        self.get_cards_navigator().set_current_card_index(
+            num_flashcard_to_card_index[flashcard_index]
         )
 
-        self.get_cards_navigator().set_current_card_index(0)
-
     def __update_tests_info(self) -> None:
         pdf_tests_info: "PDFTestsInfo" = self.get_pdf_tests_info()
         if pdf_tests_info.get_first_pass_flag() == pdf_tests_info.FirstPass.TRUE:
@@ -123,19 +140,7 @@ class TestManager:
         dialog.show()
 
     def __get_current_test_percentage(self) -> float:
-        num_know: int = 0
-        num_flashcards: int = 0
-        list_flashcard: list[Flashcard]
-        for (
-            _,
-            list_flashcard,
-        ) in self.__pdf_window_model.get_flashcards_from_pdf_page().items():
-            for flashcard in list_flashcard:
-                num_flashcards += 1
-                if flashcard.get_current_result() == Flashcard.Result.KNOW:
-                    num_know += 1
-
-        return num_know / num_flashcards * 100
+        return self.__get_test_progress().get_percentage_known()
 
     def __setup_next_test(self) -> None:
         finished: bool = abs(self.__get_current_test_percentage() - 100.0) <= 4e-4
@@ -153,14 +158,10 @@ class TestManager:
             self.get_pdf_tests_info().set_first_pass_flag(
                 self.get_pdf_tests_info().FirstPass.FALSE
             )
-        list_flashcard: list[Flashcard]
-        for (
-            _,
-            list_flashcard,
-        ) in self.__pdf_window_model.get_flashcards_from_pdf_page().items():
-            for flashcard in list_flashcard:
-                if finished or flashcard.get_current_result() != Flashcard.Result.KNOW:
-                    flashcard.set_current_result(Flashcard.Result.NOT_DONE)
+        self.__get_test_progress().reset(finished)
+
+    def __get_test_progress(self) -> TestProgress:
+        return self.__pdf_window_model.get_test_progress()
 
     def get_cards_navigator(self) -> CardsNavigator:
         return self.__pdf_window_model.get_cards_navigator()
@@ -0,0 +1,110 @@
+# Copyright 2022, 2023 Andrea Cucchietti
+# This file is part of flashcards-from-pdf.
+
+# flashcards-from-pdf is free software: you can redistribute it and/or modify it under the terms of the GNU General Public License as published by the Free Software Foundation, either version 3 of the License, or (at your option) any later version.
+
+# flashcards-from-pdf is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License along with flashcards-from-pdf. If not, see <https://www.gnu.org/licenses/>.
+from collections.abc import Mapping, Iterable
+
+from flashcard.flashcard import Flashcard
+from IO_deck_index import LazyDeckPages
+
+
+class TestProgress:
+    """Number of flashcards of a deck for every result of the ongoing test.
+
+    The counts are kept for every page and in total, so the progress of the test is known in O(1). The results of the flashcards have to be changed with set_result and, when the flashcards of some pages change, update_pages counts them again.
+    """
+
+    def __init__(self, flashcards_per_page: Mapping[int, list[Flashcard]]) -> None:
+        self.__flashcards_per_page: Mapping[int, list[Flashcard]] = flashcards_per_page
+        # number of flashcards for every Flashcard.Result, indexed by its value
+        self.__num_results_of_pages: dict[int, list[int]] = dict()
+        self.__num_results: list[int] = [0] * len(Flashcard.Result)
+        self.update_pages(list(flashcards_per_page.keys()))
+
+    def __count_page(self, page: int) -> list[int]:
+        if page not in self.__flashcards_per_page:
+            return [0] * len(Flashcard.Result)
+        if isinstance(self.__flashcards_per_page, LazyDeckPages):
+            # the page is not read from the file
+            return list(self.__flashcards_per_page.get_num_results_of_page(page))
+        num_results: list[int] = [0] * len(Flashcard.Result)
+        flashcard: Flashcard
+        for flashcard in self.__flashcards_per_page[page]:
+            num_results[flashcard.get_current_result().value] += 1
+        return num_results
+
+    def update_pages(self, pages: Iterable[int]) -> None:
+        """Count again the flashcards of pages, after flashcards were added to or removed from them, or moved between them"""
+        page: int
+        for page in set(pages):
+            old_num_results: list[int] = self.__num_results_of_pages.pop(
+                page, [0] * len(Flashcard.Result)
+            )
+            num_results: list[int] = self.__count_page(page)
+            value: int
+            for value in range(len(Flashcard.Result)):
+                self.__num_results[value] += num_results[value] - old_num_results[value]
+            if sum(num_results) > 0:
+                self.__num_results_of_pages[page] = num_results
+
+    def set_result(self, flashcard: Flashcard, result: Flashcard.Result) -> None:
+        num_results: list[int] = self.__num_results_of_pages[
+            flashcard.get_reference_page()
+        ]
+        num_results[flashcard.get_current_result().value] -= 1
+        self.__num_results[flashcard.get_current_result().value] -= 1
+        flashcard.set_current_result(result)
+        num_results[result.value] += 1
+        self.__num_results[result.value] += 1
+
+    def reset(self, finished: bool) -> None:
+        """Set to not done the results of all the flashcards if the test is finished, otherwise the ones that are not known.
+
+        Only the pages with a result to reset are visited, and the counts are changed in bulk.
+        """
+        results_to_reset: list[Flashcard.Result] = [Flashcard.Result.STILL_LEARNING]
+        if finished:
+            results_to_reset.append(Flashcard.Result.KNOW)
+
+        page: int
+        num_results: list[int]
+        for page, num_results in self.__num_results_of_pages.items():
+            if all(num_results[result.value] == 0 for result in results_to_reset):
+                continue
+            flashcard: Flashcard
+            for flashcard in self.__flashcards_per_page[page]:
+                if flashcard.get_current_result() in results_to_reset:
+                    flashcard.set_current_result(Flashcard.Result.NOT_DONE)
+            TestProgress.__reset_counts(num_results, results_to_reset)
+        TestProgress.__reset_counts(self.__num_results, results_to_reset)
+
+    @staticmethod
+    def __reset_counts(
+        num_results: list[int], results_to_reset: list[Flashcard.Result]
+    ) -> None:
+        result: Flashcard.Result
+        for result in results_to_reset:
+            num_results[Flashcard.Result.NOT_DONE.value] += num_results[result.value]
+            num_results[result.value] = 0
+
+    def get_num_results(self) -> dict[Flashcard.Result, int]:
+        return {result: self.__num_results[result.value] for result in Flashcard.Result}
+
+    def get_num_flashcards(self) -> int:
+        return sum(self.__num_results)
+
+    def get_num_not_done(self) -> int:
+        return self.__num_results[Flashcard.Result.NOT_DONE.value]
+
+    def get_percentage_known(self) -> float:
+        if self.get_num_flashcards() == 0:
+            return 0.0
+        return (
+            self.__num_results[Flashcard.Result.KNOW.value]
+            / self.get_num_flashcards()
+            * 100
+        )
@@ -0,0 +1,69 @@
+# Copyright 2022, 2023 Andrea Cucchietti
+# This file is part of flashcards-from-pdf.
+
+# flashcards-from-pdf is free software: you can redistribute it and/or modify it under the terms of the GNU General Public License as published by the Free Software Foundation, either version 3 of the License, or (at your option) any later version.
+
+# flashcards-from-pdf is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License along with flashcards-from-pdf. If not, see <https://www.gnu.org/licenses/>.
+import unittest
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../src")))
+
+from IO_anki_export import AnkiExportManifest
+from flashcard.flashcard import Flashcard
+
+
+class TestAnkiExportManifest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path_of_db = os.path.join(self.directory.name, "private.db")
+        self.path_of_deck1 = os.path.join(self.directory.name, "deck1.txt")
+        self.path_of_deck2 = os.path.join(self.directory.name, "deck2.txt")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_save(self):
+        flashcard = Flashcard("q", "a", Flashcard.QuestionType.PAGE_SPECIFIC, [], 0)
+        entries = {
+            flashcard.get_id(): (
+                AnkiExportManifest.get_card_hash(flashcard),
+                "page1.jpeg",
+            ),
+            1: ("hash", "page2.jpeg"),
+            2: ("hash", None),
+        }
+        AnkiExportManifest.save(self.path_of_deck1, entries, self.path_of_db)
+        AnkiExportManifest.save(
+            self.path_of_deck2, {1: ("hash", "page2.jpeg")}, self.path_of_db
+        )
+        self.assertEqual(
+            AnkiExportManifest.load(self.path_of_deck1, self.path_of_db), entries
+        )
+
+        flashcard.set_answer("b")
+        self.assertNotEqual(
+            AnkiExportManifest.get_card_hash(flashcard), entries[flashcard.get_id()][0]
+        )
+        AnkiExportManifest.save(
+            self.path_of_deck1, {2: ("hash", None)}, self.path_of_db
+        )
+        self.assertEqual(
+            AnkiExportManifest.load(self.path_of_deck1, self.path_of_db),
+            {2: ("hash", None)},
+        )
+        # the manifest of the other deck is not changed
+        self.assertEqual(
+            AnkiExportManifest.load(self.path_of_deck2, self.path_of_db),
+            {1: ("hash", "page2.jpeg")},
+        )
+        AnkiExportManifest.remove(self.path_of_deck1, self.path_of_db)
+        self.assertEqual(AnkiExportManifest.load(self.path_of_deck1, self.path_of_db), {})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,416 @@
+# Copyright 2022, 2023 Andrea Cucchietti
+# This file is part of flashcards-from-pdf.
+
+# flashcards-from-pdf is free software: you can redistribute it and/or modify it under the terms of the GNU General Public License as published by the Free Software Foundation, either version 3 of the License, or (at your option) any later version.
+
+# flashcards-from-pdf is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License along with flashcards-from-pdf. If not, see <https://www.gnu.org/licenses/>.
+import unittest
+import os
+import re
+import sys
+import json
+import time
+import hashlib
+import shutil
+import sqlite3
+import zipfile
+import tempfile
+import threading
+from array import array
+from unittest import mock
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../src")))
+
+from IO_anki_export import AnkiExport
+from IO_flashcards_management import IOFlashcards
+from IO_pdf_registry import PdfDocumentRegistry
+from flashcard.flashcard import Flashcard
+from test_management.pdf_test_info import PDFTestsInfo
+from application_constants import ANKI_EXPORT_MAX_PAGES_BETWEEN_RUN_PAGES
+from application_constants import ANKI_FLASHCARDS_SEPARATOR
+from application_constants import DECK_FORMAT_VERSION
+from application_constants import PATH_TO_DECKS_ABS
+
+
+class ReversedRenderPool(ThreadPoolExecutor):
+    """Renders every page to the bytes of its number, finishing the runs submitted later first.
+
+    The pages of the .txt exports are saved at their path, the ones of the packages are returned.
+    """
+
+    def __init__(self) -> None:
+        super().__init__(max_workers=16)
+        self.__lock = threading.Lock()
+        self.__num_submitted = 0
+        self.first_pages_submitted = []
+        self.first_pages_rendered = []
+
+    def submit(self, fn, /, *args, **kwargs):
+        _, first_page, pages = args
+        self.first_pages_submitted.append(first_page)
+        delay = max(0.0, 0.2 - 0.02 * self.__num_submitted)
+        self.__num_submitted += 1
+        if fn is AnkiExport.render_pages_to_images:
+            return super().submit(self.__render_to_images, first_page, pages, delay)
+        return super().submit(self.__render, first_page, pages, delay)
+
+    def __render_to_images(self, first_page, paths_of_images, delay):
+        time.sleep(delay)
+        with self.__lock:
+            self.first_pages_rendered.append(first_page)
+        for i, path_of_image in enumerate(paths_of_images):
+            if path_of_image is not None:
+                with open(path_of_image, "wb") as file:
+                    file.write(str(first_page + i).encode("utf-8"))
+        return [path_of_image is not None for path_of_image in paths_of_images]
+
+    def __render(self, first_page, is_page_exported, delay):
+        time.sleep(delay)
+        with self.__lock:
+            self.first_pages_rendered.append(first_page)
+        return [
+            str(first_page + i).encode("utf-8") if is_exported else None
+            for i, is_exported in enumerate(is_page_exported)
+        ]
+
+
+class TestAnkiExportRuns(unittest.TestCase):
+    def test_near_pages(self):
+        # the pages at most ANKI_EXPORT_MAX_PAGES_BETWEEN_RUN_PAGES apart are in the same run
+        far_page = 1 + ANKI_EXPORT_MAX_PAGES_BETWEEN_RUN_PAGES + 2
+        self.assertEqual(AnkiExport.get_runs([far_page, 0, 1], 1), [[0, 1], [far_page]])
+        near_page = 1 + ANKI_EXPORT_MAX_PAGES_BETWEEN_RUN_PAGES
+        self.assertEqual(AnkiExport.get_runs([0, near_page], 1), [[0, near_page]])
+        self.assertEqual(AnkiExport.get_runs([5], 4), [[5]])
+
+    def test_split_for_workers(self):
+        pages = list(range(12))
+        self.assertEqual(AnkiExport.get_runs(pages, 1), [pages])
+        # every process of the pool renders a run
+        self.assertEqual(
+            AnkiExport.get_runs(pages, 3),
+            [[0, 1, 2, 3], [4, 5, 6, 7], [8, 9, 10, 11]],
+        )
+        self.assertEqual(
+            AnkiExport.get_runs(pages, 1, 5),
+            [[0, 1, 2, 3, 4], [5, 6, 7, 8, 9], [10, 11]],
+        )
+
+
+class AnkiExportTestCase(unittest.TestCase):
+    """A deck with a page specific flashcard every two pages and a generic one"""
+
+    NUM_PAGES = 20
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path_of_db = os.path.join(self.directory.name, "private.db")
+        self.path_of_pdf = os.path.join(self.directory.name, "deck.pdf")
+        self.path_of_package = os.path.join(self.directory.name, "Anki", "deck.apkg")
+        shutil.copy(
+            os.path.join(
+                os.path.dirname(__file__), "fixtures/test_structure/03_test/file1.pdf"
+            ),
+            self.path_of_pdf,
+        )
+        # the metadata and the page hashes of the pdf are taken from the database, so it has NUM_PAGES pages
+        stat_result = os.stat(self.path_of_pdf)
+        con = sqlite3.connect(self.path_of_db)
+        with con:
+            PdfDocumentRegistry.create_table(con)
+            con.execute(
+                "INSERT INTO pdf_metadata VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    os.path.relpath(self.path_of_pdf, PATH_TO_DECKS_ABS),
+                    stat_result.st_size,
+                    stat_result.st_mtime_ns,
+                    "hash",
+                    array("d", [595.0, 842.0] * self.NUM_PAGES).tobytes(),
+                    b"".join(
+                        hashlib.sha256(bytes([page])).digest()
+                        for page in range(self.NUM_PAGES)
+                    ),
+                ),
+            )
+        con.close()
+
+        pdf_test_info = PDFTestsInfo()
+        pdf_test_info.set_first_pass_flag(PDFTestsInfo.FirstPass.FALSE)
+        self.flashcards = {
+            page: [
+                Flashcard(
+                    "q" + str(page),
+                    "a" + str(page),
+                    Flashcard.QuestionType.PAGE_SPECIFIC,
+                    [],
+                    page,
+                )
+            ]
+            for page in range(0, self.NUM_PAGES, 2)
+        }
+        self.flashcards[0].append(
+            Flashcard("generic", "a", Flashcard.QuestionType.GENERIC, [], 0)
+        )
+        IOFlashcards.save_flashcards_file(
+            self.path_of_pdf, pdf_test_info, 11, self.flashcards
+        )
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+
+class TestAnkiExportPackage(AnkiExportTestCase):
+    def __export(self, pool, num_exports=1):
+        anki_export = AnkiExport(
+            3,
+            path_of_package=self.path_of_package,
+            pool=pool,
+            path_of_db=self.path_of_db,
+        )
+        for _ in range(num_exports):
+            anki_export.save_deck(self.path_of_pdf)
+        anki_export.close()
+        return anki_export
+
+    def __read_guids(self):
+        with zipfile.ZipFile(self.path_of_package) as zip_file:
+            path_of_collection = zip_file.extract(
+                "collection.anki2", self.directory.name
+            )
+        con = sqlite3.connect(path_of_collection)
+        try:
+            return [
+                guid for (guid,) in con.execute("SELECT guid FROM notes ORDER BY id")
+            ]
+        finally:
+            con.close()
+
+    def __read_notes(self):
+        """Question, answer and image of every note, in the order they were added"""
+        with zipfile.ZipFile(self.path_of_package) as zip_file:
+            media = json.loads(zip_file.read("media"))
+            images = {
+                filename: zip_file.read(number) for number, filename in media.items()
+            }
+            path_of_collection = zip_file.extract(
+                "collection.anki2", self.directory.name
+            )
+        con = sqlite3.connect(path_of_collection)
+        try:
+            notes = []
+            for (fields,) in con.execute("SELECT flds FROM notes ORDER BY id"):
+                question, answer = fields.split("\x1f")
+                match = re.search(r'<img src="([^"]*)">', answer)
+                notes.append(
+                    (
+                        question,
+                        answer[: match.start()] if match else answer,
+                        images[match.group(1)] if match else None,
+                    )
+                )
+            return notes
+        finally:
+            con.close()
+
+    def test_order(self):
+        pool = ReversedRenderPool()
+        self.__export(pool)
+        # the runs are rendered out of order
+        self.assertNotEqual(pool.first_pages_rendered, pool.first_pages_submitted)
+        self.assertEqual(
+            self.__read_notes(),
+            [("q0", "a0<br>", b"0"), ("generic", "a", None)]
+            + [
+                ("q" + str(page), "a" + str(page) + "<br>", str(page).encode())
+                for page in range(2, self.NUM_PAGES, 2)
+            ],
+        )
+
+    def test_shared_images(self):
+        self.flashcards[2].append(
+            Flashcard("q2 bis", "a2 bis", Flashcard.QuestionType.PAGE_SPECIFIC, [], 2)
+        )
+        pdf_test_info = PDFTestsInfo()
+        pdf_test_info.set_first_pass_flag(PDFTestsInfo.FirstPass.FALSE)
+        IOFlashcards.save_flashcards_file(
+            self.path_of_pdf, pdf_test_info, 12, self.flashcards
+        )
+        pool = ReversedRenderPool()
+        # the second export of the deck finds all the images in the package
+        anki_export = self.__export(pool, 2)
+        self.assertEqual(sorted(pool.first_pages_submitted), [0, 4, 8, 12, 16])
+        self.assertEqual(anki_export.get_num_cached_pages(), 11)
+
+        notes = self.__read_notes()
+        # the notes of the second export have the same guids, they are not added again
+        self.assertEqual(len(notes), 12)
+        # the flashcards of the same page share its image
+        self.assertIn(("q2 bis", "a2 bis<br>", b"2"), notes)
+        with zipfile.ZipFile(self.path_of_package) as zip_file:
+            self.assertEqual(
+                len(json.loads(zip_file.read("media"))), len(self.flashcards)
+            )
+
+
+    def test_older_format(self):
+        pdf_test_info = PDFTestsInfo()
+        pdf_test_info.set_first_pass_flag(PDFTestsInfo.FirstPass.FALSE)
+        path_of_deck = os.path.splitext(self.path_of_pdf)[0] + ".txt"
+        # a deck of version 1, whose flashcards have no id
+        with open(path_of_deck, "w", encoding="utf-8") as file:
+            file.write(
+                pdf_test_info.to_string()
+                + "2\n"
+                + "0 ?^? q0 ?^? a0 ?^? p ?^?  ?^? 1 ?^? \n"
+                + "-1 ?^? generic ?^? a ?^? g ?^?  ?^? 1 ?^? \n"
+            )
+        self.__export(ReversedRenderPool())
+
+        # the ids of the notes are saved in the deck
+        self.assertEqual(
+            IOFlashcards.get_deck_version(path_of_deck), DECK_FORMAT_VERSION
+        )
+        self.assertEqual(
+            self.__read_guids(),
+            [
+                str(flashcard.get_id())
+                for flashcard in IOFlashcards.iter_flashcards_from_txt(path_of_deck)
+            ],
+        )
+
+
+class TestAnkiExportTxt(AnkiExportTestCase):
+    def setUp(self):
+        super().setUp()
+        self.media_folder = os.path.join(self.directory.name, "collection.media")
+        os.makedirs(self.media_folder)
+
+    def __export(self, pool, is_full_export=False):
+        anki_export = AnkiExport(
+            3,
+            is_full_export,
+            pool=pool,
+            path_of_db=self.path_of_db,
+            path_of_decks=self.directory.name,
+            media_folder_anki=self.media_folder,
+        )
+        anki_export.save_deck(self.path_of_pdf)
+        anki_export.close()
+        return anki_export
+
+    def __read_exports(self):
+        """Question, answer and image of every row of every .txt file, in the order the files were written"""
+        directory_of_exports = os.path.join(self.directory.name, "Anki")
+        exports = []
+        for filename in sorted(os.listdir(directory_of_exports)):
+            with open(
+                os.path.join(directory_of_exports, filename), encoding="utf-8"
+            ) as file:
+                lines = file.read().splitlines()
+            rows = []
+            for line in lines[3:]:
+                question, answer = line.split(ANKI_FLASHCARDS_SEPARATOR)
+                match = re.search(r'<img src=""([^"]*)"">', answer)
+                image = None
+                if match:
+                    with open(
+                        os.path.join(self.media_folder, match.group(1)), "rb"
+                    ) as image_file:
+                        image = image_file.read()
+                rows.append(
+                    (question, answer[1 : match.start() if match else -1], image)
+                )
+            exports.append(rows)
+        return exports
+
+    def test_order(self):
+        pool = ReversedRenderPool()
+        self.__export(pool)
+        # the runs are rendered out of order
+        self.assertNotEqual(pool.first_pages_rendered, pool.first_pages_submitted)
+        self.assertEqual(
+            self.__read_exports(),
+            [
+                [("q0", "a0<br>", b"0"), ("generic", "a", None)]
+                + [
+                    ("q" + str(page), "a" + str(page) + "<br>", str(page).encode())
+                    for page in range(2, self.NUM_PAGES, 2)
+                ]
+            ],
+        )
+
+    def test_media_folder_cache(self):
+        self.__export(ReversedRenderPool())
+        images = sorted(os.listdir(self.media_folder))
+        self.assertEqual(len(images), len(self.flashcards))
+
+        # the images in the media folder are not rendered again
+        pool = ReversedRenderPool()
+        anki_export = self.__export(pool, True)
+        self.assertEqual(pool.first_pages_submitted, [])
+        self.assertEqual(anki_export.get_num_cached_pages(), len(self.flashcards))
+        self.assertEqual(self.__read_exports()[0], self.__read_exports()[1])
+
+        # a removed image is rendered again, even if its flashcard did not change
+        os.remove(os.path.join(self.media_folder, images[0]))
+        pool = ReversedRenderPool()
+        anki_export = self.__export(pool)
+        self.assertEqual(anki_export.get_num_rendered_pages(), 1)
+        self.assertEqual(anki_export.get_num_exported_flashcards(), 0)
+        self.assertEqual(sorted(os.listdir(self.media_folder)), images)
+
+    def test_manifest(self):
+        self.__export(ReversedRenderPool())
+        self.flashcards[4][0].set_answer("b4")
+        pdf_test_info = PDFTestsInfo()
+        pdf_test_info.set_first_pass_flag(PDFTestsInfo.FirstPass.FALSE)
+        IOFlashcards.save_flashcards_file(
+            self.path_of_pdf, pdf_test_info, 11, self.flashcards
+        )
+        # only the changed flashcard is written, in a new file
+        anki_export = self.__export(ReversedRenderPool())
+        self.assertEqual(anki_export.get_num_exported_flashcards(), 1)
+        exports = self.__read_exports()
+        self.assertEqual(len(exports), 2)
+        self.assertEqual(len(exports[0]), len(self.flashcards) + 1)
+        self.assertEqual(exports[1], [("q4", "b4<br>", b"4")])
+
+        # nothing changed, no file is written
+        anki_export = self.__export(ReversedRenderPool())
+        self.assertEqual(anki_export.get_num_exported_flashcards(), 0)
+        self.assertEqual(len(self.__read_exports()), 2)
+
+    def test_render_pages_to_images(self):
+        def convert_from_path(
+            path_of_pdf, dpi, first_page, last_page, fmt, output_folder, paths_only
+        ):
+            # the pdf ends after the second page
+            paths_of_pages = []
+            for page in range(first_page, min(last_page, first_page + 1) + 1):
+                path_of_page = os.path.join(output_folder, str(page) + "." + fmt)
+                with open(path_of_page, "wb") as file:
+                    file.write(str(page - 1).encode("utf-8"))
+                paths_of_pages.append(path_of_page)
+            return paths_of_pages
+
+        paths_of_images = [
+            os.path.join(self.media_folder, "first.jpeg"),
+            None,
+            os.path.join(self.media_folder, "third.jpeg"),
+        ]
+        with mock.patch("IO_anki_export.convert_from_path", convert_from_path):
+            self.assertEqual(
+                AnkiExport.render_pages_to_images(self.path_of_pdf, 4, paths_of_images),
+                [True, False, False],
+            )
+        # the pages not exported are removed with the temporary folder
+        self.assertEqual(os.listdir(self.media_folder), ["first.jpeg"])
+        with open(paths_of_images[0], "rb") as file:
+            self.assertEqual(file.read(), b"4")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,99 @@
+# Copyright 2022, 2023 Andrea Cucchietti
+# This file is part of flashcards-from-pdf.
+
+# flashcards-from-pdf is free software: you can redistribute it and/or modify it under the terms of the GNU General Public License as published by the Free Software Foundation, either version 3 of the License, or (at your option) any later version.
+
+# flashcards-from-pdf is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License along with flashcards-from-pdf. If not, see <https://www.gnu.org/licenses/>.
+import unittest
+import os
+import sys
+import json
+import sqlite3
+import zipfile
+import tempfile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../src")))
+
+from IO_anki_package import AnkiPackageWriter
+from IO_anki_package import ANKI_FIELDS_SEPARATOR, ANKI_MODEL_ID
+
+
+class TestAnkiPackageWriter(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path_of_package = os.path.join(self.directory.name, "Anki", "decks.apkg")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_close(self):
+        package = AnkiPackageWriter(self.path_of_package)
+        deck_id = package.add_deck("course::lesson1")
+        self.assertEqual(package.add_deck("course::lesson1"), deck_id)
+        package.add_media("page.jpeg", b"image")
+        package.add_media("page.jpeg", b"image")
+        self.assertTrue(package.has_media("page.jpeg"))
+        package.add_note(deck_id, "1", "<b>q1</b>", 'a1<br><img src="page.jpeg">')
+        self.assertTrue(package.add_note(deck_id, "2", "q2", "a2"))
+        # the note already in the package is kept
+        self.assertFalse(package.add_note(deck_id, "2", "q2 bis", "a2 bis"))
+        self.assertEqual(package.get_num_notes(), 2)
+        package.close()
+        self.assertFalse(os.path.exists(self.path_of_package + ".tmp"))
+
+        with zipfile.ZipFile(self.path_of_package) as zip_file:
+            self.assertEqual(json.loads(zip_file.read("media")), {"0": "page.jpeg"})
+            self.assertEqual(zip_file.read("0"), b"image")
+            path_of_collection = zip_file.extract(
+                "collection.anki2", self.directory.name
+            )
+        con = sqlite3.connect(path_of_collection)
+        try:
+            self.assertEqual(
+                con.execute(
+                    "SELECT guid, flds, sfld FROM notes ORDER BY id"
+                ).fetchall(),
+                [
+                    (
+                        "1",
+                        "<b>q1</b>" + ANKI_FIELDS_SEPARATOR + 'a1<br><img src="page.jpeg">',
+                        "q1",
+                    ),
+                    ("2", "q2" + ANKI_FIELDS_SEPARATOR + "a2", "q2"),
+                ],
+            )
+            self.assertEqual(
+                con.execute("SELECT did, due FROM cards ORDER BY id").fetchall(),
+                [(deck_id, 0), (deck_id, 1)],
+            )
+            decks = json.loads(con.execute("SELECT decks FROM col").fetchone()[0])
+            self.assertEqual(decks[str(deck_id)]["name"], "course::lesson1")
+            models = json.loads(con.execute("SELECT models FROM col").fetchone()[0])
+            self.assertEqual(list(models.keys()), [str(ANKI_MODEL_ID)])
+            self.assertEqual(
+                con.execute("SELECT DISTINCT mid FROM notes").fetchall(),
+                [(ANKI_MODEL_ID,)],
+            )
+        finally:
+            con.close()
+
+    def test_deck_id(self):
+        # the same in the packages exported later
+        package = AnkiPackageWriter(self.path_of_package)
+        deck_id = package.add_deck("course::lesson1")
+        package.discard()
+        self.assertEqual(deck_id, AnkiPackageWriter.get_deck_id("course::lesson1"))
+        self.assertNotEqual(deck_id, AnkiPackageWriter.get_deck_id("course::lesson2"))
+        self.assertNotEqual(deck_id, 1)
+
+    def test_discard(self):
+        package = AnkiPackageWriter(self.path_of_package)
+        package.add_media("page.jpeg", b"image")
+        package.discard()
+        self.assertEqual(os.listdir(os.path.dirname(self.path_of_package)), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+# Copyright 2022, 2023 Andrea Cucchietti
+# This file is part of flashcards-from-pdf.
+
+# flashcards-from-pdf is free software: you can redistribute it and/or modify it under the terms of the GNU General Public License as published by the Free Software Foundation, either version 3 of the License, or (at your option) any later version.
+
+# flashcards-from-pdf is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License along with flashcards-from-pdf. If not, see <https://www.gnu.org/licenses/>.
+import unittest
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../src")))
+
+from IO_flashcards_management import IOFlashcards
+from IO_deck_cache import DeckCache
+from flashcard.flashcard import Flashcard
+from test_management.pdf_test_info import PDFTestsInfo
+
+
+class TestDeckCache(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path_of_file = os.path.join(self.directory.name, "deck.txt")
+        pdf_test_info = PDFTestsInfo()
+        pdf_test_info.set_first_pass_flag(PDFTestsInfo.FirstPass.FALSE)
+        self.flashcards = {
+            -2: [Flashcard("generic", "", past_results=[], reference_page=-2)],
+            1: [
+                Flashcard(
+                    "q1",
+                    "a1\nà",
+                    Flashcard.QuestionType.PAGE_SPECIFIC,
+                    [Flashcard.Result.KNOW],
+                    1,
+                    Flashcard.Result.STILL_LEARNING,
+                )
+            ],
+        }
+        IOFlashcards.save_flashcards_file(
+            self.path_of_file, pdf_test_info, 2, self.flashcards
+        )
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_cache_hit(self):
+        cached_deck = DeckCache.load(self.path_of_file)
+        self.assertIsNotNone(cached_deck)
+        pdf_test_info, flashcards = cached_deck
+        self.assertEqual(
+            pdf_test_info.get_first_pass_flag(), PDFTestsInfo.FirstPass.FALSE
+        )
+        self.assertEqual(sorted(flashcards.keys()), [-2, 1])
+        for page, list_flashcards in self.flashcards.items():
+            self.assertTrue(list_flashcards[0].compare_to(flashcards[page][0]))
+
+    def test_stale_cache(self):
+        with open(self.path_of_file, "a", encoding="utf-8") as file:
+            file.write("3 ?^? new ?^? !-! ?^? g ?^?  ?^? 1 ?^? 7 ?^? \n")
+        self.assertIsNone(DeckCache.load(self.path_of_file))
+
+        _, flashcards = IOFlashcards.load_deck(self.path_of_file)
+        self.assertEqual(flashcards[2][0].get_question(), "new")
+
+    def test_corrupted_cache(self):
+        with open(DeckCache.get_cache_path(self.path_of_file), "r+b") as file:
+            file.truncate(DeckCache.HEADER.size + 3)
+        self.assertIsNone(DeckCache.load(self.path_of_file))
+
+        _, flashcards = IOFlashcards.load_deck(self.path_of_file)
+        self.assertEqual(flashcards[1][0].get_question(), "q1")
+
+
+if __name__ == "__main__":
+    unittest.main()
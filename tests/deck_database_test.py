@@ -0,0 +1,82 @@
+# Copyright 2022, 2023 Andrea Cucchietti
+# This file is part of flashcards-from-pdf.
+
+# flashcards-from-pdf is free software: you can redistribute it and/or modify it under the terms of the GNU General Public License as published by the Free Software Foundation, either version 3 of the License, or (at your option) any later version.
+
+# flashcards-from-pdf is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License along with flashcards-from-pdf. If not, see <https://www.gnu.org/licenses/>.
+import unittest
+import os
+import sys
+import tempfile
+from datetime import datetime
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../src")))
+
+from IO_flashcards_management import IOFlashcards
+from IO_deck_database import DeckDatabase
+from flashcard.flashcard import Flashcard
+from test_management.pdf_test_info import PDFTestsInfo
+
+
+class TestDeckDatabase(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path_of_file = os.path.join(self.directory.name, "deck.txt")
+        self.path_of_db = os.path.join(self.directory.name, "private.db")
+        pdf_test_info = PDFTestsInfo()
+        pdf_test_info.set_first_pass_flag(PDFTestsInfo.FirstPass.FALSE)
+        pdf_test_info.add_completed_test(datetime(2023, 5, 1, 10, 0, 0), 75.0)
+        flashcards = {
+            -2: [Flashcard("generic", "", past_results=[], reference_page=-2)],
+            1: [
+                Flashcard(
+                    "q1",
+                    "a1\nb1",
+                    Flashcard.QuestionType.PAGE_SPECIFIC,
+                    [Flashcard.Result.KNOW, Flashcard.Result.STILL_LEARNING],
+                    1,
+                )
+            ],
+        }
+        IOFlashcards.save_flashcards_file(
+            self.path_of_file, pdf_test_info, 2, flashcards
+        )
+        self.deck_database = DeckDatabase(self.path_of_file, self.path_of_db)
+        self.deck_database.import_deck(self.path_of_file)
+
+    def tearDown(self):
+        self.deck_database.close()
+        self.directory.cleanup()
+
+    def test_import_and_export(self):
+        pdf_test_info, flashcards = self.deck_database.load_deck()
+        expected_info, expected_flashcards = IOFlashcards.load_deck(self.path_of_file)
+        self.assertEqual(pdf_test_info.to_string(), expected_info.to_string())
+        for page, list_flashcards in expected_flashcards.items():
+            self.assertTrue(list_flashcards[0].compare_to(flashcards[page][0]))
+
+        flashcards[1][0].set_question("changed")
+        self.deck_database.save_pages(pdf_test_info, {1: flashcards[1]})
+        self.deck_database.export_deck(self.path_of_file)
+        _, flashcards = IOFlashcards.load_deck(self.path_of_file)
+        self.assertEqual(flashcards[1][0].get_question(), "changed")
+
+    def test_flashcard_result(self):
+        pdf_test_info, flashcards = self.deck_database.load_deck()
+        flashcards[1][0].set_current_result(Flashcard.Result.KNOW)
+        self.deck_database.save_flashcard_result(pdf_test_info, flashcards[1][0])
+
+        other_database = DeckDatabase(self.path_of_file, self.path_of_db)
+        self.assertTrue(other_database.is_deck_stored())
+        _, flashcards = other_database.load_deck()
+        other_database.close()
+        self.assertEqual(flashcards[1][0].get_current_result(), Flashcard.Result.KNOW)
+        self.assertEqual(
+            flashcards[-2][0].get_current_result(), Flashcard.Result.NOT_DONE
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
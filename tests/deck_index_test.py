@@ -0,0 +1,78 @@
+# Copyright 2022, 2023 Andrea Cucchietti
+# This file is part of flashcards-from-pdf.
+
+# flashcards-from-pdf is free software: you can redistribute it and/or modify it under the terms of the GNU General Public License as published by the Free Software Foundation, either version 3 of the License, or (at your option) any later version.
+
+# flashcards-from-pdf is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License along with flashcards-from-pdf. If not, see <https://www.gnu.org/licenses/>.
+import unittest
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../src")))
+
+from IO_flashcards_management import IOFlashcards
+from IO_deck_index import DeckIndex, LazyDeckPages
+from flashcard.flashcard import Flashcard
+from test_management.pdf_test_info import PDFTestsInfo
+
+
+class TestDeckIndex(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path_of_file = os.path.join(self.directory.name, "deck.txt")
+        self.pdf_test_info = PDFTestsInfo()
+        self.pdf_test_info.set_first_pass_flag(PDFTestsInfo.FirstPass.FALSE)
+        self.flashcards = {
+            -2: [Flashcard("generic", "", past_results=[], reference_page=-2)],
+            3: [
+                Flashcard(
+                    "q3",
+                    "a3\nmultiline",
+                    Flashcard.QuestionType.PAGE_SPECIFIC,
+                    [Flashcard.Result.KNOW],
+                    3,
+                    Flashcard.Result.KNOW,
+                ),
+                Flashcard("q3 bis", "a3 bis", reference_page=3),
+            ],
+        }
+        IOFlashcards.save_flashcards_file(
+            self.path_of_file, self.pdf_test_info, 3, self.flashcards
+        )
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_lazy_pages(self):
+        flashcards = LazyDeckPages(
+            self.path_of_file, DeckIndex.load_or_build(self.path_of_file)
+        )
+        self.assertEqual(sorted(flashcards.keys()), [-2, 3])
+        self.assertEqual(flashcards.get_num_loaded_pages(), 0)
+        num_results = flashcards.get_num_results()
+        self.assertEqual(num_results[Flashcard.Result.KNOW], 1)
+        self.assertEqual(num_results[Flashcard.Result.NOT_DONE], 2)
+
+        self.assertEqual(len(flashcards[3]), 2)
+        self.assertTrue(flashcards[3][0].compare_to(self.flashcards[3][0]))
+        self.assertEqual(flashcards.get_num_loaded_pages(), 1)
+        self.assertEqual(flashcards[-2][0].get_question(), "generic")
+
+    def test_stale_index(self):
+        DeckIndex.build(self.path_of_file)
+        self.flashcards[5] = [Flashcard("q5", "a5", reference_page=5)]
+        IOFlashcards.save_flashcards_file(
+            self.path_of_file, self.pdf_test_info, 4, self.flashcards
+        )
+        os.utime(self.path_of_file, ns=(1, 1))
+        self.assertIsNone(DeckIndex.load(self.path_of_file))
+        deck_index = DeckIndex.load_or_build(self.path_of_file)
+        self.assertEqual(sorted(deck_index.get_entries().keys()), [-2, 3, 5])
+        self.assertIsNotNone(DeckIndex.load(self.path_of_file))
+
+
+if __name__ == "__main__":
+    unittest.main()
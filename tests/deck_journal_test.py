@@ -0,0 +1,103 @@
+# Copyright 2022, 2023 Andrea Cucchietti
+# This file is part of flashcards-from-pdf.
+
+# flashcards-from-pdf is free software: you can redistribute it and/or modify it under the terms of the GNU General Public License as published by the Free Software Foundation, either version 3 of the License, or (at your option) any later version.
+
+# flashcards-from-pdf is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License along with flashcards-from-pdf. If not, see <https://www.gnu.org/licenses/>.
+import unittest
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../src")))
+
+from IO_flashcards_management import IOFlashcards
+from IO_deck_journal import DeckJournal
+from IO_deck_format import DeckFormat
+from IO_deck_cache import DeckCache
+from flashcard.flashcard import Flashcard
+from test_management.pdf_test_info import PDFTestsInfo
+
+
+class TestDeckJournal(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path_of_file = os.path.join(self.directory.name, "deck.txt")
+        self.pdf_test_info = PDFTestsInfo()
+        self.pdf_test_info.set_first_pass_flag(PDFTestsInfo.FirstPass.TRUE)
+        self.flashcards = {
+            0: [Flashcard("q0", "a0", reference_page=0, past_results=[])],
+            3: [Flashcard("q3", "a3\nb3", reference_page=3, past_results=[])],
+        }
+        IOFlashcards.save_flashcards_file(
+            self.path_of_file, self.pdf_test_info, 2, self.flashcards
+        )
+        self.journal = DeckJournal(self.path_of_file)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def append(self, flashcards_of_pages):
+        self.journal.append(
+            DeckJournal.get_entry(
+                self.pdf_test_info.to_string(),
+                [
+                    DeckJournal.get_page_snapshot(page, list_flashcards)
+                    for page, list_flashcards in flashcards_of_pages.items()
+                ],
+            )
+        )
+
+    def test_replay(self):
+        self.flashcards[3][0].set_current_result(Flashcard.Result.KNOW)
+        self.flashcards[5] = [Flashcard("q5", "", reference_page=5, past_results=[])]
+        self.flashcards.pop(0)
+        self.append({3: self.flashcards[3]})
+        self.append({0: [], 5: self.flashcards[5]})
+
+        _, flashcards = IOFlashcards.load_deck(self.path_of_file)
+        self.assertEqual(sorted(flashcards.keys()), [3, 5])
+        self.assertEqual(flashcards[3][0].get_current_result(), Flashcard.Result.KNOW)
+        self.assertEqual(flashcards[3][0].get_answer(), "a3\nb3")
+
+    def test_incomplete_entry(self):
+        self.flashcards[0][0].set_question("changed")
+        self.append({0: self.flashcards[0]})
+        with open(DeckJournal.get_journal_path(self.path_of_file), "a") as file:
+            file.write("B\nP 3 1\n4 ?^? trunc")
+
+        _, flashcards = IOFlashcards.load_deck(self.path_of_file)
+        self.assertEqual(flashcards[0][0].get_question(), "changed")
+        self.assertEqual(flashcards[3][0].get_question(), "q3")
+
+    def test_compaction(self):
+        self.flashcards[0][0].set_question("compacted")
+        self.append({0: self.flashcards[0]})
+        self.journal.compact(
+            DeckFormat.get_deck_content(self.pdf_test_info, 2, self.flashcards),
+            DeckCache.encode(self.pdf_test_info, self.flashcards),
+        )
+
+        self.assertFalse(
+            os.path.exists(DeckJournal.get_journal_path(self.path_of_file))
+        )
+        flashcards = IOFlashcards.get_flashcards_from_txt(self.path_of_file)
+        self.assertEqual(flashcards[0][0].get_question(), "compacted")
+
+    def test_stale_journal(self):
+        self.append({0: []})
+        # the whole deck is saved, but the journal is not removed
+        IOFlashcards.save_flashcards_file(
+            self.path_of_file, self.pdf_test_info, 1, {3: self.flashcards[3]}
+        )
+        with open(self.path_of_file, "a", encoding="utf-8") as file:
+            file.write("1 ?^? new ?^? !-! ?^? g ?^?  ?^? 1 ?^? 7 ?^? \n")
+
+        _, flashcards = IOFlashcards.load_deck(self.path_of_file)
+        self.assertEqual(sorted(flashcards.keys()), [0, 3])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,66 @@
+# Copyright 2022, 2023 Andrea Cucchietti
+# This file is part of flashcards-from-pdf.
+
+# flashcards-from-pdf is free software: you can redistribute it and/or modify it under the terms of the GNU General Public License as published by the Free Software Foundation, either version 3 of the License, or (at your option) any later version.
+
+# flashcards-from-pdf is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License along with flashcards-from-pdf. If not, see <https://www.gnu.org/licenses/>.
+import unittest
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../src")))
+
+from IO_flashcards_management import IOFlashcards
+from pdf_visualization.deck_loader import DeckLoader
+from flashcard.flashcard import Flashcard
+from test_management.pdf_test_info import PDFTestsInfo
+
+
+class TestDeckLoader(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path_of_file = os.path.join(self.directory.name, "deck.txt")
+        self.path_of_db = os.path.join(self.directory.name, "private.db")
+        pdf_test_info = PDFTestsInfo()
+        pdf_test_info.set_first_pass_flag(PDFTestsInfo.FirstPass.FALSE)
+        flashcards = {
+            0: [Flashcard("q0", "a0", Flashcard.QuestionType.PAGE_SPECIFIC, [], 0)],
+            5: [Flashcard("q5", "a5", Flashcard.QuestionType.PAGE_SPECIFIC, [], 5)],
+        }
+        IOFlashcards.save_flashcards_file(
+            self.path_of_file, pdf_test_info, 2, flashcards
+        )
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_load(self):
+        deck_loader = DeckLoader(self.path_of_file, 3, self.path_of_db)
+        # run on the current thread
+        deck_loader.run()
+        self.assertTrue(deck_loader.get_is_loaded())
+        self.assertIsNone(deck_loader.get_deck_database())
+        deck_state = deck_loader.get_deck_state()
+
+        # the flashcard after the last pdf page is moved to the last page
+        self.assertEqual(
+            sorted(deck_state.get_flashcards_from_pdf_page().keys()), [0, 2]
+        )
+        self.assertTrue(deck_state.get_is_full_save_needed())
+        cards, _, num_flashcard_to_card_index = deck_state.get_merged_cards()
+        self.assertEqual(len(cards), 5)
+        self.assertEqual(list(num_flashcard_to_card_index), [0, 3])
+
+    def test_missing_deck(self):
+        os.remove(self.path_of_file)
+        deck_loader = DeckLoader(self.path_of_file, 3, self.path_of_db)
+        deck_loader.run()
+        self.assertTrue(deck_loader.get_is_loaded())
+        self.assertEqual(len(deck_loader.get_deck_state().get_merged_cards()[0]), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,111 @@
+# Copyright 2022, 2023 Andrea Cucchietti
+# This file is part of flashcards-from-pdf.
+
+# flashcards-from-pdf is free software: you can redistribute it and/or modify it under the terms of the GNU General Public License as published by the Free Software Foundation, either version 3 of the License, or (at your option) any later version.
+
+# flashcards-from-pdf is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License along with flashcards-from-pdf. If not, see <https://www.gnu.org/licenses/>.
+import unittest
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../src")))
+
+from IO_deck_cache import DeckCache
+from IO_deck_search_index import DeckSearchIndex
+from IO_flashcards_management import IOFlashcards
+from flashcard.flashcard import Flashcard
+from test_management.pdf_test_info import PDFTestsInfo
+
+
+class TestDeckSearchIndex(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path_of_db = os.path.join(self.directory.name, "private.db")
+        self.path_of_txt = os.path.join(self.directory.name, "deck.txt")
+        self.flashcards = {
+            0: [
+                Flashcard(
+                    "What is a café?", "a bar", Flashcard.QuestionType.PAGE_SPECIFIC, [], 0
+                )
+            ],
+            1: [
+                Flashcard(
+                    "Define entropy", "disorder", Flashcard.QuestionType.PAGE_SPECIFIC, [], 1
+                )
+            ],
+        }
+        pdf_test_info = PDFTestsInfo()
+        pdf_test_info.set_first_pass_flag(PDFTestsInfo.FirstPass.FALSE)
+        IOFlashcards.save_flashcards_file(
+            self.path_of_txt, pdf_test_info, 2, self.flashcards
+        )
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def __search(self, text):
+        return [
+            (hit.get_page(), hit.get_question())
+            for hit in DeckSearchIndex.search(text, path_of_db=self.path_of_db)
+        ]
+
+    def test_update_decks(self):
+        self.assertEqual(
+            DeckSearchIndex.update_decks([self.path_of_txt], self.path_of_db), 1
+        )
+        # the words are matched as prefixes and without diacritics
+        self.assertEqual(self.__search("cafe"), [(0, "What is a café?")])
+        self.assertEqual(self.__search("disord"), [(1, "Define entropy")])
+        self.assertEqual(self.__search("entropy bar"), [])
+        # not changed since it was indexed
+        self.assertEqual(
+            DeckSearchIndex.update_decks([self.path_of_txt], self.path_of_db), 0
+        )
+        DeckSearchIndex.update_decks([], self.path_of_db)
+        self.assertEqual(self.__search("entropy"), [])
+
+    def test_update_decks_interrupted(self):
+        self.assertEqual(
+            DeckSearchIndex.update_decks(
+                [self.path_of_txt], self.path_of_db, lambda: True
+            ),
+            0,
+        )
+        self.assertEqual(self.__search("entropy"), [])
+        # the deck not indexed is indexed by the next update
+        self.assertEqual(
+            DeckSearchIndex.update_decks([self.path_of_txt], self.path_of_db), 1
+        )
+
+    def test_update_decks_read_only(self):
+        os.remove(DeckCache.get_cache_path(self.path_of_txt))
+        names_of_files = sorted(os.listdir(self.directory.name))
+        DeckSearchIndex.update_decks([self.path_of_txt], self.path_of_db)
+        # the sidecar files of the deck are not written by the indexer
+        self.assertEqual(
+            sorted(os.listdir(self.directory.name)),
+            sorted(names_of_files + [os.path.basename(self.path_of_db)]),
+        )
+
+    def test_save_pages(self):
+        DeckSearchIndex.update_decks([self.path_of_txt], self.path_of_db)
+        self.flashcards[1] = [
+            Flashcard("Define enthalpy", "heat", Flashcard.QuestionType.PAGE_SPECIFIC, [], 1)
+        ]
+        DeckSearchIndex.save_pages(
+            self.path_of_txt,
+            DeckSearchIndex.get_rows({1: self.flashcards[1]}),
+            False,
+            self.path_of_db,
+        )
+        self.assertEqual(self.__search("define"), [(1, "Define enthalpy")])
+        self.assertEqual(self.__search("café"), [(0, "What is a café?")])
+        # the operators of the query syntax are searched as words
+        self.assertEqual(self.__search('"define" OR'), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
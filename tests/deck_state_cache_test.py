@@ -0,0 +1,85 @@
+# Copyright 2022, 2023 Andrea Cucchietti
+# This file is part of flashcards-from-pdf.
+
+# flashcards-from-pdf is free software: you can redistribute it and/or modify it under the terms of the GNU General Public License as published by the Free Software Foundation, either version 3 of the License, or (at your option) any later version.
+
+# flashcards-from-pdf is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License along with flashcards-from-pdf. If not, see <https://www.gnu.org/licenses/>.
+import unittest
+import os
+import sys
+import shutil
+import tempfile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../src")))
+
+from IO_flashcards_management import IOFlashcards
+from IO_pdf_registry import PdfDocumentRegistry
+from pdf_visualization.deck_loader import DeckLoader
+from pdf_visualization.deck_state_cache import DeckStateCache
+from flashcard.flashcard import Flashcard
+from test_management.pdf_test_info import PDFTestsInfo
+from application_constants import DECK_STATE_CACHE_MAX_DECKS
+
+
+class TestDeckStateCache(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path_of_pdf = os.path.join(self.directory.name, "file.pdf")
+        shutil.copy(
+            os.path.join(
+                os.path.dirname(__file__), "fixtures/test_structure/03_test/file1.pdf"
+            ),
+            self.path_of_pdf,
+        )
+
+    def tearDown(self):
+        DeckStateCache.clear()
+        self.directory.cleanup()
+
+    def __load_deck(self, name):
+        path_of_txt = os.path.join(self.directory.name, name + ".txt")
+        pdf_test_info = PDFTestsInfo()
+        pdf_test_info.set_first_pass_flag(PDFTestsInfo.FirstPass.FALSE)
+        flashcards = {
+            0: [Flashcard("q0", "a0", Flashcard.QuestionType.PAGE_SPECIFIC, [], 0)]
+        }
+        IOFlashcards.save_flashcards_file(path_of_txt, pdf_test_info, 1, flashcards)
+        deck_loader = DeckLoader(
+            path_of_txt, 1, os.path.join(self.directory.name, "private.db")
+        )
+        deck_loader.run()
+        return path_of_txt, deck_loader.get_deck_state()
+
+    def test_take(self):
+        path_of_txt, deck_state = self.__load_deck("deck")
+        DeckStateCache.put(path_of_txt, self.path_of_pdf, deck_state)
+        self.assertEqual(PdfDocumentRegistry.get_num_open_documents(), 1)
+        self.assertIs(DeckStateCache.take(path_of_txt), deck_state)
+        # the deck is used by the opened window
+        self.assertIsNone(DeckStateCache.take(path_of_txt))
+        self.assertEqual(PdfDocumentRegistry.get_num_open_documents(), 0)
+
+    def test_changed_file(self):
+        path_of_txt, deck_state = self.__load_deck("deck")
+        DeckStateCache.put(path_of_txt, self.path_of_pdf, deck_state)
+        with open(path_of_txt, "a", encoding="utf-8") as file:
+            file.write("\n")
+        self.assertIsNone(DeckStateCache.take(path_of_txt))
+        self.assertEqual(DeckStateCache.get_num_decks(), 0)
+
+    def test_eviction(self):
+        paths_of_txt = []
+        for i in range(DECK_STATE_CACHE_MAX_DECKS + 1):
+            path_of_txt, deck_state = self.__load_deck("deck" + str(i))
+            DeckStateCache.put(path_of_txt, self.path_of_pdf, deck_state)
+            paths_of_txt.append(path_of_txt)
+        self.assertEqual(DeckStateCache.get_num_decks(), DECK_STATE_CACHE_MAX_DECKS)
+        # the least recently closed deck is evicted
+        self.assertIsNone(DeckStateCache.take(paths_of_txt[0]))
+        self.assertIsNotNone(DeckStateCache.take(paths_of_txt[-1]))
+
+
+if __name__ == "__main__":
+    unittest.main()
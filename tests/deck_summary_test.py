@@ -0,0 +1,87 @@
+# Copyright 2022, 2023 Andrea Cucchietti
+# This file is part of flashcards-from-pdf.
+
+# flashcards-from-pdf is free software: you can redistribute it and/or modify it under the terms of the GNU General Public License as published by the Free Software Foundation, either version 3 of the License, or (at your option) any later version.
+
+# flashcards-from-pdf is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License along with flashcards-from-pdf. If not, see <https://www.gnu.org/licenses/>.
+import unittest
+import os
+import sys
+import tempfile
+from datetime import datetime
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../src")))
+
+from IO_flashcards_management import IOFlashcards
+from IO_deck_summary import DeckSummary, DeckSummaryIndex
+from flashcard.flashcard import Flashcard
+from test_management.pdf_test_info import PDFTestsInfo
+
+
+class TestDeckSummaryIndex(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path_of_file = os.path.join(self.directory.name, "deck.txt")
+        self.path_of_db = os.path.join(self.directory.name, "private.db")
+        self.pdf_test_info = PDFTestsInfo()
+        self.pdf_test_info.set_first_pass_flag(PDFTestsInfo.FirstPass.TRUE)
+        self.flashcards = {
+            0: [
+                Flashcard("q0", "", reference_page=0, past_results=[]),
+                Flashcard(
+                    "q1",
+                    "",
+                    reference_page=0,
+                    past_results=[],
+                    current_result=Flashcard.Result.KNOW,
+                ),
+            ]
+        }
+        IOFlashcards.save_flashcards_file(
+            self.path_of_file, self.pdf_test_info, 2, self.flashcards
+        )
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_saved_summary(self):
+        summary = DeckSummary.from_deck(
+            self.pdf_test_info, self.flashcards, datetime.now()
+        )
+        DeckSummaryIndex.save_summary(self.path_of_file, summary, self.path_of_db)
+
+        summaries = DeckSummaryIndex.load_summaries(self.path_of_db)
+        self.assertEqual(len(summaries), 1)
+        summary = DeckSummaryIndex.get_summary(
+            self.path_of_file, summaries, self.path_of_db
+        )
+        self.assertEqual(summary.get_num_flashcards(), 2)
+        self.assertEqual(summary.get_num_know(), 1)
+        self.assertEqual(summary.get_num_not_done(), 1)
+
+    def test_stale_summary(self):
+        summaries = DeckSummaryIndex.load_summaries(self.path_of_db)
+        self.assertEqual(
+            DeckSummaryIndex.get_summary(
+                self.path_of_file, summaries, self.path_of_db
+            ).get_num_flashcards(),
+            2,
+        )
+
+        self.flashcards[0].pop()
+        IOFlashcards.save_flashcards_file(
+            self.path_of_file, self.pdf_test_info, 1, self.flashcards
+        )
+        os.utime(self.path_of_file, ns=(0, 10**18))
+        summaries = DeckSummaryIndex.load_summaries(self.path_of_db)
+        summary = DeckSummaryIndex.get_summary(
+            self.path_of_file, summaries, self.path_of_db
+        )
+        self.assertEqual(summary.get_num_flashcards(), 1)
+        self.assertEqual(summary.get_num_know(), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
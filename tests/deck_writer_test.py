@@ -0,0 +1,81 @@
+# Copyright 2022, 2023 Andrea Cucchietti
+# This file is part of flashcards-from-pdf.
+
+# flashcards-from-pdf is free software: you can redistribute it and/or modify it under the terms of the GNU General Public License as published by the Free Software Foundation, either version 3 of the License, or (at your option) any later version.
+
+# flashcards-from-pdf is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License along with flashcards-from-pdf. If not, see <https://www.gnu.org/licenses/>.
+import unittest
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../src")))
+
+from IO_flashcards_management import IOFlashcards
+from IO_deck_journal import DeckJournal
+from IO_deck_writer import DeckWriter
+from flashcard.flashcard import Flashcard
+from test_management.pdf_test_info import PDFTestsInfo
+
+
+class TestDeckWriter(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path_of_file = os.path.join(self.directory.name, "deck.txt")
+        self.pdf_test_info = PDFTestsInfo()
+        self.pdf_test_info.set_first_pass_flag(PDFTestsInfo.FirstPass.TRUE)
+        self.flashcards = {1: [Flashcard("q1", "", reference_page=1, past_results=[])]}
+        IOFlashcards.save_flashcards_file(
+            self.path_of_file, self.pdf_test_info, 1, self.flashcards
+        )
+        self.writer = DeckWriter(self.path_of_file)
+
+    def tearDown(self):
+        self.writer.close()
+        self.directory.cleanup()
+
+    def test_coalesced_pages(self):
+        for i in range(10):
+            self.flashcards[1][0].set_question("q" + str(i))
+            self.writer.save_pages(self.pdf_test_info, {1: self.flashcards[1]})
+        self.assertGreater(self.writer.get_num_pending_writes(), 0)
+
+        self.writer.flush()
+        self.assertEqual(self.writer.get_num_pending_writes(), 0)
+        with open(DeckJournal.get_journal_path(self.path_of_file)) as file:
+            self.assertEqual(file.read().count("\nB\n"), 1)
+        _, flashcards = IOFlashcards.load_deck(self.path_of_file)
+        self.assertEqual(flashcards[1][0].get_question(), "q9")
+
+    def test_save_deck_after_pages(self):
+        self.writer.save_pages(self.pdf_test_info, {1: []})
+        self.flashcards[2] = [Flashcard("q2", "", reference_page=2, past_results=[])]
+        self.writer.save_deck(self.pdf_test_info, 2, self.flashcards)
+        self.writer.close()
+
+        self.assertFalse(
+            os.path.exists(DeckJournal.get_journal_path(self.path_of_file))
+        )
+        _, flashcards = IOFlashcards.load_deck(self.path_of_file)
+        self.assertEqual(sorted(flashcards.keys()), [1, 2])
+
+
+    def test_save_deck_snapshot(self):
+        self.writer.save_deck(self.pdf_test_info, 1, self.flashcards)
+        # the changes after the save are not in the written deck
+        self.flashcards[1][0].set_question("changed")
+        self.pdf_test_info.set_first_pass_flag(PDFTestsInfo.FirstPass.FALSE)
+        self.assertFalse(self.writer.needs_compaction())
+        self.writer.flush()
+
+        pdf_test_info, flashcards = IOFlashcards.load_deck(self.path_of_file)
+        self.assertEqual(flashcards[1][0].get_question(), "q1")
+        self.assertEqual(
+            pdf_test_info.get_first_pass_flag(), PDFTestsInfo.FirstPass.TRUE
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,38 @@
+# Copyright 2022, 2023 Andrea Cucchietti
+# This file is part of flashcards-from-pdf.
+
+# flashcards-from-pdf is free software: you can redistribute it and/or modify it under the terms of the GNU General Public License as published by the Free Software Foundation, either version 3 of the License, or (at your option) any later version.
+
+# flashcards-from-pdf is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License along with flashcards-from-pdf. If not, see <https://www.gnu.org/licenses/>.
+import unittest
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../src")))
+
+from pdf_visualization.flashcard_positions import FlashcardPositions
+from flashcard.flashcard import Flashcard
+
+
+class TestFlashcardPositions(unittest.TestCase):
+    def test_positions(self):
+        first = Flashcard("first", reference_page=1)
+        # same content, different flashcard
+        second = Flashcard("first", reference_page=1)
+        third = Flashcard("third", reference_page=1)
+        flashcards = {1: [first, second, third]}
+        positions = FlashcardPositions(flashcards)
+
+        self.assertNotEqual(first.get_id(), second.get_id())
+        self.assertEqual(positions.get_page_and_position(second), (1, 1))
+        positions.remove(first)
+        self.assertEqual(flashcards[1], [second, third])
+        self.assertEqual(positions.get_page_and_position(third), (1, 1))
+        with self.assertRaises(ValueError):
+            positions.get_page_and_position(first)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,93 @@
+# Copyright 2022, 2023 Andrea Cucchietti
+# This file is part of flashcards-from-pdf.
+
+# flashcards-from-pdf is free software: you can redistribute it and/or modify it under the terms of the GNU General Public License as published by the Free Software Foundation, either version 3 of the License, or (at your option) any later version.
+
+# flashcards-from-pdf is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License along with flashcards-from-pdf. If not, see <https://www.gnu.org/licenses/>.
+import unittest
+import os
+import sys
+import random
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../src")))
+
+from pdf_visualization.search.flashcard_search_index import FlashcardSearchIndex
+from flashcard.flashcard import Flashcard
+
+
+class TestFlashcardSearchIndex(unittest.TestCase):
+    def setUp(self):
+        self.random = random.Random(5)
+
+    def __get_random_text(self):
+        return "".join(
+            self.random.choice("abcAB ") for _ in range(self.random.randint(0, 12))
+        )
+
+    def __get_random_flashcard(self, page):
+        return Flashcard(
+            self.__get_random_text(),
+            self.__get_random_text(),
+            Flashcard.QuestionType.PAGE_SPECIFIC,
+            [],
+            page,
+        )
+
+    def __assert_same_matches(self, search_index, flashcards_per_page):
+        for _ in range(30):
+            text_to_search = self.__get_random_text()[:5]
+            expected = {
+                flashcard.get_id()
+                for list_flashcards in flashcards_per_page.values()
+                for flashcard in list_flashcards
+                if text_to_search.lower()
+                in (flashcard.get_question() + flashcard.get_answer()).lower()
+            }
+            self.assertEqual(
+                {
+                    flashcard.get_id()
+                    for flashcard in search_index.search(text_to_search)
+                },
+                expected,
+            )
+
+    def test_search(self):
+        flashcards_per_page = {
+            page: [self.__get_random_flashcard(page) for _ in range(5)]
+            for page in range(10)
+        }
+        search_index = FlashcardSearchIndex(flashcards_per_page)
+        self.assertEqual(search_index.get_num_flashcards(), 50)
+        self.__assert_same_matches(search_index, flashcards_per_page)
+
+    def test_update_pages(self):
+        flashcards_per_page = {
+            page: [self.__get_random_flashcard(page) for _ in range(3)]
+            for page in range(6)
+        }
+        search_index = FlashcardSearchIndex(flashcards_per_page)
+        for _ in range(40):
+            source = self.random.randrange(6)
+            destination = self.random.randrange(6)
+            if len(flashcards_per_page[source]) == 0:
+                continue
+            operation = self.random.choice(["add", "modify", "remove", "move"])
+            flashcard = flashcards_per_page[source][0]
+            if operation == "add":
+                flashcards_per_page[source].append(self.__get_random_flashcard(source))
+            elif operation == "modify":
+                flashcard.set_question(self.__get_random_text())
+            elif operation == "remove":
+                flashcards_per_page[source].pop(0)
+            else:
+                flashcards_per_page[source].pop(0)
+                flashcard.set_reference_page(destination)
+                flashcards_per_page[destination].insert(0, flashcard)
+            search_index.update_pages([source, destination])
+            self.__assert_same_matches(search_index, flashcards_per_page)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,78 @@
+# Copyright 2022, 2023 Andrea Cucchietti
+# This file is part of flashcards-from-pdf.
+
+# flashcards-from-pdf is free software: you can redistribute it and/or modify it under the terms of the GNU General Public License as published by the Free Software Foundation, either version 3 of the License, or (at your option) any later version.
+
+# flashcards-from-pdf is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License along with flashcards-from-pdf. If not, see <https://www.gnu.org/licenses/>.
+import unittest
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../src")))
+
+from IO_flashcards_management import IOFlashcards
+from IO_deck_format import DeckFormat
+from flashcard.flashcard import Flashcard
+from test_management.pdf_test_info import PDFTestsInfo
+
+
+class TestFlashcardsParser(unittest.TestCase):
+    def test_multi_line_fields(self):
+        lines = [
+            "3 ?^? first line\n",
+            "second line ?^? !-! ?^? p ?^? 102 ?^? 2 ?^? \n",
+            "-1 ?^? generic ?^? answer\n",
+            "\n",
+            "end ?^? g ?^?  ?^? 1 ?^? \n",
+        ]
+        flashcards = list(DeckFormat.iter_flashcards_from_lines(lines, 1))
+
+        self.assertEqual(len(flashcards), 2)
+        self.assertEqual(flashcards[0].get_pdf_page(), 2)
+        self.assertEqual(flashcards[0].get_question(), "first line\nsecond line")
+        self.assertEqual(flashcards[0].get_answer(), "")
+        self.assertEqual(
+            flashcards[0].get_question_type(), Flashcard.QuestionType.PAGE_SPECIFIC
+        )
+        self.assertEqual(
+            flashcards[0].get_past_results(),
+            [
+                Flashcard.Result.NOT_DONE,
+                Flashcard.Result.STILL_LEARNING,
+                Flashcard.Result.KNOW,
+            ],
+        )
+        self.assertEqual(flashcards[0].get_current_result(), Flashcard.Result.KNOW)
+        self.assertEqual(flashcards[1].get_pdf_page(), Flashcard.GENERIC_PAGE)
+        self.assertEqual(flashcards[1].get_answer(), "answer\n\nend")
+
+    def test_save_and_parse(self):
+        pdf_test_info = PDFTestsInfo()
+        pdf_test_info.set_first_pass_flag(PDFTestsInfo.FirstPass.TRUE)
+        flashcards = {
+            0: [Flashcard("q0", "a0\nb0", Flashcard.QuestionType.PAGE_SPECIFIC, [])],
+            4: [
+                Flashcard("q1", "", reference_page=4, past_results=[]),
+                Flashcard("q2", "a2", reference_page=4, past_results=[]),
+            ],
+        }
+        with tempfile.TemporaryDirectory() as directory:
+            path_of_file = os.path.join(directory, "deck.txt")
+            IOFlashcards.save_flashcards_file(
+                path_of_file, pdf_test_info, 3, flashcards
+            )
+            result = IOFlashcards.get_flashcards_from_txt(path_of_file)
+
+        self.assertEqual(sorted(result.keys()), [0, 4])
+        self.assertEqual([f.get_question() for f in result[4]], ["q1", "q2"])
+        for page, list_flashcards in flashcards.items():
+            for expected, flashcard in zip(list_flashcards, result[page]):
+                self.assertTrue(expected.compare_to(flashcard))
+                self.assertEqual(expected.get_id(), flashcard.get_id())
+
+
+if __name__ == "__main__":
+    unittest.main()
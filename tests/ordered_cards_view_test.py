@@ -0,0 +1,82 @@
+# Copyright 2022, 2023 Andrea Cucchietti
+# This file is part of flashcards-from-pdf.
+
+# flashcards-from-pdf is free software: you can redistribute it and/or modify it under the terms of the GNU General Public License as published by the Free Software Foundation, either version 3 of the License, or (at your option) any later version.
+
+# flashcards-from-pdf is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License along with flashcards-from-pdf. If not, see <https://www.gnu.org/licenses/>.
+import unittest
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../src")))
+
+from pdf_visualization.ordered_cards_view import (
+    OrderedCardsView,
+    PdfPageToCardIndex,
+    FlashcardToCardIndex,
+)
+from flashcard.flashcard import Flashcard
+from flashcard.pdf_page import PdfPage
+
+
+class TestOrderedCardsView(unittest.TestCase):
+    def setUp(self):
+        self.generic = Flashcard("generic", reference_page=-2)
+        self.first = Flashcard("first", reference_page=1)
+        self.second = Flashcard("second", reference_page=1)
+        self.last = Flashcard("last", reference_page=3)
+        self.flashcards = {
+            3: [self.last],
+            1: [self.first, self.second],
+            -2: [self.generic],
+        }
+        self.cards_view = OrderedCardsView(self.flashcards, 4)
+
+    def test_order(self):
+        # generic, page 0, first, second, page 1, page 2, last, page 3
+        self.assertEqual(len(self.cards_view), 8)
+        self.assertIs(self.cards_view[0], self.generic)
+        self.assertIs(self.cards_view[2], self.first)
+        self.assertIs(self.cards_view[3], self.second)
+        self.assertIs(self.cards_view[6], self.last)
+        page: int
+        card_index: int
+        for page, card_index in enumerate([1, 4, 5, 7]):
+            self.assertIsInstance(self.cards_view[card_index], PdfPage)
+            self.assertEqual(self.cards_view[card_index].get_num_page(), page)
+        self.assertEqual(list(PdfPageToCardIndex(self.cards_view)), [1, 4, 5, 7])
+        self.assertEqual(list(FlashcardToCardIndex(self.cards_view)), [0, 2, 3, 6])
+
+    def test_indexes_before(self):
+        self.assertEqual(self.cards_view[3].get_flashcard_index_before(), 1)
+        self.assertEqual(self.cards_view[3].get_pdf_page_index_before(), 0)
+        self.assertEqual(self.cards_view[5].get_flashcard_index_before(), 2)
+        self.assertEqual(self.cards_view[5].get_pdf_page_index_before(), 1)
+        self.assertIs(self.cards_view[5], self.cards_view[5])
+        with self.assertRaises(IndexError):
+            self.cards_view[8]
+
+    def test_update_pages(self):
+        # move the first flashcard to the last page and add a flashcard to page 0
+        self.flashcards[1].remove(self.first)
+        self.first.set_reference_page(3)
+        self.flashcards[3].append(self.first)
+        new = Flashcard("new", reference_page=0)
+        self.flashcards[0] = [new]
+        self.cards_view.update_pages([1, 3, 0])
+
+        # generic, new, page 0, second, page 1, page 2, last, first, page 3
+        self.assertEqual(len(self.cards_view), 9)
+        self.assertIs(self.cards_view[1], new)
+        self.assertIs(self.cards_view[7], self.first)
+        self.assertEqual(self.cards_view[7].get_flashcard_index_before(), 3)
+        self.assertEqual(list(PdfPageToCardIndex(self.cards_view)), [2, 4, 5, 8])
+        self.assertEqual(
+            list(FlashcardToCardIndex(self.cards_view)), [0, 1, 3, 6, 7]
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
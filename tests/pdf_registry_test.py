@@ -0,0 +1,106 @@
+# Copyright 2022, 2023 Andrea Cucchietti
+# This file is part of flashcards-from-pdf.
+
+# flashcards-from-pdf is free software: you can redistribute it and/or modify it under the terms of the GNU General Public License as published by the Free Software Foundation, either version 3 of the License, or (at your option) any later version.
+
+# flashcards-from-pdf is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License along with flashcards-from-pdf. If not, see <https://www.gnu.org/licenses/>.
+import unittest
+import os
+import sys
+import shutil
+import tempfile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../src")))
+
+from IO_pdf_registry import PdfDocumentRegistry
+
+
+class TestPdfDocumentRegistry(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path_of_pdf = os.path.join(self.directory.name, "file.pdf")
+        self.path_of_db = os.path.join(self.directory.name, "private.db")
+        shutil.copy(
+            os.path.join(
+                os.path.dirname(__file__), "fixtures/test_structure/03_test/file1.pdf"
+            ),
+            self.path_of_pdf,
+        )
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_shared_document(self):
+        pdf_doc = PdfDocumentRegistry.acquire(self.path_of_pdf)
+        self.assertIs(PdfDocumentRegistry.acquire(self.path_of_pdf), pdf_doc)
+        PdfDocumentRegistry.release(pdf_doc)
+        self.assertEqual(PdfDocumentRegistry.get_num_open_documents(), 1)
+        PdfDocumentRegistry.release(pdf_doc)
+        self.assertEqual(PdfDocumentRegistry.get_num_open_documents(), 0)
+
+    def test_workers_document(self):
+        pdf_doc = PdfDocumentRegistry.acquire(self.path_of_pdf)
+        workers_pdf_doc = PdfDocumentRegistry.acquire(self.path_of_pdf, True)
+        self.assertIsNot(workers_pdf_doc, pdf_doc)
+        self.assertIs(
+            PdfDocumentRegistry.acquire(self.path_of_pdf, True), workers_pdf_doc
+        )
+        self.assertIs(
+            PdfDocumentRegistry.get_lock(workers_pdf_doc),
+            PdfDocumentRegistry.get_lock(workers_pdf_doc),
+        )
+        self.assertEqual(PdfDocumentRegistry.get_num_open_documents(), 2)
+        PdfDocumentRegistry.release(workers_pdf_doc)
+        PdfDocumentRegistry.release(workers_pdf_doc)
+        PdfDocumentRegistry.release(pdf_doc)
+        self.assertEqual(PdfDocumentRegistry.get_num_open_documents(), 0)
+
+    def test_changed_file(self):
+        pdf_doc = PdfDocumentRegistry.acquire(self.path_of_pdf)
+        os.utime(self.path_of_pdf, ns=(1, 1))
+        # the document in use is not reloaded under its user
+        changed_pdf_doc = PdfDocumentRegistry.acquire(self.path_of_pdf)
+        self.assertIsNot(changed_pdf_doc, pdf_doc)
+        self.assertEqual(PdfDocumentRegistry.get_num_open_documents(), 2)
+        PdfDocumentRegistry.release(pdf_doc)
+        PdfDocumentRegistry.release(changed_pdf_doc)
+        self.assertEqual(PdfDocumentRegistry.get_num_open_documents(), 0)
+
+    def test_metadata(self):
+        metadata = PdfDocumentRegistry.get_metadata(self.path_of_pdf, self.path_of_db)
+        self.assertGreater(metadata.get_page_count(), 0)
+        self.assertEqual(PdfDocumentRegistry.get_num_open_documents(), 0)
+
+        # touched but not changed, the stored metadata is used
+        os.utime(self.path_of_pdf, ns=(1, 1))
+        same_metadata = PdfDocumentRegistry.get_metadata(
+            self.path_of_pdf, self.path_of_db
+        )
+        self.assertEqual(metadata.get_content_hash(), same_metadata.get_content_hash())
+        self.assertEqual(metadata.get_page_sizes(), same_metadata.get_page_sizes())
+
+
+    def test_page_hashes(self):
+        page_hashes = PdfDocumentRegistry.get_page_hashes(
+            self.path_of_pdf, self.path_of_db
+        )
+        self.assertEqual(
+            len(page_hashes),
+            PdfDocumentRegistry.get_metadata(
+                self.path_of_pdf, self.path_of_db
+            ).get_page_count(),
+        )
+        self.assertEqual(PdfDocumentRegistry.get_num_open_documents(), 0)
+
+        # touched but not changed, the stored hashes are used
+        os.utime(self.path_of_pdf, ns=(1, 1))
+        self.assertEqual(
+            PdfDocumentRegistry.get_page_hashes(self.path_of_pdf, self.path_of_db),
+            page_hashes,
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
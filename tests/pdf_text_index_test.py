@@ -0,0 +1,73 @@
+# Copyright 2022, 2023 Andrea Cucchietti
+# This file is part of flashcards-from-pdf.
+
+# flashcards-from-pdf is free software: you can redistribute it and/or modify it under the terms of the GNU General Public License as published by the Free Software Foundation, either version 3 of the License, or (at your option) any later version.
+
+# flashcards-from-pdf is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License along with flashcards-from-pdf. If not, see <https://www.gnu.org/licenses/>.
+import unittest
+import os
+import sys
+import sqlite3
+import tempfile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../src")))
+
+from IO_pdf_text_index import PdfTextIndex
+from IO_pdf_registry import PdfDocumentRegistry
+
+
+class TestPdfTextIndex(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path_of_db = os.path.join(self.directory.name, "private.db")
+        con = sqlite3.connect(self.path_of_db)
+        with con:
+            PdfDocumentRegistry.create_table(con)
+            for content_hash in ("hash1", "hash2"):
+                con.execute(
+                    "INSERT INTO pdf_metadata VALUES (?, 0, 0, ?, ?)",
+                    (content_hash + ".pdf", content_hash, b""),
+                )
+        con.close()
+        PdfTextIndex.save_texts(
+            "hash1",
+            ["The Second Law\nof thermodynamics", "Entropy \"grows\"", "x = 1"],
+            self.path_of_db,
+        )
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_search(self):
+        self.assertTrue(PdfTextIndex.is_indexed("hash1", self.path_of_db))
+        self.assertFalse(PdfTextIndex.is_indexed("hash2", self.path_of_db))
+        # across the lines and in any case
+        self.assertEqual(
+            PdfTextIndex.search("hash1", "law of THERMO", self.path_of_db), [0]
+        )
+        self.assertEqual(PdfTextIndex.search("hash1", "o", self.path_of_db), [0, 1])
+        self.assertEqual(
+            PdfTextIndex.search("hash1", '"grows"', self.path_of_db), [1]
+        )
+        self.assertEqual(PdfTextIndex.search("hash2", "law", self.path_of_db), [])
+
+    def test_save_texts(self):
+        PdfTextIndex.save_texts("hash2", ["law"], self.path_of_db)
+        self.assertEqual(PdfTextIndex.search("hash2", "law", self.path_of_db), [0])
+        self.assertEqual(PdfTextIndex.search("hash1", "law", self.path_of_db), [0])
+
+        # the first pdf was changed
+        con = sqlite3.connect(self.path_of_db)
+        with con:
+            con.execute("DELETE FROM pdf_metadata WHERE content_hash = 'hash1'")
+        con.close()
+        PdfTextIndex.save_texts("hash2", ["entropy"], self.path_of_db)
+        self.assertFalse(PdfTextIndex.is_indexed("hash1", self.path_of_db))
+        self.assertEqual(PdfTextIndex.search("hash1", "law", self.path_of_db), [])
+        self.assertEqual(PdfTextIndex.search("hash2", "law", self.path_of_db), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,85 @@
+# Copyright 2022, 2023 Andrea Cucchietti
+# This file is part of flashcards-from-pdf.
+
+# flashcards-from-pdf is free software: you can redistribute it and/or modify it under the terms of the GNU General Public License as published by the Free Software Foundation, either version 3 of the License, or (at your option) any later version.
+
+# flashcards-from-pdf is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License along with flashcards-from-pdf. If not, see <https://www.gnu.org/licenses/>.
+import unittest
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../src")))
+
+from pdf_visualization.shuffle_review_queue import ShuffleReviewQueue
+from pdf_visualization.ordered_cards_view import (
+    PdfPageToCardIndex,
+    FlashcardToCardIndex,
+)
+from flashcard.flashcard import Flashcard
+from flashcard.pdf_page import PdfPage
+
+
+class TestShuffleReviewQueue(unittest.TestCase):
+    def setUp(self):
+        self.generic = Flashcard("generic", reference_page=-2)
+        self.first = Flashcard(
+            "first",
+            question_type=Flashcard.QuestionType.PAGE_SPECIFIC,
+            reference_page=1,
+        )
+        self.second = Flashcard(
+            "second",
+            question_type=Flashcard.QuestionType.PAGE_SPECIFIC,
+            reference_page=2,
+        )
+        self.known = Flashcard(
+            "known", reference_page=-2, current_result=Flashcard.Result.KNOW
+        )
+        self.flashcards = {
+            -2: [self.generic, self.known],
+            1: [self.first],
+            2: [self.second],
+        }
+        self.review_queue = ShuffleReviewQueue(self.flashcards, 3)
+
+    def get_flashcards(self):
+        return [self.review_queue[i] for i in FlashcardToCardIndex(self.review_queue)]
+
+    def test_cards(self):
+        flashcards = self.get_flashcards()
+        self.assertCountEqual(flashcards, [self.generic, self.first, self.second])
+        # generic 1 card, page specific 2 cards, page 0 at the end
+        self.assertEqual(len(self.review_queue), 6)
+        card_index = self.review_queue.get_card_index_of_flashcard_id(
+            self.first.get_id()
+        )
+        self.assertIs(self.review_queue[card_index], self.first)
+        self.assertIsInstance(self.review_queue[card_index + 1], PdfPage)
+        self.assertEqual(self.review_queue[card_index + 1].get_num_page(), 1)
+        self.assertEqual(PdfPageToCardIndex(self.review_queue)[0], 5)
+        self.assertEqual(
+            self.review_queue.get_card_index_of_flashcard_id(self.known.get_id()), -1
+        )
+
+    def test_remove_keeps_order(self):
+        flashcards = self.get_flashcards()
+        self.review_queue.remove(self.first)
+        flashcards.remove(self.first)
+        self.assertEqual(self.get_flashcards(), flashcards)
+        # page 1 is not referenced anymore, so it is moved at the end
+        self.assertEqual(len(self.review_queue), 5)
+        self.assertEqual(PdfPageToCardIndex(self.review_queue)[1], 4)
+
+    def test_update_pages(self):
+        flashcards = self.get_flashcards()
+        new = Flashcard("new", reference_page=-2)
+        self.flashcards[-2].append(new)
+        self.review_queue.update_pages([-2])
+        # the new flashcard is put at the end
+        self.assertEqual(self.get_flashcards(), flashcards + [new])
+
+
+if __name__ == "__main__":
+    unittest.main()
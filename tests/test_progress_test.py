@@ -0,0 +1,59 @@
+# Copyright 2022, 2023 Andrea Cucchietti
+# This file is part of flashcards-from-pdf.
+
+# flashcards-from-pdf is free software: you can redistribute it and/or modify it under the terms of the GNU General Public License as published by the Free Software Foundation, either version 3 of the License, or (at your option) any later version.
+
+# flashcards-from-pdf is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License along with flashcards-from-pdf. If not, see <https://www.gnu.org/licenses/>.
+import unittest
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../src")))
+
+# imported as a module, so the class is not collected as a test case
+from test_management import test_progress
+from flashcard.flashcard import Flashcard
+
+
+class TestTestProgress(unittest.TestCase):
+    def setUp(self):
+        self.known = Flashcard(
+            "known", reference_page=1, current_result=Flashcard.Result.KNOW
+        )
+        self.learning = Flashcard(
+            "learning", reference_page=1, current_result=Flashcard.Result.STILL_LEARNING
+        )
+        self.not_done = Flashcard("not done", reference_page=2)
+        self.flashcards = {1: [self.known, self.learning], 2: [self.not_done]}
+        self.progress = test_progress.TestProgress(self.flashcards)
+
+    def test_counts(self):
+        self.assertEqual(self.progress.get_num_not_done(), 1)
+        self.progress.set_result(self.not_done, Flashcard.Result.KNOW)
+        self.assertEqual(self.progress.get_num_not_done(), 0)
+        self.assertAlmostEqual(self.progress.get_percentage_known(), 200 / 3)
+
+        self.flashcards[2].remove(self.not_done)
+        self.flashcards[3] = [self.not_done]
+        self.not_done.set_reference_page(3)
+        self.flashcards[3].append(Flashcard("new", reference_page=3))
+        self.progress.update_pages([2, 3])
+        self.assertEqual(self.progress.get_num_flashcards(), 4)
+        self.assertEqual(self.progress.get_num_not_done(), 1)
+
+    def test_reset(self):
+        self.progress.reset(finished=False)
+        self.assertEqual(self.learning.get_current_result(), Flashcard.Result.NOT_DONE)
+        self.assertEqual(self.known.get_current_result(), Flashcard.Result.KNOW)
+        self.assertEqual(self.progress.get_num_not_done(), 2)
+
+        self.progress.reset(finished=True)
+        self.assertEqual(self.known.get_current_result(), Flashcard.Result.NOT_DONE)
+        self.assertEqual(self.progress.get_num_not_done(), 3)
+        self.assertEqual(self.progress.get_percentage_known(), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()